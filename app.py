@@ -1,19 +1,30 @@
 import streamlit as st
 import pandas as pd
+import plotly
 import plotly.express as px
 import io
+import json
 import sys
-import re
+import hashlib
+import threading
+import tempfile
 from pathlib import Path
-from scipy import stats
+from scipy import stats, sparse
 from langchain.tools import tool
 import time
 import numpy as np
+import dataclasses
 from dataclasses import dataclass
 import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.offline import get_plotlyjs_version
+import streamlit.components.v1 as components
 from wordcloud import WordCloud
-import matplotlib.pyplot as plt
-from collections import Counter
+from collections import OrderedDict
+import functools
+import weakref
+import os
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
 
 # --- Importações do LangChain (Tool Calling Agent) ---
 try:
@@ -31,6 +42,10 @@ except Exception:
 # Read System Prompt from file
 system_prompt = Path("./prompts/system.txt").read_text()
 
+# Start of this full script run (fragment reruns don't re-execute this line)
+RUN_STARTED = time.perf_counter()
+FULL_RUN_ACTIVE = True
+
 
 # --- PAGE CONFIG ---
 
@@ -73,43 +88,6 @@ def set_main_tab(tab_name: str):
     )
 
 
-def render_word_cloud(df_tracks: pd.DataFrame):
-    st.subheader("Word Cloud: Top Keywords in Popular Titles")
-    
-    # 1. Filter for highly popular songs (e.g., top 30%)
-    pop_threshold = df_tracks['popularity'].quantile(0.70)
-    df_popular = df_tracks[df_tracks['popularity'] >= pop_threshold].copy()
-
-    if df_popular.empty or df_popular['name'].empty:
-        st.info("No popular titles found in the filtered dataset to generate a word cloud.")
-        return
-
-    # 2. Extract, clean, and count words
-    all_titles = ' '.join(df_popular['name'].dropna().str.lower())
-    words = re.findall(r'\b\w+\b', all_titles)
-    
-    # Define custom stop words
-    stop_words = set(['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'is', 'was', 'are', 'i', 'you', 'me', 'it', 'ft', 'feat', 'my', 'all'])
-    filtered_words = [word for word in words if word not in stop_words and len(word) > 2]
-    
-    # 3. Generate Word Cloud object
-    word_string = ' '.join(filtered_words)
-    if not word_string:
-        st.info("No relevant words found after filtering.")
-        return
-        
-    wordcloud = WordCloud(
-        width=800, height=400, background_color='black',
-        colormap='summer', min_font_size=10
-    ).generate(word_string)
-    
-    # 4. Display the image in Streamlit
-    fig, ax = plt.subplots(figsize=(10, 5))
-    ax.imshow(wordcloud, interpolation='bilinear')
-    ax.axis("off")
-    st.pyplot(fig, use_container_width=True)
-
-    
 # --- UTILITY FUNCTIONS FOR ANIMATIONS ---
 
 def show_loading_animation(message="Loading...", duration=0.5):
@@ -733,115 +711,1307 @@ def apply_all_effects():
 
 apply_all_effects()
 
-# --- Cached data and animations with progress details ---
-@st.cache_data
-def load_data():
-    """Load data - cached after first load"""
+# --- Bounded, size-aware result cache ---
+# Every cached aggregation shares one byte budget. Least recently used results are
+# evicted first, so memory stays bounded no matter how many filter combinations
+# users try. Override the budget with MUSICINSIGHTS_CACHE_MB.
+CACHE_BUDGET_MB = float(os.environ.get("MUSICINSIGHTS_CACHE_MB", "256"))
+
+def estimate_nbytes(value) -> int:
+    """Approximate in-memory size of a cached result."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if sparse.issparse(value):
+        return int(value.data.nbytes + value.indices.nbytes + value.indptr.nbytes)
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(v) for v in value.values()) + sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_nbytes(v) for v in value) + sys.getsizeof(value)
+    if isinstance(getattr(value, "nbytes", None), int):
+        return value.nbytes  # Containers that report their own footprint
+    return sys.getsizeof(value)
+
+_FRAME_DIGESTS = {}  # id(frame) -> value digest, dropped when the frame is garbage collected
+
+def frame_fingerprint(frame: pd.DataFrame) -> tuple:
+    """
+    Identity for a DataFrame used as a cache key: shape, columns and a digest of every value
+    and row label, so derived frames cannot collide with the row subsets they came from.
+    The digest is computed once per frame object (frames passed to cached functions are
+    never modified afterwards), and cached frames such as filter results recur across reruns.
+    """
+    digest = _FRAME_DIGESTS.get(id(frame))
+    if digest is None:
+        hashes = pd.util.hash_pandas_object(frame, index=True).to_numpy()
+        digest = hashlib.blake2b(hashes.tobytes(), digest_size=16).hexdigest()
+        _FRAME_DIGESTS[id(frame)] = digest
+        weakref.finalize(frame, _FRAME_DIGESTS.pop, id(frame), None)
+    return ("frame", frame.shape, tuple(frame.columns), digest)
+
+def cache_key_part(value):
+    if isinstance(value, pd.DataFrame):
+        return frame_fingerprint(value)
+    if dataclasses.is_dataclass(value):
+        # Classes defined in the script are re-created every run, so compare by value
+        return (type(value).__name__, dataclasses.astuple(value))
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+class BoundedResultCache:
+    """Thread-safe LRU keyed by (function, arguments) with a total byte budget."""
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()  # key -> (value, nbytes, function name)
+        self._total_bytes = 0
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _func_stats(self, name: str) -> dict:
+        return self._stats.setdefault(name, {"entries": 0, "bytes": 0, "hits": 0, "misses": 0, "evictions": 0})
+
+    def get(self, name: str, key):
+        """Return (hit, value) and refresh the entry's recency on a hit."""
+        with self._lock:
+            entry = self._entries.get(key)
+            stats = self._func_stats(name)
+            if entry is None:
+                stats["misses"] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            stats["hits"] += 1
+            return True, entry[0]
+
+    def put(self, name: str, key, value):
+        nbytes = estimate_nbytes(value)
+        if nbytes > self.budget_bytes:
+            return  # Never let one result flush the whole cache
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (value, nbytes, name)
+            self._total_bytes += nbytes
+            stats = self._func_stats(name)
+            stats["entries"] += 1
+            stats["bytes"] += nbytes
+            while self._total_bytes > self.budget_bytes:
+                _, (_, old_bytes, old_name) = self._entries.popitem(last=False)
+                self._total_bytes -= old_bytes
+                old_stats = self._func_stats(old_name)
+                old_stats["entries"] -= 1
+                old_stats["bytes"] -= old_bytes
+                old_stats["evictions"] += 1
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def stats_frame(self) -> pd.DataFrame:
+        with self._lock:
+            rows = [{"function": name, **stats} for name, stats in self._stats.items()]
+        stats_df = pd.DataFrame(rows, columns=["function", "entries", "bytes", "hits", "misses", "evictions"])
+        lookups = stats_df["hits"] + stats_df["misses"]
+        stats_df["hit rate"] = (stats_df["hits"] / lookups.where(lookups > 0)).fillna(0).round(3)
+        stats_df["MB"] = (stats_df["bytes"] / 1024**2).round(2)
+        return stats_df[["function", "entries", "MB", "hit rate", "hits", "misses", "evictions"]]
+
+# --- Persistent disk tier (shared by every replica on the host) ---
+# Aggregates are stored as Parquet files keyed by data + code version + arguments, so a
+# restarted replica starts warm. Override with MUSICINSIGHTS_DISK_CACHE(_MB).
+try:
+    import pyarrow  # noqa: F401 - Parquet engine
+    PARQUET_DISPONIVEL = True
+except ImportError:
+    PARQUET_DISPONIVEL = False
+
+DISK_CACHE_DIR = Path(os.environ.get("MUSICINSIGHTS_DISK_CACHE", Path(tempfile.gettempdir()) / "musicinsights-cache"))
+DISK_CACHE_BUDGET_MB = float(os.environ.get("MUSICINSIGHTS_DISK_CACHE_MB", "1024"))
+
+class DiskResultCache:
+    """Parquet blobs with atomic writes and size-based (oldest first) eviction."""
+
+    def __init__(self, directory: Path, budget_bytes: int):
+        self.directory = Path(directory)
+        self.budget_bytes = budget_bytes
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "errors": 0}
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key) -> Path:
+        # repr() of the key only contains strings, numbers and tuples, so it is stable across processes
+        return self.directory / f"{hashlib.sha1(repr(key).encode()).hexdigest()}.parquet"
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            frame = pd.read_parquet(path)
+            os.utime(path)  # Refresh recency for eviction
+        except FileNotFoundError:
+            self._count("misses")
+            return None
+        except Exception:
+            # Truncated or foreign file: drop it and recompute
+            self._count("errors")
+            path.unlink(missing_ok=True)
+            return None
+        self._count("hits")
+        return frame
+
+    def put(self, key, frame: pd.DataFrame):
+        path = self._path(key)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            frame.to_parquet(tmp_name)
+            os.chmod(tmp_name, 0o644)  # mkstemp creates 0600; other replicas must read it
+            os.replace(tmp_name, path)  # Atomic: readers never see a partial file
+        except Exception:
+            self._count("errors")
+            Path(tmp_name).unlink(missing_ok=True)
+            return
+        self._count("writes")
+        self._evict()
+
+    def _files(self) -> list:
+        files = []
+        for path in self.directory.glob("*.parquet"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # Evicted by another replica
+            files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def _evict(self):
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.budget_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self._count("evictions")
+
+    def stats(self) -> dict:
+        files = self._files()
+        with self._lock:
+            return {**self._stats, "files": len(files), "MB": sum(size for _, size, _ in files) / 1024**2}
+
+@st.cache_resource(show_spinner=False)
+def get_disk_cache():
+    """None when Parquet support is missing or the directory is not writable."""
+    if not PARQUET_DISPONIVEL:
+        return None
     try:
-        # Load all datasets
-        data_main = pd.read_csv('data/data.csv')
-        data_by_artist = pd.read_csv('data/data_by_artist.csv')
-        data_by_genres = pd.read_csv('data/data_by_genres.csv')
-        data_by_year = pd.read_csv('data/data_by_year.csv')
-        data_w_genres = pd.read_csv('data/data_w_genres.csv')
-        
-        # Basic cleaning
-        data_main = data_main.dropna(subset=['popularity', 'energy', 'danceability'])
-        
-        return {
-            'main': data_main,
-            'by_artist': data_by_artist,
-            'by_genres': data_by_genres,
-            'by_year': data_by_year,
-            'with_genres': data_w_genres
-        }
-    except FileNotFoundError as e:
-        st.error(f"Erro: Arquivo não encontrado - {e}")
+        return DiskResultCache(DISK_CACHE_DIR, int(DISK_CACHE_BUDGET_MB * 1024**2))
+    except OSError:
         return None
-    except Exception as e:
-        st.error(f"Erro ao carregar os dados: {e}")
+
+DISK_CACHE = get_disk_cache()
+
+# Set once the datasets are loaded; part of every disk key
+DATA_VERSION = None
+# Source fingerprint, also part of every disk key: a deploy that changes an aggregation
+# must not be served Parquet blobs written by the previous build
+CODE_VERSION = hashlib.sha1(Path(__file__).read_bytes()).hexdigest()[:12]
+
+@st.cache_resource(show_spinner=False)
+def get_result_cache() -> BoundedResultCache:
+    """One result cache per server process, shared by every session."""
+    return BoundedResultCache(int(CACHE_BUDGET_MB * 1024**2))
+
+RESULT_CACHE = get_result_cache()
+
+# Plotly figures are stored serialized in their own budget, keyed by view + widget
+# values + filters, so an identical rerun skips figure construction entirely.
+FIGURE_CACHE_MB = float(os.environ.get("MUSICINSIGHTS_FIGURE_CACHE_MB", "64"))
+
+@st.cache_resource(show_spinner=False)
+def get_figure_cache() -> BoundedResultCache:
+    """Serialized figures per server process, shared by every session."""
+    return BoundedResultCache(int(FIGURE_CACHE_MB * 1024**2))
+
+FIGURE_CACHE = get_figure_cache()
+
+def cached_figure(view: str, key: tuple, build) -> tuple:
+    """
+    Return (figure, serialized payload). The figure is build()'s, or a fresh
+    copy of the one built earlier for the same key.
+    """
+    full_key = (view,) + key
+    hit, payload = FIGURE_CACHE.get(view, full_key)
+    if hit:
+        return pio.from_json(payload), payload
+    fig = build()
+    payload = fig.to_json()
+    FIGURE_CACHE.put(view, full_key, payload)
+    return fig, payload
+
+# --- Compact chart payloads ---
+# Plotly 6+ ships NumPy arrays to the browser as base64 typed arrays, so float32
+# halves the bytes. Older versions write JSON lists, where float32 only adds digits.
+PLOTLY_TYPED_ARRAYS = int(plotly.__version__.split(".")[0]) >= 6
+WEBGL_MIN_POINTS = 1000
+
+def _compact_array(values):
+    if PLOTLY_TYPED_ARRAYS and isinstance(values, np.ndarray) and values.dtype == np.float64:
+        return values.astype(np.float32)
+    return values
+
+def compact_figure(fig: go.Figure) -> go.Figure:
+    """Large scatter traces as WebGL, float32 arrays, and no customdata the hover template ignores."""
+    traces = []
+    for trace in fig.data:
+        props = trace.to_plotly_json()
+        x_values = props.get('x')
+        n_points = len(x_values) if x_values is not None else 0
+        if (props.get('type') == 'scatter' and n_points >= WEBGL_MIN_POINTS
+                and not props.get('fill') and not props.get('stackgroup')):
+            props['type'] = 'scattergl'
+        if 'customdata' in props and 'customdata' not in str(props.get('hovertemplate', '')):
+            props.pop('customdata')
+        for attr in ('x', 'y', 'z', 'customdata'):
+            if attr in props:
+                props[attr] = _compact_array(props[attr])
+        marker = props.get('marker')
+        if isinstance(marker, dict):
+            for attr in ('size', 'color'):
+                if attr in marker:
+                    marker[attr] = _compact_array(marker[attr])
+        traces.append(props)
+    # skip_invalid drops SVG-only attributes that scattergl does not accept
+    return go.Figure({'data': traces, 'layout': fig.layout}, skip_invalid=True)
+
+def render_browser_timing(payloads: dict):
+    """
+    Replays this run's figures in a hidden div of a small iframe and shows how long
+    plotly.js took to draw each one on this machine.
+    """
+    # Plotly escapes "/" in its JSON, so payloads cannot close the script tag
+    figures = ",".join(f"[{json.dumps(name)}, {payload}]" for name, payload in payloads.items())
+    html = f"""
+    <script src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"></script>
+    <div id="out" style="font: 13px sans-serif; color: #B3B3B3;">Measuring render time...</div>
+    <div id="stage" style="position: absolute; left: -10000px; width: 900px; height: 500px;"></div>
+    <script>
+    const figures = [{figures}];
+    const out = document.getElementById("out");
+    if (!window.Plotly) {{
+        out.textContent = "Browser render time unavailable (plotly.js could not be loaded).";
+    }} else {{
+        (async () => {{
+            const rows = [];
+            for (const [name, fig] of figures) {{
+                const started = performance.now();
+                await Plotly.newPlot("stage", fig.data, fig.layout);
+                rows.push(name + ": " + (performance.now() - started).toFixed(1) + " ms");
+                Plotly.purge("stage");
+            }}
+            out.textContent = "🖥️ Browser render time - " + rows.join(" · ");
+        }})();
+    }}
+    </script>
+    """
+    components.html(html, height=40)
+
+def bounded_cache(func=None, *, persist: bool = False):
+    """
+    Drop-in replacement for @st.cache_data on the aggregation helpers.
+    Results are shared, not copied, so callers must treat them as read-only.
+    With persist=True, DataFrame results also go to the disk tier below memory.
+    """
+    if func is None:
+        return functools.partial(bounded_cache, persist=persist)
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (name,) + tuple(cache_key_part(a) for a in args)
+        if kwargs:
+            key += tuple((k, cache_key_part(v)) for k, v in sorted(kwargs.items()))
+        hit, value = RESULT_CACHE.get(name, key)
+        if hit:
+            return value
+
+        use_disk = persist and DISK_CACHE is not None and DATA_VERSION is not None
+        if use_disk:
+            value = DISK_CACHE.get((DATA_VERSION, CODE_VERSION) + key)
+            if value is not None:
+                RESULT_CACHE.put(name, key, value)
+                return value
+
+        value = func(*args, **kwargs)
+        RESULT_CACHE.put(name, key, value)
+        if use_disk and isinstance(value, pd.DataFrame):
+            DISK_CACHE.put((DATA_VERSION, CODE_VERSION) + key, value)
+        return value
+
+    return wrapper
+
+
+# --- Background precomputation of Dashboard views ---
+# After a filter change, worker threads warm the result cache with every view's
+# data prep so switching views is a cache hit. Set MUSICINSIGHTS_PRECOMPUTE_WORKERS=0 to disable.
+PRECOMPUTE_WORKERS = int(os.environ.get("MUSICINSIGHTS_PRECOMPUTE_WORKERS", "2"))
+# How long a view's exact prep may take before a sampled estimate is drawn in the meantime,
+# and how long the estimate may stay up before the view computes inline instead
+PROGRESSIVE_BUDGET_MS = float(os.environ.get("MUSICINSIGHTS_PROGRESSIVE_BUDGET_MS", "300"))
+PROGRESSIVE_TIMEOUT_S = float(os.environ.get("MUSICINSIGHTS_PROGRESSIVE_TIMEOUT_S", "30"))
+# Threads reserved for the view each session is looking at, so it never queues behind background batches
+FOREGROUND_WORKERS = int(os.environ.get("MUSICINSIGHTS_FOREGROUND_WORKERS", "4"))
+
+@st.cache_resource(show_spinner=False)
+def get_precompute_pool() -> ThreadPoolExecutor:
+    """Worker threads shared by every session. Tasks only touch the result cache, never st.*"""
+    return ThreadPoolExecutor(max_workers=max(PRECOMPUTE_WORKERS, 1), thread_name_prefix="view-prep")
+
+@st.cache_resource(show_spinner=False)
+def get_foreground_pool() -> ThreadPoolExecutor:
+    """Worker threads for the selected view's prep only, separate from the background batches."""
+    return ThreadPoolExecutor(max_workers=max(FOREGROUND_WORKERS, 1), thread_name_prefix="view-foreground")
+
+class ViewPrecompute:
+    """One session's batch of background view preps for a single FilterState."""
+
+    def __init__(self, filter_key, tasks: dict):
+        self.filter_key = filter_key
+        self.cancelled = threading.Event()
+        pool = get_precompute_pool()
+        self.futures = {name: pool.submit(self._run, prep) for name, prep in tasks.items()}
+
+    def _run(self, prep):
+        if self.cancelled.is_set():
+            return None  # Filters moved on while this task was queued
+        started = time.perf_counter()
+        prep()
+        return time.perf_counter() - started
+
+    def cancel(self):
+        """Drop queued tasks; a task already running finishes but its result is just a cache entry."""
+        self.cancelled.set()
+        for future in self.futures.values():
+            future.cancel()
+
+    def status_frame(self) -> pd.DataFrame:
+        rows = []
+        for name, future in self.futures.items():
+            seconds = None
+            if future.cancelled():
+                state = "cancelled"
+            elif not future.done():
+                state = "running" if future.running() else "queued"
+            elif future.exception() is not None:
+                state = "failed"
+            else:
+                seconds = future.result()
+                state = "ready" if seconds is not None else "cancelled"
+            rows.append({"view": name, "state": state, "ms": None if seconds is None else round(seconds * 1000, 1)})
+        return pd.DataFrame(rows, columns=["view", "state", "ms"])
+
+def schedule_view_precompute(filter_key, tasks: dict):
+    """Start a batch for new filters, cancelling whatever this session queued for the old ones."""
+    if PRECOMPUTE_WORKERS <= 0:
+        return
+    current = st.session_state.get('view_precompute')
+    if current is not None:
+        if current.filter_key == filter_key:
+            return
+        current.cancel()
+    st.session_state.view_precompute = ViewPrecompute(filter_key, tasks)
+
+
+# --- Cached data with a real startup timeline ---
+DATA_FILES = {
+    'main': 'data/data.csv',
+    'by_artist': 'data/data_by_artist.csv',
+    'by_genres': 'data/data_by_genres.csv',
+    'by_year': 'data/data_by_year.csv',
+    'with_genres': 'data/data_w_genres.csv',
+}
+
+# Startup phases in execution order, with the label shown in the progress UI
+STARTUP_PHASES = {
+    "read": "📂 Reading data files",
+    "clean": "🧹 Cleaning tracks",
+    "derive": "🧮 Deriving columns",
+    "titles": "🔤 Tokenizing titles",
+    "collabs": "🕸️ Building collaboration graph",
+    "index": "🗂️ Building indexes",
+}
+
+def _read_datasets() -> dict:
+    """Read every CSV and fingerprint the files so caches can be keyed by data version."""
+    data = {name: pd.read_csv(path) for name, path in DATA_FILES.items()}
+    stamp = "|".join(
+        f"{path}:{Path(path).stat().st_size}:{Path(path).stat().st_mtime_ns}"
+        for path in DATA_FILES.values()
+    )
+    data['data_version'] = hashlib.sha1(stamp.encode()).hexdigest()[:12]
+    return data
+
+def _clean_datasets(data: dict) -> dict:
+    """Drop unusable tracks. The index is reset so row labels are catalog positions."""
+    data['main'] = (data['main']
+        .dropna(subset=['popularity', 'energy', 'danceability'])
+        .reset_index(drop=True))
+    return data
+
+def _derive_columns(data: dict) -> dict:
+    """Columns every view needs, computed once instead of on every rerun."""
+    main = data['main']
+    main['decade'] = (main['year'] // 10) * 10
+    main['artist_clean'] = (main['artists']
+        .str.replace(r"[\[\]'\"]", "", regex=True)
+        .str.split(",").str[0].str.strip())
+    return data
+
+# Columns the load pipeline adds to the catalog for the kernels. User-facing tables and the
+# agent's frames drop them ('decade' too, except in the filtered explorer table, as before).
+CATALOG_INTERNAL_COLUMNS = ['artist_clean', 'artist_code', 'artists_code', 'artist_count', 'sample_rank',
+                            'track_key', 'title_length', 'title_word_count', 'title_has_feat',
+                            'title_has_parens', 'title_has_digit', 'title_all_caps', 'uniqueness_score']
+
+# --- Mergeable distinct-artist sketches ---
+# Optional (MUSICINSIGHTS_ARTIST_SKETCH=1): a HyperLogLog per (year, explicit, popularity
+# decile) cell, so the sidebar card merges registers instead of scanning rows whenever
+# the filters fall on cell boundaries.
+ARTIST_SKETCH = os.environ.get("MUSICINSIGHTS_ARTIST_SKETCH", "0") == "1"
+HLL_PRECISION = 10  # 1024 registers per cell, about 3% standard error
+
+# FilterState range -> (column, scale) as applied by filter_tracks
+AUDIO_RANGE_COLUMNS = {
+    "dance_range": ("danceability", 100.0), "energy_range": ("energy", 100.0),
+    "valence_range": ("valence", 100.0), "acoustic_range": ("acousticness", 100.0),
+    "instr_range": ("instrumentalness", 100.0), "live_range": ("liveness", 100.0),
+    "speech_range": ("speechiness", 100.0), "loudness_range": ("loudness", 1.0),
+}
+
+def _hll_hash(codes: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer: well-mixed 64-bit hashes of integer codes."""
+    z = codes.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+def _hll_rank(hashes: np.ndarray) -> np.ndarray:
+    """1-based position of the first set bit after the register-index bits."""
+    width = 64 - HLL_PRECISION
+    rest = hashes & np.uint64((1 << width) - 1)
+    bit_length = np.zeros(len(rest), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        wide = rest >= np.uint64(1 << shift)
+        bit_length += wide * shift
+        rest = np.where(wide, rest >> np.uint64(shift), rest)
+    bit_length += rest > 0
+    return width - bit_length + 1
+
+def hll_estimate(registers: np.ndarray) -> float:
+    """Cardinality from merged HyperLogLog registers (linear counting for small sets)."""
+    m = registers.shape[-1]
+    raw = 0.7213 / (1 + 1.079 / m) * m * m / np.exp2(-registers.astype(float)).sum()
+    zeros = int(np.count_nonzero(registers == 0))
+    if raw <= 2.5 * m and zeros:
+        return m * np.log(m / zeros)
+    return raw
+
+def cube_cells(f, year0: int, bounds: dict):
+    """
+    (year, explicit, popularity decile) slices holding exactly the FilterState's rows,
+    or None when a popularity edge or an audio-feature range cuts through cells.
+    """
+    if f.pop_min % 10 or not (f.pop_max % 10 == 9 or f.pop_max >= 100):
         return None
+    for field, (column, scale) in AUDIO_RANGE_COLUMNS.items():
+        lo, hi = getattr(f, field)
+        if lo / scale > bounds[column][0] or hi / scale < bounds[column][1]:
+            return None
+    explicit = {"Clean Only": slice(0, 1), "Explicit Only": slice(1, 2)}.get(f.explicit, slice(0, 2))
+    years = slice(max(f.year_start - year0, 0), max(f.year_end - year0 + 1, 0))
+    return years, explicit, slice(f.pop_min // 10, min(f.pop_max, 100) // 10 + 1)
+
+class ArtistSketchCube:
+    """Track count, popularity sum and an artist HyperLogLog per (year, explicit, popularity decile)."""
+
+    def __init__(self, main: pd.DataFrame, codes_column: str):
+        self.year0 = int(main['year'].min())
+        years = main['year'].to_numpy().astype(np.int64) - self.year0
+        explicit = main['explicit'].to_numpy().astype(np.int64)
+        deciles = main['popularity'].to_numpy().astype(np.int64) // 10  # 100 gets its own cell
+        self.shape = (int(years.max()) + 1, 2, 11)
+        cell = np.ravel_multi_index((years, explicit, deciles), self.shape)
+        n_cells = int(np.prod(self.shape))
+        self.counts = np.bincount(cell, minlength=n_cells).reshape(self.shape)
+        self.pop_sums = np.bincount(cell, weights=main['popularity'].to_numpy(dtype=float),
+                                    minlength=n_cells).reshape(self.shape)
+
+        codes = main[codes_column].to_numpy()
+        named = codes >= 0
+        hashes = _hll_hash(codes[named])
+        registers = np.zeros((n_cells, 1 << HLL_PRECISION), dtype=np.uint8)
+        np.maximum.at(registers, (cell[named], (hashes >> np.uint64(64 - HLL_PRECISION)).astype(np.int64)),
+                      _hll_rank(hashes).astype(np.uint8))
+        self.registers = registers.reshape(self.shape + (1 << HLL_PRECISION,))
+        self.bounds = {column: (main[column].min(), main[column].max())
+                       for column, _ in AUDIO_RANGE_COLUMNS.values()}
+
+    def cells_for(self, f):
+        """Index into the cube selecting exactly the filter's rows, or None if it cuts through cells."""
+        if f.keys and not set(range(12)) <= set(f.keys):
+            return None  # Keys are not a dimension of this cube
+        return cube_cells(f, self.year0, self.bounds)
+
+    def stats(self, f) -> dict:
+        """Sidebar card numbers from the cube alone, or None when the filter is not cell-aligned."""
+        cells = self.cells_for(f)
+        if cells is None:
+            return None
+        counts = self.counts[cells]
+        tracks = int(counts.sum())
+        if not tracks:
+            return dict(SIDEBAR_EMPTY, approximate=True)
+        active_years = np.flatnonzero(counts.sum(axis=(1, 2))) + self.year0 + cells[0].start
+        return {
+            "tracks": tracks,
+            "years": f"{int(active_years.min())}-{int(active_years.max())}",
+            "artists": int(round(hll_estimate(self.registers[cells].reshape(-1, 1 << HLL_PRECISION).max(axis=0)))),
+            "avg_pop": float(self.pop_sums[cells].sum() / tracks),
+            "explicit": int(self.counts[cells[0], 1:2, cells[2]].sum()) if cells[1].stop == 2 else 0,
+            "approximate": True,
+        }
+
+# Columns whose Pearson correlations are answered from cube sufficient statistics
+CORRELATION_COLUMNS = ['danceability', 'energy', 'valence', 'acousticness', 'instrumentalness',
+                       'liveness', 'loudness', 'speechiness', 'popularity', 'uniqueness_score']
+
+class FeatureStatsCube:
+    """n, sum(x) and sum(x x^T) of CORRELATION_COLUMNS per (year, explicit, key, popularity decile) cell."""
+
+    def __init__(self, main: pd.DataFrame):
+        self.year0 = int(main['year'].min())
+        years = main['year'].to_numpy().astype(np.int64) - self.year0
+        explicit = main['explicit'].to_numpy().astype(np.int64)
+        keys = main['key'].to_numpy().astype(np.int64)
+        deciles = main['popularity'].to_numpy().astype(np.int64) // 10
+        self.shape = (int(years.max()) + 1, 2, 12, 11)
+        cell = np.ravel_multi_index((years, explicit, keys, deciles), self.shape)
+        n_cells = int(np.prod(self.shape))
+
+        # Centered on the catalog means: correlation is shift-invariant and the sums stay well conditioned
+        values = main[CORRELATION_COLUMNS].to_numpy(dtype=float)
+        self.center = values.mean(axis=0)
+        values = values - self.center
+        p = len(CORRELATION_COLUMNS)
+        self.counts = np.bincount(cell, minlength=n_cells).reshape(self.shape)
+        sums = np.empty((n_cells, p))
+        cross = np.empty((n_cells, p, p))
+        for i in range(p):
+            sums[:, i] = np.bincount(cell, weights=values[:, i], minlength=n_cells)
+            for j in range(i, p):
+                cross[:, i, j] = cross[:, j, i] = np.bincount(cell, weights=values[:, i] * values[:, j],
+                                                              minlength=n_cells)
+        self.sums = sums.reshape(self.shape + (p,))
+        self.cross = cross.reshape(self.shape + (p, p))
+        self.bounds = {column: (main[column].min(), main[column].max())
+                       for column, _ in AUDIO_RANGE_COLUMNS.values()}
+
+    def moments(self, f):
+        """(n, means, population covariance) for the FilterState by summing its cells, or None when it is not cell-aligned."""
+        cells = cube_cells(f, self.year0, self.bounds)
+        if cells is None:
+            return None
+        years, explicit, deciles = cells
+        keys = np.array(sorted(f.keys)) if f.keys and len(set(f.keys)) < 12 else slice(None)
+        index = (years, explicit, keys, deciles)
+        p = len(CORRELATION_COLUMNS)
+        n = self.counts[index].sum()
+        if n < 2:
+            return None
+        mean = self.sums[index].reshape(-1, p).sum(axis=0) / n
+        covariance = self.cross[index].reshape(-1, p, p).sum(axis=0) / n - np.outer(mean, mean)
+        return int(n), self.center + mean, covariance
+
+def correlation_from_covariance(covariance: np.ndarray) -> np.ndarray:
+    """Pearson matrix from a covariance matrix; constant columns correlate as NaN."""
+    scale = np.sqrt(np.diag(covariance))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = covariance / np.outer(scale, scale)
+    np.fill_diagonal(corr, np.where(scale > 0, 1.0, np.nan))
+    return corr
+
+# --- Server-side distribution statistics ---
+# Box and violin charts get per-group quartiles, whiskers, a bounded outlier sample
+# and a binned KDE instead of raw rows, so their payload no longer grows with the data.
+BOX_OUTLIER_SAMPLE = 150
+KDE_POINTS = 64
+
+def empty_distribution_stats(kde: bool = False) -> dict:
+    """distribution_stats of a selection with no rows: no groups, so every per-group array is empty."""
+    empty = np.zeros(0)
+    stats = {
+        "labels": [], "n": np.zeros(0, dtype=np.int64), "q1": empty, "median": empty, "q3": empty,
+        "lowerfence": empty, "upperfence": empty,
+        "outlier_group": np.zeros(0, dtype=np.int64), "outlier_value": empty,
+    }
+    if kde:
+        stats["kde_x"] = stats["kde"] = np.zeros((0, KDE_POINTS))
+    return stats
+
+@bounded_cache
+def distribution_stats(df_tracks: pd.DataFrame, value: str, group: str,
+                       bin_labels: tuple = None, kde: bool = False) -> dict:
+    """Tukey box statistics (and optionally a Gaussian KDE) of `value` for every `group` in one sorted pass."""
+    if df_tracks.empty:
+        return empty_distribution_stats(kde)
+    groups = df_tracks[group]
+    if bin_labels is not None:
+        groups = pd.cut(groups, bins=len(bin_labels), labels=list(bin_labels))
+    values = df_tracks[value].to_numpy(dtype=float)
+    keep = groups.notna().to_numpy() & ~np.isnan(values)
+    if not keep.any():
+        return empty_distribution_stats(kde)
+    codes, labels = pd.factorize(groups[keep], sort=True)
+    values = values[keep]
+
+    # Sort by (group, value) once; every group is then a contiguous, ordered run
+    order = np.lexsort((values, codes))
+    codes, values = codes[order], values[order]
+    counts = np.bincount(codes, minlength=len(labels))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    ends = starts + counts - 1
+
+    def quantile(q: float) -> np.ndarray:
+        pos = starts + q * (counts - 1)  # Linear interpolation, Plotly's default quartile method
+        lo = np.floor(pos).astype(int)
+        hi = np.minimum(lo + 1, ends)
+        return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+    q1, median, q3 = quantile(0.25), quantile(0.5), quantile(0.75)
+    iqr = q3 - q1
+    inside = (values >= (q1 - 1.5 * iqr)[codes]) & (values <= (q3 + 1.5 * iqr)[codes])
+    mean = np.bincount(codes, weights=values) / counts
+    std = np.sqrt(np.maximum(np.bincount(codes, weights=values ** 2) / counts - mean ** 2, 0))
+    stats = {
+        "labels": list(labels), "n": counts, "q1": q1, "median": median, "q3": q3,
+        "lowerfence": np.minimum.reduceat(np.where(inside, values, np.inf), starts),
+        "upperfence": np.maximum.reduceat(np.where(inside, values, -np.inf), starts),
+    }
+
+    # Outliers: an evenly spaced subset of each group's sorted outliers, at most BOX_OUTLIER_SAMPLE
+    out_idx = np.flatnonzero(~inside)
+    out_codes = codes[out_idx]
+    out_counts = np.bincount(out_codes, minlength=len(labels))
+    out_rank = np.arange(len(out_idx)) - np.concatenate(([0], np.cumsum(out_counts)[:-1]))[out_codes]
+    step = np.maximum(1, np.ceil(out_counts / BOX_OUTLIER_SAMPLE)).astype(int)
+    shown = out_idx[out_rank % step[out_codes] == 0]
+    stats["outlier_group"], stats["outlier_value"] = codes[shown], values[shown]
+
+    if kde:
+        # Bin each group onto KDE_POINTS points over its own range, then smooth with
+        # a Silverman-bandwidth Gaussian: a (groups x points x points) product, no per-row work.
+        lo, hi = values[starts], values[ends]
+        span = np.where(hi > lo, hi - lo, 1.0)
+        grid = lo[:, None] + np.linspace(0, 1, KDE_POINTS)[None, :] * span[:, None]
+        bins = np.rint((values - lo[codes]) / span[codes] * (KDE_POINTS - 1)).astype(int)
+        binned = np.bincount(codes * KDE_POINTS + bins, minlength=len(labels) * KDE_POINTS)
+        binned = binned.reshape(len(labels), KDE_POINTS)
+        spread = np.minimum(std, iqr / 1.34)
+        spread = np.where(spread > 0, spread, np.where(std > 0, std, span / KDE_POINTS))
+        bandwidth = 0.9 * spread * counts ** -0.2
+        offsets = (grid[:, :, None] - grid[:, None, :]) / bandwidth[:, None, None]
+        density = np.einsum("gij,gj->gi", np.exp(-0.5 * offsets ** 2), binned)
+        stats["kde_x"] = grid
+        stats["kde"] = density / (counts * bandwidth * np.sqrt(2 * np.pi))[:, None]
+    return stats
+
+def box_figure(stats: dict, title: str, x_label: str, y_label: str, colored: bool = True) -> go.Figure:
+    """One precomputed go.Box per group plus its sampled outliers, laid out like px.box."""
+    palette = px.colors.qualitative.Plotly
+    names = [str(label) for label in stats["labels"]]
+    fig = go.Figure()
+    for i, name in enumerate(names):
+        color = palette[i % len(palette)] if colored else palette[0]
+        fig.add_trace(go.Box(
+            x=[name], q1=[stats["q1"][i]], median=[stats["median"][i]], q3=[stats["q3"][i]],
+            lowerfence=[stats["lowerfence"][i]], upperfence=[stats["upperfence"][i]],
+            name=name, legendgroup=name, marker_color=color, boxpoints=False, showlegend=colored
+        ))
+        outliers = stats["outlier_value"][stats["outlier_group"] == i]
+        if len(outliers):
+            fig.add_trace(go.Scatter(
+                x=[name] * len(outliers), y=outliers, mode="markers", name=name, legendgroup=name,
+                marker=dict(color=color, size=4), showlegend=False,
+                hovertemplate=f"{y_label}: %{{y:.3g}}<extra>{name}</extra>"
+            ))
+    fig.update_layout(title=title, xaxis_title=x_label, yaxis_title=y_label, boxmode="overlay")
+    fig.update_xaxes(type="category", categoryorder="array", categoryarray=names)
+    return fig
+
+def violin_figure(stats: dict, title: str, x_label: str, y_label: str) -> go.Figure:
+    """Violins drawn from the precomputed KDE curves (same max width each), with a slim box inside."""
+    palette = px.colors.qualitative.Plotly
+    names = [str(label) for label in stats["labels"]]
+    fig = go.Figure()
+    for i, name in enumerate(names):
+        color = palette[i % len(palette)]
+        half_width = 0.4 * stats["kde"][i] / stats["kde"][i].max()
+        ys = stats["kde_x"][i]
+        fig.add_trace(go.Scatter(
+            x=np.concatenate([i + half_width, (i - half_width)[::-1]]),
+            y=np.concatenate([ys, ys[::-1]]),
+            fill="toself", mode="lines", line=dict(color=color, width=1), opacity=0.6,
+            name=name, legendgroup=name, hoveron="fills"
+        ))
+        fig.add_trace(go.Box(
+            x=[i], q1=[stats["q1"][i]], median=[stats["median"][i]], q3=[stats["q3"][i]],
+            lowerfence=[stats["lowerfence"][i]], upperfence=[stats["upperfence"][i]],
+            width=0.08, marker_color=color, boxpoints=False, name=name, legendgroup=name, showlegend=False
+        ))
+    fig.update_layout(title=title, xaxis_title=x_label, yaxis_title=y_label, boxmode="overlay")
+    fig.update_xaxes(tickmode="array", tickvals=list(range(len(names))), ticktext=names)
+    return fig
+
+# --- Closed-form least squares ---
+# Lines are fitted from sums (n, means, Sxx, Syy, Sxy), so one call fits any number of
+# series at once and no model object is refitted when a chart is drawn.
+TREND_CONFIDENCE = 0.95
+
+@dataclass(frozen=True)
+class LinearFit:
+    """Least-squares lines y = intercept + slope * x; every field holds one entry per fitted series."""
+    n: np.ndarray
+    x_mean: np.ndarray
+    sxx: np.ndarray
+    slope: np.ndarray
+    intercept: np.ndarray
+    r2: np.ndarray
+    residual_se: np.ndarray
+
+    def take(self, i) -> "LinearFit":
+        """The fit of series i alone."""
+        return LinearFit(*(np.asarray(getattr(self, field.name))[i] for field in dataclasses.fields(self)))
+
+    def predict(self, x) -> np.ndarray:
+        return np.expand_dims(self.intercept, -1) + np.expand_dims(self.slope, -1) * np.asarray(x, dtype=float)
+
+    def band(self, x, level: float = TREND_CONFIDENCE, prediction: bool = False) -> tuple:
+        """
+        (lower, upper) confidence band of the fitted mean at x, or of a new observation
+        when prediction=True.
+        """
+        x = np.asarray(x, dtype=float)
+        expand = lambda a: np.expand_dims(np.asarray(a, dtype=float), -1)
+        t = stats.t.ppf(0.5 + level / 2, np.maximum(expand(self.n) - 2, 1))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            spread = 1 / expand(self.n) + (x - expand(self.x_mean)) ** 2 / expand(self.sxx) + float(prediction)
+            half = t * expand(self.residual_se) * np.sqrt(spread)
+        fit = self.predict(x)
+        return fit - half, fit + half
+
+def fit_from_moments(n, x_mean, y_mean, sxx, syy, sxy) -> LinearFit:
+    """Vectorized OLS from sufficient statistics (Sxx, Syy, Sxy are sums of centered products)."""
+    n, x_mean, y_mean, sxx, syy, sxy = np.broadcast_arrays(*(np.asarray(a, dtype=float)
+                                                            for a in (n, x_mean, y_mean, sxx, syy, sxy)))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = sxy / sxx
+        r2 = sxy ** 2 / (sxx * syy)
+        residual_se = np.sqrt(np.maximum(syy - slope * sxy, 0) / np.maximum(n - 2, 1))
+    return LinearFit(n=n, x_mean=x_mean, sxx=sxx, slope=slope, intercept=y_mean - slope * x_mean,
+                     r2=r2, residual_se=residual_se)
+
+def linear_fit(x, y) -> LinearFit:
+    """Fit each column of y (rows aligned with x) against x in one pass."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float).reshape(len(x), -1)
+    dx = x - x.mean()
+    dy = y - y.mean(axis=0)
+    return fit_from_moments(len(x), x.mean(), y.mean(axis=0), dx @ dx, (dy * dy).sum(axis=0), dx @ dy)
+
+# --- Batch trend forecasting ---
+# Every series of a yearly-means frame is projected by each model in one NumPy batch:
+# the models are vectorized across features instead of looping over them.
+FORECAST_COLUMNS = ['danceability', 'energy', 'valence', 'acousticness', 'instrumentalness', 'liveness',
+                    'loudness', 'speechiness', 'tempo', 'duration_ms', 'popularity']
+FORECAST_MODELS = {"Linear": "linear", "Piecewise linear": "piecewise", "Exponential smoothing": "smoothing"}
+FORECAST_SINCE = 1980       # Models are fitted on the yearly means from this year on
+FORECAST_HORIZON = 10       # Years projected past the last observed year
+PIECEWISE_MIN_SEGMENT = 5   # Observed years on each side of a piecewise-linear knot
+HOLT_ALPHA, HOLT_BETA = 0.5, 0.2
+
+def _linear_forecast(x: np.ndarray, Y: np.ndarray, future: np.ndarray, level: float) -> tuple:
+    fit = linear_fit(x, Y)
+    lower, upper = fit.band(future, level, prediction=True)
+    return fit.predict(future), lower, upper
+
+def _piecewise_forecast(x: np.ndarray, Y: np.ndarray, future: np.ndarray, level: float) -> tuple:
+    """
+    Continuous hinge fits y = a + b x + c max(x - k, 0). Every candidate knot k is solved in
+    one stacked least-squares batch and each series keeps the knot with the smallest SSE.
+    """
+    n, m = Y.shape
+    x0 = x - x[-1]  # Centered on the last year for conditioning
+    f0 = future - x[-1]
+    knots = x0[PIECEWISE_MIN_SEGMENT - 1:n - PIECEWISE_MIN_SEGMENT]
+    X = np.stack([np.ones((len(knots), n)), np.broadcast_to(x0, (len(knots), n)),
+                  np.maximum(x0 - knots[:, None], 0)], axis=-1)                       # (K, n, 3)
+    F = np.stack([np.ones((len(knots), len(f0))), np.broadcast_to(f0, (len(knots), len(f0))),
+                  np.maximum(f0 - knots[:, None], 0)], axis=-1)                       # (K, H, 3)
+    gram_inv = np.linalg.pinv(np.swapaxes(X, 1, 2) @ X)                             # (K, 3, 3)
+    beta = gram_inv @ np.swapaxes(X, 1, 2) @ Y                                       # (K, 3, m)
+    sse = ((Y - X @ beta) ** 2).sum(axis=1)                                          # (K, m)
+    leverage = np.einsum('khi,kij,khj->kh', F, gram_inv, F)                          # (K, H)
+    best = sse.argmin(axis=0)
+    series = np.arange(m)
+    forecast = np.swapaxes(F @ beta, 1, 2)[best, series]                            # (m, H)
+    t = stats.t.ppf(0.5 + level / 2, n - 3)
+    half = t * np.sqrt(sse[best, series] / (n - 3))[:, None] * np.sqrt(1 + leverage[best])
+    return forecast, forecast - half, forecast + half
+
+def _smoothing_forecast(Y: np.ndarray, horizon: int, level: float) -> tuple:
+    """Holt's linear exponential smoothing; observations are taken as consecutive years."""
+    smoothed, trend = Y[0], Y[1] - Y[0]
+    errors = np.empty_like(Y[1:])
+    for i, y in enumerate(Y[1:]):
+        step = smoothed + trend
+        errors[i] = y - step
+        previous, smoothed = smoothed, HOLT_ALPHA * y + (1 - HOLT_ALPHA) * step
+        trend = HOLT_BETA * (smoothed - previous) + (1 - HOLT_BETA) * trend
+    steps = np.arange(1, horizon + 1)
+    forecast = smoothed[:, None] + steps * trend[:, None]
+    # h-step variance grows by alpha^2 (1 + j beta)^2 for each step j before h
+    growth = HOLT_ALPHA ** 2 * (1 + np.arange(horizon) * HOLT_BETA) ** 2
+    growth[0] = 0
+    half = (stats.norm.ppf(0.5 + level / 2) * np.sqrt((errors ** 2).mean(axis=0))[:, None]
+            * np.sqrt(1 + np.cumsum(growth)))
+    return forecast, forecast - half, forecast + half
+
+def forecast_trends(year_frame: pd.DataFrame, since: int = FORECAST_SINCE,
+                    horizon: int = FORECAST_HORIZON, level: float = TREND_CONFIDENCE) -> pd.DataFrame:
+    """
+    Projections of every FORECAST_COLUMNS series in a yearly-means frame by every model, with
+    prediction intervals: one row per (feature, model, year) with forecast, lower and upper.
+    Empty when fewer than 2 * PIECEWISE_MIN_SEGMENT years are observed since `since`.
+    """
+    history = year_frame[year_frame['year'] >= since].dropna(subset=FORECAST_COLUMNS).sort_values('year')
+    if len(history) < 2 * PIECEWISE_MIN_SEGMENT:
+        return pd.DataFrame(columns=['feature', 'model', 'year', 'forecast', 'lower', 'upper'])
+    x = history['year'].to_numpy(dtype=float)
+    Y = history[FORECAST_COLUMNS].to_numpy(dtype=float)
+    future = x[-1] + np.arange(1, horizon + 1)
+    results = {
+        "linear": _linear_forecast(x, Y, future, level),
+        "piecewise": _piecewise_forecast(x, Y, future, level),
+        "smoothing": _smoothing_forecast(Y, horizon, level),
+    }
+    return pd.concat([pd.DataFrame({
+        'feature': np.repeat(FORECAST_COLUMNS, horizon),
+        'model': model,
+        'year': np.tile(future.astype(int), len(FORECAST_COLUMNS)),
+        'forecast': forecast.ravel(), 'lower': lower.ravel(), 'upper': upper.ravel(),
+    }) for model, (forecast, lower, upper) in results.items()], ignore_index=True)
+
+# Title pattern flags: column -> regex matched anywhere in the title
+TITLE_PATTERNS = {
+    'title_has_feat': r'(?i)feat\.|ft\.|featuring',
+    'title_has_parens': r'\(|\)',
+    'title_has_digit': r'\d',
+}
+
+# Stop words for title word statistics, shared by every view that counts title words.
+# MUSICINSIGHTS_STOP_WORDS="word,word" adds words to all sets.
+_EXTRA_STOP_WORDS = {w.strip().lower() for w in os.environ.get("MUSICINSIGHTS_STOP_WORDS", "").split(",") if w.strip()}
+_BASE_STOP_WORDS = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'is', 'was', 'are'}
+STOP_WORD_SETS = {
+    "common_words": frozenset(_BASE_STOP_WORDS | {'by', 'been'} | _EXTRA_STOP_WORDS),
+    "word_cloud": frozenset(_BASE_STOP_WORDS | {'i', 'you', 'me', 'it', 'ft', 'feat', 'my', 'all'} | _EXTRA_STOP_WORDS),
+}
+MIN_WORD_LENGTH = 3
+
+def _tokenize_titles(data: dict) -> dict:
+    """
+    Title features as columns plus a (track_id, token_id) table, so Title Analytics
+    only groups precomputed values. track_id is the catalog row position.
+    """
+    main = data['main']
+    names = main['name']
+    main['title_length'] = names.str.len()
+    main['title_word_count'] = names.str.split().str.len()
+    for column, pattern in TITLE_PATTERNS.items():
+        main[column] = names.str.contains(pattern, na=False)
+    main['title_all_caps'] = names.str.isupper().fillna(False).astype(bool)
+
+    tokens = names.str.lower().str.split().explode().dropna()
+    track_ids = tokens.index.to_numpy(dtype=np.int64)
+    token_ids, vocab = pd.factorize(tokens)
+    # Words are tokens with punctuation stripped ("love," and "love" are one word)
+    word_of_token, words = pd.factorize(vocab.str.replace(r'\W+', '', regex=True))
+    word_ids = word_of_token[token_ids]
+    data['title_tokens'] = pd.DataFrame({'track_id': track_ids.astype(np.int32), 'token_id': token_ids.astype(np.int32),
+                                         'word_id': word_ids.astype(np.int32)})
+
+    # Inverted index: postings (track ids) grouped by word, plus catalog-wide per-word totals
+    order = np.argsort(word_ids, kind='stable')
+    word_counts = np.bincount(word_ids, minlength=len(words))
+    popularity = main['popularity'].to_numpy(dtype=float)
+    data['title_words'] = pd.DataFrame({
+        'word': words,
+        'count': word_counts,
+        'pop_sum': np.bincount(word_ids, weights=popularity[track_ids], minlength=len(words)),
+    })
+    data['title_word_index'] = {
+        'offsets': np.concatenate(([0], np.cumsum(word_counts))),
+        'track_ids': track_ids[order].astype(np.int32),
+    }
+
+    # Uniqueness: distinct tokens / tokens per title, from unique (track, token) pairs
+    distinct_pairs = np.unique(track_ids * len(vocab) + token_ids)
+    distinct = np.bincount(distinct_pairs // len(vocab), minlength=len(main))
+    total = np.bincount(track_ids, minlength=len(main))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        main['uniqueness_score'] = np.where(total > 0, distinct / total, 0.0)
+    return data
+
+# One credited artist inside the "['A', "B's"]" list strings
+ARTIST_CREDIT_PATTERN = r"'((?:[^'\\]|\\.)*)'" + r'|"((?:[^"\\]|\\.)*)"'
+
+def collab_cooccurrence(incidence: sparse.csr_matrix) -> dict:
+    """Artist x artist co-occurrence over the collaboration tracks (2+ artists) of a track x artist matrix."""
+    collab = incidence[np.diff(incidence.indptr) > 1]
+    cooccurrence = (collab.T @ collab).tocsr()
+    cooccurrence.setdiag(0)
+    cooccurrence.eliminate_zeros()
+    return {
+        "cooccurrence": cooccurrence,
+        "appearances": np.asarray(collab.sum(axis=0)).ravel().astype(np.int64),  # Collab tracks per artist
+        "tracks": collab.shape[0],
+    }
 
-# --- Loading with animation and session tracking ---
+# --- Graph analytics on sparse adjacency matrices (power iteration, batched BFS) ---
+PAGERANK_DAMPING = 0.85
+BETWEENNESS_PIVOTS = 32
+
+def pagerank(adjacency: sparse.csr_matrix, damping: float = PAGERANK_DAMPING,
+             tol: float = 1e-9, max_iter: int = 100) -> np.ndarray:
+    """Weighted PageRank by power iteration; dangling nodes spread their rank uniformly."""
+    n = adjacency.shape[0]
+    out_weight = np.asarray(adjacency.sum(axis=1)).ravel()
+    inverse = np.divide(1.0, out_weight, out=np.zeros(n), where=out_weight > 0)
+    transition_t = (sparse.diags(inverse) @ adjacency).T.tocsr()
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        dangling = rank[out_weight == 0].sum()
+        updated = damping * (transition_t @ rank + dangling / n) + (1 - damping) / n
+        if np.abs(updated - rank).sum() < tol:
+            return updated
+        rank = updated
+    return rank
+
+def approximate_betweenness(adjacency: sparse.csr_matrix, pivots: int = BETWEENNESS_PIVOTS,
+                            seed: int = 42, batch: int = 8) -> np.ndarray:
+    """
+    Brandes betweenness from a random subset of source nodes, scaled to all n.
+    Sources run `batch` at a time: each BFS level is one sparse x (n x batch) product.
+    """
+    n = adjacency.shape[0]
+    k = min(pivots, n)
+    if k == 0:
+        return np.zeros(0)
+    links = adjacency.astype(bool).astype(np.float64)
+    all_sources = np.random.default_rng(seed).choice(n, size=k, replace=False)
+    total = np.zeros(n)
+    for start in range(0, k, batch):
+        sources = all_sources[start:start + batch]
+        columns = np.arange(len(sources))
+        dist = np.full((n, len(sources)), -1, dtype=np.int32)
+        dist[sources, columns] = 0
+        sigma = np.zeros((n, len(sources)))
+        sigma[sources, columns] = 1.0
+        frontier = sigma.copy()
+        depth = 0
+        while True:
+            reach = links @ frontier
+            new = (reach > 0) & (dist < 0)
+            if not new.any():
+                break
+            depth += 1
+            dist[new] = depth
+            frontier = np.where(new, reach, 0.0)
+            sigma += frontier
+
+        delta = np.zeros_like(sigma)
+        for level in range(depth, 0, -1):
+            at_level = dist == level
+            coefficient = np.where(at_level, (1.0 + delta) / np.where(at_level, sigma, 1.0), 0.0)
+            delta += np.where(dist == level - 1, sigma * (links @ coefficient), 0.0)
+        delta[sources, columns] = 0.0
+        total += delta.sum(axis=1)
+    return total * (n / k) / 2  # Undirected: every path is seen from both ends
+
+def label_propagation(adjacency: sparse.csr_matrix, max_iter: int = 30, seed: int = 42) -> np.ndarray:
+    """
+    Communities by weighted label propagation. Half of the nodes update per round
+    (chosen at random) so synchronous updates cannot oscillate; ties go to the smaller label.
+    """
+    n = adjacency.shape[0]
+    labels = np.arange(n)
+    coo = adjacency.tocoo()
+    rows, cols, weights = coo.row.astype(np.int64), coo.col, coo.data.astype(float)
+    rng = np.random.default_rng(seed)
+    for _ in range(max_iter):
+        keys, inverse = np.unique(rows * n + labels[cols], return_inverse=True)
+        scores = np.bincount(inverse, weights=weights)
+        node, label = keys // n, keys % n
+        best = np.lexsort((label, -scores, node))
+        first = best[np.r_[True, node[best][1:] != node[best][:-1]]]
+        proposal = labels.copy()
+        proposal[node[first]] = label[first]
+        if not (proposal != labels).any():
+            break
+        labels = np.where(rng.random(n) < 0.5, proposal, labels)
+    return pd.factorize(labels)[0]
+
+def _build_collab_graph(data: dict) -> dict:
+    """Parse every credited artist once into a sparse track x artist matrix and its co-occurrence graph."""
+    main = data['main']
+    credits = main['artists'].str.extractall(ARTIST_CREDIT_PATTERN)
+    names = credits[0].fillna(credits[1]).str.strip()
+    track_ids = credits.index.get_level_values(0).to_numpy()
+    artist_ids, credited = pd.factorize(names)
+    incidence = sparse.csr_matrix((np.ones(len(artist_ids), dtype=np.int32), (track_ids, artist_ids)),
+                                  shape=(len(main), len(credited)))
+    incidence.data[:] = 1  # An artist credited twice on one track still counts once
+
+    team_size = np.diff(incidence.indptr)
+    main['artist_count'] = np.where(team_size > 0, team_size, 1).astype(np.int16)
+    data['artist_incidence'] = incidence
+    data['credited_artists'] = credited
+    data['collab_graph'] = collab_cooccurrence(incidence)
+    return data
+
+# --- Sparse artist x year store ---
+# Per (artist, year) track counts and popularity moments in CSR matrices that share one
+# structure. Artist-evolution views slice or roll these up instead of grouping raw tracks.
+class ArtistYearStore:
+    """Sparse artist_code x year matrices of track count, popularity sum, sum of squares and max."""
+
+    STATS = ('count', 'pop_sum', 'pop_sq', 'pop_max')
+
+    def __init__(self, tracks: pd.DataFrame, names: pd.Index, year0: int, n_years: int):
+        tracks = tracks[tracks['artist_code'] >= 0]  # Tracks without a parsable artist are not ranked
+        popularity = tracks['popularity'].astype(float)
+        cells = (tracks[['artist_code', 'year']].assign(popularity=popularity, pop_sq=popularity ** 2)
+                 .groupby(['artist_code', 'year'])
+                 .agg(count=('popularity', 'size'), pop_sum=('popularity', 'sum'),
+                      pop_sq=('pop_sq', 'sum'), pop_max=('popularity', 'max')))
+        codes = cells.index.get_level_values('artist_code').to_numpy()
+        self.names = names
+        self.year0 = year0
+        self.indices = (cells.index.get_level_values('year').to_numpy() - year0).astype(np.int32)
+        self.indptr = np.r_[0, np.cumsum(np.bincount(codes, minlength=len(names)))].astype(np.int32)
+        self.rows = codes.astype(np.int32)
+        self.matrices = {stat: sparse.csr_matrix((cells[stat].to_numpy(dtype=float), self.indices, self.indptr),
+                                                 shape=(len(names), n_years))
+                         for stat in self.STATS}
+
+    @property
+    def nbytes(self) -> int:
+        return (self.indices.nbytes + self.indptr.nbytes + self.rows.nbytes
+                + sum(m.data.nbytes for m in self.matrices.values()))
+
+    def summary(self) -> pd.DataFrame:
+        """First and last year, active years and popularity moments of every artist with tracks."""
+        active = np.diff(self.indptr)
+        artists = np.flatnonzero(active)
+        totals = {stat: np.asarray(m.sum(axis=1)).ravel()[artists] for stat, m in self.matrices.items()}
+        n = totals['count']
+        with np.errstate(invalid="ignore", divide="ignore"):
+            variance = (totals['pop_sq'] - totals['pop_sum'] ** 2 / n) / (n - 1)
+        return pd.DataFrame({
+            'artist_clean': self.names.take(artists),
+            'first_year': self.year0 + self.indices[self.indptr[artists]],
+            'last_year': self.year0 + self.indices[self.indptr[artists + 1] - 1],
+            'active_years': active[artists],
+            'avg_popularity': totals['pop_sum'] / n,
+            'std_popularity': np.sqrt(np.maximum(variance, 0)),
+            'max_popularity': self.matrices['pop_max'].max(axis=1).toarray().ravel()[artists],
+            'track_count': n.astype(np.int64),
+        })
+
+    def window(self, first_year: int, last_year: int) -> pd.DataFrame:
+        """Track count, popularity sum and max per artist over [first_year, last_year], indexed by artist."""
+        columns = slice(max(first_year - self.year0, 0), max(last_year - self.year0 + 1, 0))
+        sliced = {stat: self.matrices[stat][:, columns] for stat in ('count', 'pop_sum', 'pop_max')}
+        counts = np.asarray(sliced['count'].sum(axis=1)).ravel()
+        artists = np.flatnonzero(counts)
+        return pd.DataFrame({
+            'track_count': counts[artists].astype(np.int64),
+            'pop_sum': np.asarray(sliced['pop_sum'].sum(axis=1)).ravel()[artists],
+            'pop_max': sliced['pop_max'].max(axis=1).toarray().ravel()[artists],
+        }, index=pd.Index(self.names.take(artists), name='artist_clean'))
+
+    def rollup(self, width: int, since: int = None) -> pd.DataFrame:
+        """
+        Long frame of (time_period, artist_clean, track_count, pop_sum, pop_max) over periods of
+        `width` years, optionally from `since` on; rows are sorted by artist, then period.
+        """
+        years = self.year0 + self.indices
+        keep = years >= since if since is not None else np.ones(len(years), dtype=bool)
+        rows, periods = self.rows[keep], (years[keep] // width) * width
+        data = {stat: self.matrices[stat].data[keep] for stat in ('count', 'pop_sum', 'pop_max')}
+        if not len(rows):
+            return pd.DataFrame(columns=['time_period', 'artist_clean', 'track_count', 'pop_sum', 'pop_max'])
+        # Entries are sorted by (artist, year), so every (artist, period) cell is a contiguous run
+        starts = np.flatnonzero(np.r_[True, (rows[1:] != rows[:-1]) | (periods[1:] != periods[:-1])])
+        return pd.DataFrame({
+            'time_period': periods[starts],
+            'artist_clean': self.names.take(rows[starts]),
+            'track_count': np.add.reduceat(data['count'], starts).astype(np.int64),
+            'pop_sum': np.add.reduceat(data['pop_sum'], starts),
+            'pop_max': np.maximum.reduceat(data['pop_max'], starts),
+        })
+
+# --- Popularity-ordered top-N scans ---
+TOP_SCAN_CHUNK = 1024  # Rows examined by the first step of a scan; each later step doubles it
+
+def top_track_rows(order: np.ndarray, keys: np.ndarray, n: int, mask: np.ndarray = None) -> np.ndarray:
+    """
+    Catalog rows of the n most popular distinct tracks (first row of each dedup key) among
+    rows where mask is True. `order` lists rows by descending popularity; it is scanned in
+    growing chunks and the scan stops after n tracks, so the cost follows n / selectivity.
+    """
+    found, taken = [], np.zeros(0, dtype=keys.dtype)
+    start, chunk = 0, TOP_SCAN_CHUNK
+    while len(taken) < n and start < len(order):
+        rows = order[start:start + chunk]
+        start, chunk = start + chunk, chunk * 2
+        if mask is not None:
+            rows = rows[mask[rows]]
+        _, first = np.unique(keys[rows], return_index=True)
+        rows = rows[np.sort(first)]  # One row per key, still in popularity order
+        rows = rows[~np.isin(keys[rows], taken)][:n - len(taken)]
+        found.append(rows)
+        taken = np.concatenate([taken, keys[rows]])
+    return np.concatenate(found) if found else np.zeros(0, dtype=order.dtype)
+
+def build_catalog_indexes(data: dict) -> dict:
+    """Integer codes and lookup structures shared by the aggregation kernels."""
+    main = data['main']
+    codes, names = pd.factorize(main['artist_clean'])
+    main['artist_code'] = codes.astype(np.int32)
+    data['artist_names'] = names
+    # A fixed random permutation: "sample k" is "the k lowest ranks in the selection"
+    main['sample_rank'] = np.random.default_rng(42).permutation(len(main)).astype(np.int32)
+    sample_order = np.empty(len(main), dtype=np.int64)
+    sample_order[main['sample_rank'].to_numpy()] = np.arange(len(main))  # Catalog rows by ascending rank
+    data['sample_order'] = sample_order
+    lineup_codes, _ = pd.factorize(main['artists'])  # Full credited line-up, as the sidebar counts it
+    main['artists_code'] = lineup_codes.astype(np.int32)
+    # The same (name, artists) pair released more than once is one track in top-N lists
+    main['track_key'] = main.groupby(['name', 'artists'], sort=False, dropna=False).ngroup().astype(np.int32)
+    data['popularity_order'] = np.argsort(-main['popularity'].to_numpy(), kind='stable')
+    if ARTIST_SKETCH:
+        data['artist_sketch'] = ArtistSketchCube(main, 'artists_code')
+    if not main[CORRELATION_COLUMNS].isna().any().any():
+        data['feature_stats'] = FeatureStatsCube(main)  # Missing values would need pairwise scans
+    data['forecast'] = forecast_trends(data['by_year'])  # Whole-catalog projections for the AI tools
+    data['artist_years'] = ArtistYearStore(main, names, int(main['year'].min()),
+                                           int(main['year'].max() - main['year'].min()) + 1)
+    return data
+
+@st.cache_resource(show_spinner=False)
+def _catalog_store() -> dict:
+    """Process-wide holder for the loaded datasets (shared by all sessions)."""
+    return {"lock": threading.Lock(), "data": None}
+
+def load_data(on_phase=None):
+    """
+    Load data - cached after first load and shared (read-only) by all sessions.
+    Each phase duration is kept under 'timeline' and reported to on_phase(phase, seconds)
+    while it happens, so the caller can drive a real progress UI.
+    """
+    store = _catalog_store()
+    with store["lock"]:
+        if store["data"] is not None:
+            return store["data"]
+        try:
+            timeline = []
+            data = None
+            steps = {
+                "read": _read_datasets,
+                "clean": _clean_datasets,
+                "derive": _derive_columns,
+                "titles": _tokenize_titles,
+                "collabs": _build_collab_graph,
+                "index": build_catalog_indexes,
+            }
+            for phase, step in steps.items():
+                started = time.perf_counter()
+                data = step() if data is None else step(data)
+                elapsed = time.perf_counter() - started
+                timeline.append((phase, elapsed))
+                if on_phase is not None:
+                    on_phase(phase, elapsed)
+
+            data['timeline'] = timeline
+            store["data"] = data
+            return data
+        except FileNotFoundError as e:
+            st.error(f"Erro: Arquivo não encontrado - {e}")
+            return None
+        except Exception as e:
+            st.error(f"Erro ao carregar os dados: {e}")
+            return None
+
+def record_startup_timeline(music_data: dict, session_wait: float, cold_start: bool):
+    """Keep this session's startup phases so they can be inspected later."""
+    st.session_state.startup_timeline = {
+        "phases": list(music_data['timeline']),
+        "cold_start": cold_start,
+        "session_wait_s": session_wait,
+    }
+
+# --- Loading with real phase timings and session tracking ---
 if 'initial_load_complete' not in st.session_state:
-    # First time loading - show animation
+    # First load for this session - report each phase as it actually finishes
     loading_container = st.container()
-    
+
     with loading_container:
         st.markdown("### ⏳ Initializing...")
-        
-        # Create progress bar
         progress_bar = st.progress(0)
         status_text = st.empty()
-        
-        # Step 1: Start loading
-        status_text.text('📂 Locating data files...')
-        progress_bar.progress(20)
-        time.sleep(0.3)  # Brief pause for UX
-        
-        # Step 2: Load data
-        status_text.text('📊 Loading 160,000+ tracks...')
-        progress_bar.progress(40)
-        
-        with st.spinner('Processing music database...'):
-            music_data = load_data()
-        
-        if music_data:
-            # Step 3: Validate
-            status_text.text('✅ Validating data integrity...')
-            progress_bar.progress(60)
-            time.sleep(0.3)
-            
-            # Step 4: Calculate stats
-            status_text.text('📈 Calculating statistics...')
-            progress_bar.progress(80)
-            total_tracks = len(music_data['main'])
-            total_artists = len(music_data['by_artist'])
-            time.sleep(0.3)
-            
-            # Step 5: Complete
-            status_text.text('🎉 Ready!')
-            progress_bar.progress(100)
-            time.sleep(0.5)
-            
-            # Clear loading UI
-            #progress_bar.empty()
-            #status_text.empty()
-            
-            
-            # Show success metrics
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Tracks Loaded", f"{total_tracks:,}")
-            with col2:
-                st.metric("Artists", f"{total_artists:,}")
-            with col3:
-                st.metric("Years", "1921-2020")
-            
-
-            loading_container.empty()
-
-            # Mark as loaded
-            st.session_state.initial_load_complete = True
-            
-            # Auto-clear success message after 3 seconds
-            success_placeholder = st.empty()
-            success_placeholder.success("✅ MusicInsights AI is ready! Explore 100 years of music evolution.")
-            time.sleep(3)
-            success_placeholder.empty()
-            st.rerun()
-
-        else:
-            # Error occurred
-            progress_bar.empty()
-            status_text.empty()
-            st.error("❌ Failed to load data. Please check the data files.")
-            st.stop()
+        phases_done = []
+
+        def _report_phase(phase: str, seconds: float):
+            phases_done.append(phase)
+            progress_bar.progress(len(phases_done) / len(STARTUP_PHASES))
+            status_text.text(f"{STARTUP_PHASES[phase]}: {seconds * 1000:.0f} ms")
+
+        load_started = time.perf_counter()
+        music_data = load_data(on_phase=_report_phase)
+        session_wait = time.perf_counter() - load_started
+
+    if music_data:
+        # phases_done stays empty when another session already warmed the cache
+        record_startup_timeline(music_data, session_wait, cold_start=bool(phases_done))
+        loading_container.empty()
+        st.session_state.initial_load_complete = True
+    else:
+        # Error occurred
+        loading_container.empty()
+        st.error("❌ Failed to load data. Please check the data files.")
+        st.stop()
 else:
     # Subsequent runs - load instantly from cache
     music_data = load_data()
-    # Ensure any stray success messages are cleared
-    st.empty()
 
 
 # After loading, show quick stats
@@ -857,6 +2027,7 @@ if music_data and 'stats_shown' not in st.session_state:
         - {len(music_data['by_artist']):,} artists 
         - {len(music_data['by_genres']):,} genres
         - 100 years of music ✨
+        - ready in {st.session_state.startup_timeline['session_wait_s']:.2f}s
         """,
         icon="✅"  # <--- This makes it look like a "success" toast
     )
@@ -944,19 +2115,38 @@ st.sidebar.markdown("---")
 
 # ADD DATASET STATS 
 
-def display_sidebar_stats(music_data, df_filtered=None):
+SIDEBAR_EMPTY = {"tracks": 0, "years": "N/A", "artists": 0, "avg_pop": 0, "explicit": 0, "approximate": False}
+
+@bounded_cache
+def sidebar_stats(df_tracks: pd.DataFrame) -> dict:
+    """Sidebar card numbers for one selection; distinct artists counted on the integer line-up codes."""
+    if df_tracks.empty:
+        return SIDEBAR_EMPTY
+    codes = df_tracks['artists_code'].to_numpy()
+    return {
+        "tracks": len(df_tracks),
+        "years": f"{int(df_tracks['year'].min())}-{int(df_tracks['year'].max())}",
+        "artists": int(np.count_nonzero(np.bincount(codes[codes >= 0]))),
+        "avg_pop": float(df_tracks['popularity'].mean()),
+        "explicit": int(df_tracks['explicit'].sum()) if 'explicit' in df_tracks.columns else 0,
+        "approximate": False,
+    }
+
+def display_sidebar_stats(music_data, df_filtered=None, filters=None):
     total_tracks = len(music_data['main'])
     current_df = df_filtered if df_filtered is not None else music_data['main']
-    current_tracks = len(current_df)
-    percentage = (current_tracks / total_tracks * 100) if total_tracks else 0
 
-    if current_tracks:
-        years = f"{int(current_df['year'].min())}-{int(current_df['year'].max())}"
-        artists = current_df['artists'].nunique()
-        avg_pop = current_df['popularity'].mean()
-        explicit_count = int(current_df['explicit'].sum()) if 'explicit' in current_df.columns else 0
-    else:
-        years, artists, avg_pop, explicit_count = "N/A", 0, 0, 0
+    # The sketch cube answers cell-aligned filters without touching rows
+    stats = None
+    if filters is not None and music_data.get('artist_sketch') is not None:
+        stats = music_data['artist_sketch'].stats(filters)
+    if stats is None:
+        stats = sidebar_stats(current_df)
+
+    current_tracks = stats["tracks"]
+    percentage = (current_tracks / total_tracks * 100) if total_tracks else 0
+    years, avg_pop, explicit_count = stats["years"], stats["avg_pop"], stats["explicit"]
+    artists = f"≈{stats['artists']:,}" if stats["approximate"] else f"{stats['artists']:,}"
 
     st.sidebar.markdown(f"""
     <div style="background: linear-gradient(135deg, #1a1a1a, #2a2a2a); border: 2px solid #1DB954; border-radius: 12px; padding: 15px; margin: 10px 0;">
@@ -971,7 +2161,7 @@ def display_sidebar_stats(music_data, df_filtered=None):
           <div style="color:#666; font-size:12px;">Years</div>
         </div>
         <div style="background:#0a0a0a; padding:8px; border-radius:6px; text-align:center;">
-          <div style="color:#1DB954; font-weight:bold;">{artists:,}</div>
+          <div style="color:#1DB954; font-weight:bold;">{artists}</div>
           <div style="color:#666; font-size:12px;">Artists</div>
         </div>
         <div style="background:#0a0a0a; padding:8px; border-radius:6px; text-align:center;">
@@ -987,6 +2177,91 @@ def display_sidebar_stats(music_data, df_filtered=None):
     """, unsafe_allow_html=True)
 
 
+# --------------------------------------------------------
+# PERFORMANCE DIAGNOSTICS
+# --------------------------------------------------------
+RERUN_HISTORY_SIZE = 200
+
+def record_rerun_latency(kind: str, seconds: float):
+    """Append one rerun duration ('full_run' or 'fragment_rerun') to this session's history."""
+    history = st.session_state.setdefault('rerun_latency', {})
+    samples = history.setdefault(kind, [])
+    samples.append(seconds)
+    del samples[:-RERUN_HISTORY_SIZE]
+
+def render_performance_diagnostics():
+    """Shows what this session actually spent its time on."""
+    st.markdown("#### ⏱️ Startup Timeline")
+    timeline = st.session_state.get('startup_timeline')
+    if not timeline:
+        st.info("No startup timeline recorded for this session.")
+        return
+
+    source = "cold start (this session loaded the data)" if timeline['cold_start'] else "warm cache (loaded by an earlier session)"
+    st.caption(f"Session waited {timeline['session_wait_s']:.2f}s - {source}.")
+    phases_df = pd.DataFrame(timeline['phases'], columns=['phase', 'seconds'])
+    phases_df['phase'] = phases_df['phase'].map(STARTUP_PHASES)
+    phases_df['ms'] = (phases_df['seconds'] * 1000).round(1)
+    st.dataframe(phases_df[['phase', 'ms']], hide_index=True, use_container_width=True)
+
+    st.markdown("#### 🔁 Rerun Latency")
+    history = st.session_state.get('rerun_latency', {})
+    if not history:
+        st.info("No reruns recorded yet.")
+    else:
+        latency_df = pd.DataFrame([
+            {
+                'rerun': kind.replace('_', ' '),
+                'count': len(samples),
+                'median ms': np.median(samples) * 1000,
+                'p95 ms': np.percentile(samples, 95) * 1000,
+                'last ms': samples[-1] * 1000,
+            }
+            for kind, samples in history.items()
+        ]).round(1)
+        st.dataframe(latency_df, hide_index=True, use_container_width=True)
+        st.caption("A full run rebuilds the sidebar, filters and every card; a fragment rerun only re-executes the active Dashboard view.")
+
+    st.markdown("#### 🧠 Result Cache")
+    st.caption(f"{RESULT_CACHE.total_bytes / 1024**2:.1f} MB used of a {CACHE_BUDGET_MB:.0f} MB budget (shared by all sessions, least recently used evicted first).")
+    st.dataframe(RESULT_CACHE.stats_frame(), hide_index=True, use_container_width=True)
+
+    st.markdown("#### 🖼️ Figure Cache")
+    st.caption(f"{FIGURE_CACHE.total_bytes / 1024**2:.1f} MB of serialized figures in a {FIGURE_CACHE_MB:.0f} MB budget. "
+               "Each hit is a rerun that skipped building the chart.")
+    st.dataframe(FIGURE_CACHE.stats_frame().rename(columns={"function": "view"}), hide_index=True, use_container_width=True)
+
+    st.markdown("#### 📦 Chart Payloads")
+    payload_bytes = st.session_state.get('chart_payload_bytes', {})
+    if not payload_bytes:
+        st.info("No Dashboard charts drawn yet.")
+    else:
+        st.dataframe(pd.DataFrame([{'chart': view, 'KB': round(n / 1024, 1)} for view, n in payload_bytes.items()]),
+                     hide_index=True, use_container_width=True)
+        st.caption("Last serialized size of each chart. Turn on 📏 Measure Render Time in the Dashboard for browser draw times.")
+
+    st.markdown("#### 💾 Disk Cache")
+    if DISK_CACHE is None:
+        st.info("Disk cache disabled (Parquet support unavailable or cache directory not writable).")
+    else:
+        disk_stats = DISK_CACHE.stats()
+        st.caption(f"`{DISK_CACHE.directory}` - {disk_stats['files']} files, {disk_stats['MB']:.1f} MB of {DISK_CACHE_BUDGET_MB:.0f} MB (data version {DATA_VERSION}, code version {CODE_VERSION}).")
+        st.dataframe(pd.DataFrame([{k: disk_stats[k] for k in ["hits", "misses", "writes", "evictions", "errors"]}]),
+                     hide_index=True, use_container_width=True)
+
+    st.markdown("#### 🧵 Background Precompute")
+    batch = st.session_state.get('view_precompute')
+    if PRECOMPUTE_WORKERS <= 0:
+        st.info("Background precompute disabled (MUSICINSIGHTS_PRECOMPUTE_WORKERS=0).")
+    elif batch is None:
+        st.info("No views precomputed yet - open the Dashboard tab.")
+    else:
+        status_df = batch.status_frame()
+        st.caption(f"{(status_df['state'] == 'ready').sum()} of {len(status_df)} views warmed for the current filters "
+                   f"({PRECOMPUTE_WORKERS} worker threads shared by all sessions).")
+        st.dataframe(status_df, hide_index=True, use_container_width=True)
+
+
 # --------------------------------------------------------
 # CRIAR A FERRAMENTA CUSTOMIZADA COM IA
 # --------------------------------------------------------
@@ -1002,13 +2277,18 @@ def PythonCodeExecutor(code: str) -> str:
         - df_artist  -> data_by_artist.csv (aggregated by artist)
         - df_genres  -> data_by_genres.csv (aggregated by genre)
         - df_w_genres-> data_w_genres.csv (tracks with genres)
+        - df_forecast-> projections of the yearly means (feature, model, year, forecast, lower, upper)
+        - top_tracks(n, where=None) -> the n most popular distinct tracks of df, optionally
+          only rows where the boolean Series or array `where` is True
         - pd, np are available
     - Always verify results with the real data above.
     - Use print(...) to output your results. The tool captures stdout.
 
     Examples:
     - print(df['popularity'].mean())
+    - print(top_tracks(10, where=df['year'] == 1990)[['name', 'artists', 'popularity']])
     - print(df_year[['year','danceability','energy','valence']].corr()['popularity'])
+    - print(df_forecast[(df_forecast['model'] == 'linear') & (df_forecast['year'] == df_forecast['year'].max())])
     - subset = df_w_genres[df_w_genres['genres'].str.contains('hip hop', case=False, na=False)]
       print(subset[subset['year'].between(1990, 1999)][['energy','popularity']].corr())
     """
@@ -1020,18 +2300,34 @@ def PythonCodeExecutor(code: str) -> str:
             return "ERROR: Datasets not loaded."
 
         # Expose SAFE copies of DataFrames
-        df_tracks = music_data["main"].copy()
+        df_tracks = music_data["main"].drop(columns=['decade'] + CATALOG_INTERNAL_COLUMNS)
         df_year = music_data["by_year"].copy()
         df_artist = music_data["by_artist"].copy()
         df_genres = music_data["by_genres"].copy()
         df_w_genres = music_data["with_genres"].copy()
+        df_forecast = music_data["forecast"].copy()
 
         # Default 'df' alias to tracks-level dataset
         df = df_tracks
 
+        def top_tracks(n: int = 10, where=None) -> pd.DataFrame:
+            """
+            Scan the load-time popularity order instead of sorting the whole frame. Rows are
+            matched by catalog label, so in-place sorts or drops on df_tracks do not shift them;
+            `where` is a boolean Series (aligned by label) or array-like (aligned to df_tracks).
+            """
+            catalog = music_data["main"]
+            mask = catalog.index.isin(df_tracks.index)  # Rows the agent code dropped stay out
+            if where is not None:
+                if not isinstance(where, pd.Series):
+                    where = pd.Series(np.asarray(where, dtype=bool), index=df_tracks.index)
+                mask &= where.reindex(catalog.index, fill_value=False).to_numpy(dtype=bool)
+            rows = top_track_rows(music_data["popularity_order"], catalog["track_key"].to_numpy(), n, mask)
+            return df_tracks.loc[catalog.index[rows]]
+
         # Basic anti-fabrication (disallow creating DataFrame from dict literal)
         if "pd.DataFrame" in code and "{" in code:
-            return "ERROR: Do NOT create fake DataFrames. Use the provided DataFrames only (df, df_tracks, df_year, df_artist, df_genres, df_w_genres)."
+            return "ERROR: Do NOT create fake DataFrames. Use the provided DataFrames only (df, df_tracks, df_year, df_artist, df_genres, df_w_genres, df_forecast)."
 
         # Execute in a controlled namespace
         exec_env = {
@@ -1043,6 +2339,8 @@ def PythonCodeExecutor(code: str) -> str:
             "df_artist": df_artist,
             "df_genres": df_genres,
             "df_w_genres": df_w_genres,
+            "df_forecast": df_forecast,
+            "top_tracks": top_tracks,
         }
         exec(code, exec_env, {})
 
@@ -1065,15 +2363,16 @@ tools = [PythonCodeExecutor]
 # --- Main Content Area ---
 if music_data is not None:
     
-    # Get main dataframe
-    df = music_data['main'].copy()
+    # Data version keys the persistent disk cache
+    DATA_VERSION = music_data['data_version']
+
+    # Get main dataframe (shared across sessions - treat as read-only)
+    df = music_data['main']
+    artist_names = music_data['artist_names']
     df_year = music_data['by_year'].copy()
     df_genres = music_data['by_genres'].copy()
     df_artist = music_data['by_artist'].copy()
     
-    # Add decade column globally
-    df['decade'] = (df['year'] // 10) * 10
-    
     # --- Key Mapping ---
     KEY_MAP = {0:'C',1:'C#',2:'D',3:'D#',4:'E',5:'F',6:'F#',7:'G',8:'G#',9:'A',10:'A#',11:'B'}
     key_options = list(KEY_MAP.values())
@@ -1337,7 +2636,7 @@ if music_data is not None:
         live_range: tuple[float, float]
         speech_range: tuple[float, float]
 
-    @st.cache_data(show_spinner=False)
+    @bounded_cache
     def filter_tracks(df: pd.DataFrame, f: FilterState) -> pd.DataFrame:
         # These first two lines are from your existing code
         q = df[(df["year"] >= f.year_start) & (df["year"] <= f.year_end)]
@@ -1394,7 +2693,7 @@ if music_data is not None:
         st.session_state.data_ready = True
 
     # --- Aggregators (respect current filters) ---
-    @st.cache_data(show_spinner=False)
+    @bounded_cache(persist=True)
     def aggregate_by_year(df_tracks: pd.DataFrame) -> pd.DataFrame:
         if df_tracks.empty:
             return pd.DataFrame(columns=["year","popularity","energy","danceability","valence","acousticness","instrumentalness","speechiness","liveness","loudness","tempo","duration_ms"])
@@ -1412,7 +2711,7 @@ if music_data is not None:
                 duration_ms=("duration_ms","mean")))
         return agg
 
-    @st.cache_data(show_spinner=False)
+    @bounded_cache(persist=True)
     def aggregate_by_artist(df_tracks: pd.DataFrame) -> pd.DataFrame:
         if df_tracks.empty:
             return pd.DataFrame(columns=["artist_clean","popularity","energy","valence","count"])
@@ -1427,7 +2726,7 @@ if music_data is not None:
                 count=("name","count")))
         return agg
 
-    @st.cache_data(show_spinner=False)
+    @bounded_cache(persist=True)
     def align_genre_frame(df_w_genres: pd.DataFrame, f: FilterState) -> pd.DataFrame:
         g = df_w_genres.copy()
         # Apply what we can (may not have explicit/key in this table)
@@ -1440,7 +2739,7 @@ if music_data is not None:
             g = g[g["explicit"] == want]
         return g
 
-    @st.cache_data(show_spinner=False)
+    @bounded_cache(persist=True)
     def aggregate_by_genre(df_w_genres_filtered: pd.DataFrame) -> pd.DataFrame:
         if df_w_genres_filtered.empty:
             return pd.DataFrame(columns=["genres","popularity","energy","danceability","valence","acousticness","speechiness","tempo"])
@@ -1453,7 +2752,397 @@ if music_data is not None:
                 speechiness=("speechiness","mean"),
                 tempo=("tempo","mean")))
         return agg
-    
+
+    # Serialized figures drawn by the active view in this run, for payload and render-time stats
+    CHART_PAYLOADS = {}
+
+    def view_figure(view: str, params: tuple, build):
+        """Memoized figure for a view under the current filters; params are its widget values."""
+        webgl = st.session_state.get('webgl_charts', True)
+        key = (DATA_VERSION, cache_key_part(filters), webgl) + tuple(params)
+        fig, payload = cached_figure(view, key, (lambda: compact_figure(build())) if webgl else build)
+        CHART_PAYLOADS[view] = payload
+        st.session_state.setdefault('chart_payload_bytes', {})[view] = len(payload)
+        return fig
+
+    # --- Per-view data prep (depends on filters only, never on a view's widgets) ---
+    # Views slice these results with their own controls, which lets the background
+    # precompute warm them for every view as soon as the filters change.
+    AUDIO_FEATURES = ['danceability', 'energy', 'valence', 'acousticness',
+                      'instrumentalness', 'liveness', 'loudness', 'speechiness']
+    POPULARITY_FEATURES = AUDIO_FEATURES + ['popularity']
+
+    SAMPLE_RANK = df['sample_rank'].to_numpy()
+    SAMPLE_ORDER = music_data['sample_order']
+
+    @bounded_cache
+    def sample_tracks(df_tracks: pd.DataFrame, n: int) -> pd.DataFrame:
+        """The n lowest-ranked rows: stable across reruns and views, and nested (smaller n is a prefix)."""
+        if len(df_tracks) <= n:
+            return df_tracks
+        ranks = SAMPLE_RANK[df_tracks.index.to_numpy()]  # Row labels are catalog positions
+        lowest = np.argpartition(ranks, n - 1)[:n]
+        return df_tracks.iloc[lowest[np.argsort(ranks[lowest])]]
+
+    def tracks_in_decades(df_tracks: pd.DataFrame, decades: tuple) -> pd.DataFrame:
+        return df_tracks[(df_tracks['decade'] >= decades[0]) & (df_tracks['decade'] <= decades[1])]
+
+    # --- Server-side rasterization ---
+    # Large point clouds are binned on the server into a fixed grid, so a chart shows
+    # every filtered track while its payload stays the same size at any selectivity.
+    RASTER_BINS = (160, 120)
+
+    def _raster_edges(values: np.ndarray, n_bins: int) -> np.ndarray:
+        lo, hi = float(values.min()), float(values.max())
+        if values.dtype.kind in "iu" and hi - lo + 1 <= n_bins:
+            return np.arange(lo - 0.5, hi + 1.5)  # One bin per integer value (e.g. popularity)
+        if hi == lo:
+            lo, hi = lo - 0.5, hi + 0.5
+        return np.linspace(lo, hi, n_bins + 1)
+
+    @bounded_cache
+    def raster_grid(df_tracks: pd.DataFrame, x: str, y: str, bins: tuple, value: str = None) -> dict:
+        """Every track binned into an (x, y) grid: counts per cell and, optionally, the mean of `value`."""
+        xs = df_tracks[x].to_numpy()
+        ys = df_tracks[y].to_numpy()
+        x_edges = _raster_edges(xs, bins[0])
+        y_edges = _raster_edges(ys, bins[1])
+        counts, _, _ = np.histogram2d(xs, ys, bins=[x_edges, y_edges])
+        grid = {
+            "x": (x_edges[:-1] + x_edges[1:]) / 2,
+            "y": (y_edges[:-1] + y_edges[1:]) / 2,
+            "count": counts.T,  # Rows follow y, as go.Heatmap expects
+            "n": len(xs),
+        }
+        if value is not None:
+            sums, _, _ = np.histogram2d(xs, ys, bins=[x_edges, y_edges], weights=df_tracks[value].to_numpy())
+            with np.errstate(invalid="ignore", divide="ignore"):
+                grid["mean"] = np.where(counts > 0, sums / counts, np.nan).T
+        return grid
+
+    def raster_figure(grid: dict, title: str, x_label: str, y_label: str, value_label: str = None,
+                      log_density: bool = True, colorscale: str = "Viridis") -> go.Figure:
+        """Heatmap of a raster grid: track density (log or linear), or the per-cell mean of the value column."""
+        counts = grid["count"]
+        if value_label is None and not log_density:
+            # Plain 2D histogram, the exact counts px.density_heatmap would have binned in the browser
+            z = counts
+            colorbar = dict(title="count")
+            hover = f"{x_label}: %{{x:.3g}}<br>{y_label}: %{{y:.3g}}<br>count: %{{z:,.0f}}<extra></extra>"
+            counts = None
+        elif value_label is None:
+            z = np.where(counts > 0, np.log10(counts + 1), np.nan)  # Log scale keeps sparse regions visible
+            colorbar = dict(title="Tracks", tickvals=[0, 1, 2, 3, 4], ticktext=["1", "10", "100", "1k", "10k"])
+            hover = f"{x_label}: %{{x:.3g}}<br>{y_label}: %{{y:.3g}}<br>Tracks: %{{customdata:,.0f}}<extra></extra>"
+        else:
+            z = grid["mean"]
+            colorbar = dict(title=value_label)
+            hover = (f"{x_label}: %{{x:.3g}}<br>{y_label}: %{{y:.3g}}<br>{value_label}: %{{z:.1f}}"
+                     "<br>Tracks: %{customdata:,.0f}<extra></extra>")
+            colorscale = "Plasma"
+        fig = go.Figure(go.Heatmap(x=grid["x"], y=grid["y"], z=z, customdata=counts,
+                                   colorscale=colorscale, colorbar=colorbar, hovertemplate=hover))
+        fig.update_layout(title=f"{title} ({grid['n']:,} tracks)", xaxis_title=x_label, yaxis_title=y_label)
+        return fig
+
+    FEATURE_LEVELS = ('Very Low', 'Low', 'Medium', 'High', 'Very High')
+
+    @bounded_cache
+    def feature_moments(df_tracks: pd.DataFrame, f: FilterState = None) -> tuple:
+        """
+        (n, means, population covariance) of CORRELATION_COLUMNS for the selection. With the
+        FilterState that produced it, cell-aligned filters are assembled from the cube; others
+        scan the rows.
+        """
+        if f is not None and music_data.get('feature_stats') is not None:
+            moments = music_data['feature_stats'].moments(f)
+            if moments is not None:
+                return moments
+        values = df_tracks[CORRELATION_COLUMNS]
+        return len(values), values.mean().to_numpy(), values.cov(ddof=0).to_numpy()
+
+    @bounded_cache
+    def feature_correlation_matrix(df_tracks: pd.DataFrame, f: FilterState = None) -> pd.DataFrame:
+        _, _, covariance = feature_moments(df_tracks, f)
+        return pd.DataFrame(correlation_from_covariance(covariance),
+                            index=CORRELATION_COLUMNS, columns=CORRELATION_COLUMNS)
+
+    @bounded_cache
+    def popularity_trends(df_tracks: pd.DataFrame, f: FilterState = None) -> LinearFit:
+        """Popularity regressed on every CORRELATION_COLUMNS feature at once (entries in that order)."""
+        n, mean, covariance = feature_moments(df_tracks, f)
+        p = CORRELATION_COLUMNS.index('popularity')
+        return fit_from_moments(n, mean, mean[p], n * np.diag(covariance),
+                                n * covariance[p, p], n * covariance[:, p])
+
+    @bounded_cache
+    def feature_forecast(df_tracks: pd.DataFrame) -> pd.DataFrame:
+        """forecast_trends over the selection's yearly means."""
+        return forecast_trends(aggregate_by_year(df_tracks))
+
+    @bounded_cache
+    def success_formula(df_tracks: pd.DataFrame) -> pd.DataFrame:
+        success_level = pd.cut(df_tracks['popularity'], bins=[0, 30, 60, 100],
+                               labels=['Low', 'Medium', 'High']).rename('success_level')
+        return df_tracks.groupby(success_level, observed=True)[AUDIO_FEATURES].mean()
+
+    @bounded_cache
+    def explicit_frame(df_tracks: pd.DataFrame) -> pd.DataFrame:
+        slim = df_tracks[['explicit', 'popularity', 'energy', 'danceability', 'valence', 'speechiness']].copy()
+        slim['explicit_label'] = slim['explicit'].map({0: 'Clean', 1: 'Explicit'})
+        return slim
+
+    @bounded_cache
+    def explicit_by_year(df_tracks: pd.DataFrame) -> pd.DataFrame:
+        by_year = (df_tracks.groupby(['year', 'explicit'])['popularity']
+                   .agg(count='size', popularity='mean').reset_index())
+        by_year['explicit_label'] = by_year['explicit'].map({0: 'Clean', 1: 'Explicit'})
+        return by_year
+
+    @bounded_cache
+    def key_mode_summary(df_tracks: pd.DataFrame) -> pd.DataFrame:
+        summary = (df_tracks.groupby(['key', 'mode'])['popularity']
+                   .agg(count='size', popularity='mean').reset_index())
+        summary['key_name'] = summary['key'].map(KEY_MAP)
+        summary['mode_name'] = summary['mode'].map({0: 'Minor', 1: 'Major'})
+        return summary
+
+    @bounded_cache
+    def decade_feature_stats(df_tracks: pd.DataFrame) -> pd.DataFrame:
+        return df_tracks.groupby('decade')[AUDIO_FEATURES].agg(['mean', 'std'])
+
+    @bounded_cache
+    def tempo_zone_summary(df_tracks: pd.DataFrame) -> dict:
+        bpm_zone = pd.cut(df_tracks['tempo'], bins=[0, 80, 100, 120, 140, np.inf],
+                          labels=['Slow (<80)', 'Moderate (80-100)', 'Dance (100-120)',
+                                  'Fast (120-140)', 'Very Fast (>140)']).rename('bpm_zone')
+        success = df_tracks.groupby(bpm_zone, observed=True)['popularity'].agg(['mean', 'std', 'count']).reset_index()
+        evolution = df_tracks.groupby([df_tracks['decade'], bpm_zone], observed=True).size().reset_index(name='count')
+        return {"success": success, "evolution": evolution}
+
+    @bounded_cache
+    def era_popularity(df_tracks: pd.DataFrame) -> pd.DataFrame:
+        era = pd.cut(df_tracks['year'], bins=[0, 1960, 1980, 1990, 2000, 2010, 2025],
+                     labels=['Pre-1960', '1960s-70s', '1980s', '1990s', '2000s', '2010s+']).rename('era')
+        return df_tracks.groupby(era, observed=True)['popularity'].agg(['mean', 'std']).reset_index()
+
+    @bounded_cache
+    def timeless_features(df_tracks: pd.DataFrame) -> pd.DataFrame:
+        is_timeless = (df_tracks['popularity'] > df_tracks['popularity'].quantile(0.7)).rename('is_timeless')
+        return df_tracks.groupby(is_timeless)[['energy', 'danceability', 'valence', 'acousticness']].mean().T
+
+    @bounded_cache
+    def artist_year_store(df_tracks: pd.DataFrame) -> ArtistYearStore:
+        """The selection's sparse artist x year store; the whole catalog reuses the load-time one."""
+        store = music_data['artist_years']
+        if len(df_tracks) == len(df):
+            return store
+        return ArtistYearStore(df_tracks, artist_names, store.year0, store.matrices['count'].shape[1])
+
+    def top_k_per_group(frame: pd.DataFrame, group: str, score: str, k: int) -> pd.DataFrame:
+        """
+        The k highest-`score` rows of every `group` value with their 1-based `rank`, from a single
+        sort of the whole frame (groups ascending, ties kept in frame order).
+        """
+        groups = frame[group].to_numpy()
+        order = np.lexsort((-frame[score].to_numpy(), groups))
+        sorted_groups = groups[order]
+        positions = np.arange(len(order))
+        starts = np.r_[True, sorted_groups[1:] != sorted_groups[:-1]] if len(order) else np.zeros(0, dtype=bool)
+        ranks = positions - np.maximum.accumulate(np.where(starts, positions, 0)) + 1
+        keep = ranks <= k
+        return frame.iloc[order[keep]].assign(rank=ranks[keep])
+
+    # Weights of an artist's decade average, best track and volume in its dominance score
+    DOMINANCE_WEIGHTS = {'avg_popularity': 0.5, 'max_popularity': 0.3, 'track_count': 0.2}
+
+    @bounded_cache
+    def decade_dominance(df_tracks: pd.DataFrame, k: int = 10) -> pd.DataFrame:
+        """Top-k artists by dominance score in every decade, from the artist x year store's decade rollup."""
+        rolled = artist_year_store(df_tracks).rollup(10).sort_values('artist_clean', kind='stable')
+        artist_stats = pd.DataFrame({
+            'decade': rolled['time_period'], 'artist_clean': rolled['artist_clean'],
+            'avg_popularity': (rolled['pop_sum'] / rolled['track_count']).round(2),
+            'max_popularity': rolled['pop_max'], 'track_count': rolled['track_count'],
+        })
+        artist_stats['dominance_score'] = sum(artist_stats[column] * weight
+                                              for column, weight in DOMINANCE_WEIGHTS.items())
+        top = top_k_per_group(artist_stats, 'decade', 'dominance_score', k)
+        return top.assign(artist=top['artist_clean'].str[:30])
+
+    @bounded_cache
+    def decade_lineup_leaders(df_tracks: pd.DataFrame, k: int = 20) -> pd.DataFrame:
+        """Top-k credited line-ups by average popularity in every decade, from one groupby."""
+        lineup_pop = df_tracks.groupby(['decade', 'artists'])['popularity'].mean().reset_index()
+        return top_k_per_group(lineup_pop, 'decade', 'popularity', k)
+
+    @bounded_cache
+    def title_features(df_tracks: pd.DataFrame) -> pd.DataFrame:
+        """Titled tracks with the load-time title columns."""
+        return df_tracks.loc[df_tracks['name'].notna(), TITLE_COLUMNS]
+
+    TITLE_COLUMNS = ['name', 'popularity', 'decade', 'title_length', 'title_word_count', 'uniqueness_score',
+                     'title_has_feat', 'title_has_parens', 'title_has_digit', 'title_all_caps']
+    TITLE_PATTERN_LABELS = {
+        'title_has_feat': 'Features (ft.)', 'title_has_parens': 'Parentheses ( )',
+        'title_has_digit': 'Numbers (e.g., 2020)', 'title_all_caps': 'ALL CAPS',
+    }
+    title_words = music_data['title_words']
+    title_word_index = music_data['title_word_index']
+    TRACK_POPULARITY = df['popularity'].to_numpy(dtype=float)
+
+    @bounded_cache
+    def title_word_frequencies(df_tracks: pd.DataFrame) -> pd.DataFrame:
+        """Occurrences and popularity sum of every title word in the selection, summed along the inverted index."""
+        if len(df_tracks) == len(df):
+            return title_words  # The whole catalog: the load-time totals already answer it
+        selected = np.zeros(len(df), dtype=bool)
+        selected[df_tracks.index.to_numpy()] = True
+        postings = title_word_index['track_ids']
+        hits = selected[postings]
+        starts = title_word_index['offsets'][:-1]
+        return title_words.assign(
+            count=np.add.reduceat(hits.astype(np.int64), starts),
+            pop_sum=np.add.reduceat(np.where(hits, TRACK_POPULARITY[postings], 0.0), starts),
+        )
+
+    @bounded_cache
+    def stop_word_mask(stop_set: str) -> np.ndarray:
+        words = title_words['word']
+        return (words.isin(STOP_WORD_SETS[stop_set]) | (words.str.len() < MIN_WORD_LENGTH)).to_numpy()
+
+    # Word cloud styles: name -> (background, matplotlib colormap)
+    WORD_CLOUD_STYLES = {"Summer": ("black", "summer"), "Spotify": ("#181818", "Greens"), "Sunset": ("black", "plasma")}
+    WORD_CLOUD_WORDS = 200
+
+    @bounded_cache
+    def word_cloud_png(df_tracks: pd.DataFrame, quantile: float, style: str) -> bytes:
+        """
+        Word cloud of the titles at or above the popularity quantile, as PNG bytes.
+        Drawn straight from word counts with no matplotlib figure, so nothing is left open.
+        """
+        popular = df_tracks[df_tracks['popularity'] >= df_tracks['popularity'].quantile(quantile)]
+        words = top_title_words(popular, WORD_CLOUD_WORDS, "word_cloud")
+        if words.empty:
+            return b""
+        background, colormap = WORD_CLOUD_STYLES[style]
+        cloud = WordCloud(width=800, height=400, background_color=background, colormap=colormap,
+                          min_font_size=10, random_state=42)
+        image = cloud.generate_from_frequencies(dict(zip(words['word'], words['count'].astype(float)))).to_image()
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def top_title_words(df_tracks: pd.DataFrame, k: int, stop_set: str) -> pd.DataFrame:
+        """The k most frequent non-stop words in the selection's titles, with their average popularity."""
+        freq = title_word_frequencies(df_tracks)
+        counts = np.where(stop_word_mask(stop_set), 0, freq['count'].to_numpy())
+        top = np.argsort(-counts, kind='stable')[:k]
+        top = top[counts[top] > 0]
+        return pd.DataFrame({
+            'word': freq['word'].to_numpy()[top],
+            'count': counts[top],
+            'avg_popularity': freq['pop_sum'].to_numpy()[top] / counts[top],
+        })
+
+    @bounded_cache
+    def collab_frame(df_tracks: pd.DataFrame) -> pd.DataFrame:
+        collab = df_tracks.loc[df_tracks['artists'].notna(), ['artists', 'year', 'popularity', 'artist_count']]
+        return collab.assign(is_collab=collab['artist_count'] > 1)
+
+    ARTIST_INCIDENCE = music_data['artist_incidence']
+    credited_artists = music_data['credited_artists']
+
+    @bounded_cache
+    def collab_graph(df_tracks: pd.DataFrame) -> dict:
+        """The co-occurrence graph restricted to the selection's tracks (row slice of the incidence matrix)."""
+        if len(df_tracks) == len(df):
+            return music_data['collab_graph']
+        return collab_cooccurrence(ARTIST_INCIDENCE[df_tracks.index.to_numpy()])
+
+    @bounded_cache
+    def collab_centrality(df_tracks: pd.DataFrame) -> pd.DataFrame:
+        """Influence (PageRank), reach (degree), brokerage (approx. betweenness) and community per collaborating artist."""
+        graph = collab_graph(df_tracks)
+        cooccurrence = graph["cooccurrence"]
+        nodes = np.flatnonzero(np.diff(cooccurrence.indptr) > 0)
+        adjacency = cooccurrence[nodes][:, nodes].astype(np.float64)
+        return pd.DataFrame({
+            'artist': credited_artists[nodes],
+            'collab_tracks': graph["appearances"][nodes],
+            'degree': np.diff(adjacency.indptr),
+            'pagerank': pagerank(adjacency),
+            'betweenness': approximate_betweenness(adjacency),
+            'community': label_propagation(adjacency),
+        })
+
+    # --- Progressive rendering: sampled estimate first, exact view when the worker finishes ---
+    PROGRESSIVE_SAMPLE = 5000
+
+    @bounded_cache
+    def stratified_sample(df_tracks: pd.DataFrame, by: str, n: int) -> pd.DataFrame:
+        """The lowest-ranked rows of every `by` stratum (an equal share of n each), so thin strata still show."""
+        selected = np.zeros(len(df), dtype=bool)
+        selected[df_tracks.index.to_numpy()] = True  # Row labels are catalog positions
+        rows = SAMPLE_ORDER[selected[SAMPLE_ORDER]]  # The selection in rank order, without sorting it
+        strata = df[by].to_numpy()[rows]
+        codes, uniques = pd.factorize(strata)
+        if not len(uniques):
+            return df_tracks.iloc[:0]
+        by_stratum = np.argsort(codes.astype(np.int16), kind='stable')  # Radix sort over the few stratum codes
+        starts = np.searchsorted(codes[by_stratum], np.arange(len(uniques)))
+        position = np.empty(len(rows), dtype=np.int64)  # Rank within the stratum
+        position[by_stratum] = np.arange(len(rows)) - np.repeat(starts, np.bincount(codes, minlength=len(uniques)))
+        return df_tracks.loc[np.sort(rows[position < max(1, n // len(uniques))])]
+
+    def band_figure(df_sample: pd.DataFrame, x: str, value: str, title: str, x_label: str, y_label: str,
+                    color: str = None, scale: float = 1.0) -> go.Figure:
+        """Mean of `value` per x (and color) with a shaded normal-approximation 95% confidence band."""
+        keys = [color, x] if color else [x]
+        stats = df_sample.groupby(keys)[value].agg(['mean', 'std', 'count']).reset_index()
+        half = 1.96 * stats['std'].fillna(0) / np.sqrt(stats['count'])
+        stats = stats.assign(mean=stats['mean'] * scale, low=(stats['mean'] - half) * scale,
+                             high=(stats['mean'] + half) * scale)
+        palette = px.colors.qualitative.Plotly
+        fig = go.Figure()
+        groups = stats.groupby(color, sort=False) if color else [(None, stats)]
+        for i, (name, group) in enumerate(groups):
+            line_color = palette[i % len(palette)]
+            fig.add_trace(go.Scatter(
+                x=np.concatenate([group[x], group[x][::-1]]), y=np.concatenate([group['high'], group['low'][::-1]]),
+                fill="toself", fillcolor=line_color, opacity=0.2, line=dict(width=0), hoverinfo="skip",
+                showlegend=False, legendgroup=str(name)
+            ))
+            fig.add_trace(go.Scatter(
+                x=group[x], y=group['mean'], mode="lines+markers", line=dict(color=line_color),
+                name=str(name) if color else y_label, legendgroup=str(name), showlegend=bool(color)
+            ))
+        fig.update_layout(title=f"{title} (estimate)", xaxis_title=x_label, yaxis_title=y_label,
+                          template="plotly_dark")
+        return fig
+
+    def estimate_artist_evo(df_tracks: pd.DataFrame) -> tuple:
+        sample = stratified_sample(df_tracks, 'decade', PROGRESSIVE_SAMPLE)
+        leaders = sample['artist_clean'].value_counts().index[:5]
+        fig = band_figure(sample[sample['artist_clean'].isin(leaders)], 'decade', 'popularity',
+                          'Top Artists Timeline', 'Decade', 'Average Popularity', color='artist_clean')
+        return fig, len(sample)
+
+    def estimate_titles(df_tracks: pd.DataFrame) -> tuple:
+        sample = stratified_sample(df_tracks, 'decade', PROGRESSIVE_SAMPLE)
+        words = title_features(sample)
+        fig = band_figure(words[words['title_word_count'] <= 10], 'title_word_count', 'popularity',
+                          'Popularity by Title Word Count', 'Words in Title', 'Average Popularity')
+        return fig, len(sample)
+
+    def estimate_collab(df_tracks: pd.DataFrame) -> tuple:
+        recent = df_tracks[df_tracks['year'] >= 1980]
+        sample = stratified_sample(recent, 'year', PROGRESSIVE_SAMPLE)
+        collab = collab_frame(sample).assign(is_collab=lambda d: d['is_collab'].astype(float))
+        fig = band_figure(collab, 'year', 'is_collab', 'Collaboration Trend Over Time', 'Year',
+                          'Collaboration %', scale=100)
+        return fig, len(sample)
+
     # --------------------------------------------------------
     # NEW WELCOME PAGE FUNCTION (with consistent font sizes)
     # --------------------------------------------------------
@@ -1640,12 +3329,12 @@ if music_data is not None:
             "🚀 Artist Evolution": {
                 "problem": "Which artists dominated each era? This analyzes artist performance over time, career longevity, and 'Rising Stars' with high momentum.",
                 "cols": "artists, year, decade, popularity, name",
-                "gb": "df_artist_time.groupby(['time_period', 'artist_clean']), df_dominance.groupby('artist_clean'), df_longevity.groupby('artist_clean')"
+                "gb": "artist_year_store(df_filtered): one groupby(['artist_code', 'year']), then rollup(5/10), window() and summary()"
             },
             "💬 Title Analytics": {
                 "problem": "Do song titles affect popularity? This analyzes title length, most common words in hits, and the impact of patterns (like 'feat.', '()', or 'ALL CAPS').",
                 "cols": "name, popularity",
-                "gb": "df_titles.groupby(word_bins), df_titles.groupby('has_feat')"
+                "gb": "df_titles.groupby('title_length'), df_titles.groupby(word_bins), df_titles.groupby('title_has_feat')"
             },
             "🤝 Collaboration Patterns": {
                 "problem": "Do collaborations (songs with >1 artist) actually perform better? What is the optimal 'team size' for a hit song?",
@@ -1797,8 +3486,67 @@ if music_data is not None:
             st.html(header_html)
 
     # --------------------------------------------------------
-    # DASHBOARD SUMMARY CARDS (Corrected with 8 safe try/except blocks)
+    # DASHBOARD SUMMARY CARDS (one cached kernel, typed result)
     # --------------------------------------------------------
+    @dataclass(frozen=True)
+    class SummaryStats:
+        """Everything the eight summary cards show for one filtered selection."""
+        n_tracks: int
+        trending_feature: str | None  # Highest of energy/danceability/valence in the latest year
+        growth_pct: float | None      # Popularity change over the last 10 years present; None if fewer
+        major_share: float
+        avg_duration_min: float
+        explicit_pct: float
+        top_artist: str | None        # Highest mean popularity
+        top_key: int | None           # Most frequent key
+        mean_valence: float
+        mean_energy: float
+
+    SUMMARY_TREND_FEATURES = ('energy', 'danceability', 'valence')
+
+    @bounded_cache
+    def summary_stats(df_tracks: pd.DataFrame) -> SummaryStats:
+        """All eight card values from bincounts over the integer year, key and artist codes."""
+        n = len(df_tracks)
+        years = df_tracks['year'].to_numpy()
+        year_codes = years - years.min()
+        year_counts = np.bincount(year_codes)
+        present = np.flatnonzero(year_counts)  # aggregate_by_year rows, in order
+        latest = present[-1]
+
+        # Only two years are read, so mask their rows once instead of binning every year per feature
+        at_latest = year_codes == latest
+        latest_means = df_tracks.loc[at_latest, list(SUMMARY_TREND_FEATURES)].to_numpy(dtype=float).mean(axis=0)
+        growth_pct = None
+        if len(present) >= 10:
+            popularity = df_tracks['popularity'].to_numpy(dtype=float)
+            current_pop, past_pop = popularity[at_latest].mean(), popularity[year_codes == present[-10]].mean()
+            growth_pct = (current_pop - past_pop) / past_pop * 100 if past_pop > 0 else float('inf')
+
+        artist_codes = df_tracks['artist_code'].to_numpy()
+        named = artist_codes >= 0
+        artist_counts = np.bincount(artist_codes[named], minlength=len(artist_names))
+        artist_pop = np.bincount(artist_codes[named], weights=df_tracks['popularity'].to_numpy(dtype=float)[named],
+                                 minlength=len(artist_names))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            artist_mean = np.where(artist_counts > 0, artist_pop / artist_counts, -np.inf)
+        # Ties go to the alphabetically first artist, like groupby().mean().idxmax()
+        top_artists = artist_names[np.flatnonzero(artist_mean == artist_mean.max())]
+        key_counts = np.bincount(df_tracks['key'].to_numpy(), minlength=12)
+
+        return SummaryStats(
+            n_tracks=n,
+            trending_feature=SUMMARY_TREND_FEATURES[int(np.argmax(latest_means))],
+            growth_pct=growth_pct,
+            major_share=float(df_tracks['mode'].mean()),
+            avg_duration_min=float(df_tracks['duration_ms'].mean()) / 60000,
+            explicit_pct=float(df_tracks['explicit'].mean()) * 100,
+            top_artist=str(top_artists.min()) if named.any() else None,
+            top_key=int(np.argmax(key_counts)),
+            mean_valence=float(df_tracks['valence'].mean()),
+            mean_energy=float(df_tracks['energy'].mean()),
+        )
+
     def render_insights_summary():
         """
         Renders the 8-card (2x4 grid) summary for the
@@ -1849,77 +3597,25 @@ if music_data is not None:
         # 4. Set default values for all 8 stats
         stats_values = ["N/A"] * 8
         
-        # 5. Run each calculation in its own safe try/except block
+        # 5. Format the cached kernel's values
         if not df_filtered.empty:
-            df_year_f = aggregate_by_year(df_filtered)
-            df_summary = df_filtered.copy()
-
-            # --- Card 1: Trending Feature ---
-            try:
-                if not df_year_f.empty:
-                    stats_values[0] = df_year_f.iloc[-1][['energy', 'danceability', 'valence']].idxmax().capitalize()
-            except:
-                pass # Fails silently, leaves "N/A"
-
-            # --- Card 2: 10-Year Growth ---
-            try:
-                if len(df_year_f) >= 10:
-                    current_pop = df_year_f.iloc[-1]['popularity']
-                    past_pop = df_year_f.iloc[-10]['popularity']
-                    if past_pop > 0:
-                        growth_rate = ((current_pop - past_pop) / past_pop) * 100
-                        stats_values[1] = f"{growth_rate:.1f}%"
-                    else:
-                        stats_values[1] = "Inf"
-                else:
-                    stats_values[1] = "N/A (low data)"
-            except:
-                pass
-
-            # --- Card 3: Dominant Mode ---
-            try:
-                stats_values[2] = "Major" if df_summary['mode'].mean() > 0.5 else "Minor"
-            except:
-                pass
-                
-            # --- Card 4: Avg Duration ---
-            try:
-                avg_duration = df_summary['duration_ms'].mean() / 60000
-                stats_values[3] = f"{avg_duration:.1f} min"
-            except:
-                pass
-
-            # --- Card 5: Explicit Content % ---
-            try:
-                explicit_pct = df_summary['explicit'].mean() * 100
-                stats_values[4] = f"{explicit_pct:.1f}%"
-            except:
-                pass
-                
-            # --- Card 6: Top Artist ---
-            try:
-                df_summary['artist_clean'] = df_summary['artists'].str.replace(r"[\[\]'\"]", "", regex=True).str.split(',').str[0].str.strip()
-                if not df_summary.groupby('artist_clean')['popularity'].mean().empty:
-                    stats_values[5] = df_summary.groupby('artist_clean')['popularity'].mean().idxmax()
-            except:
-                pass # This was the most likely error source
-                
-            # --- Card 7: Top Musical Key ---
-            try:
-                top_key_index = df_summary['key'].mode()[0]
-                stats_values[6] = KEY_MAP.get(top_key_index, "N/A")
-            except:
-                pass
-
-            # --- Card 8: Overall Vibe ---
-            try:
-                vibe_val_num = df_summary['valence'].mean()
-                vibe_en_num = df_summary['energy'].mean()
-                vibe_mood = "Happy" if vibe_val_num > 0.5 else "Sad"
-                vibe_energy = "Energetic" if vibe_en_num > 0.6 else "Mellow"
-                stats_values[7] = f"{vibe_energy} & {vibe_mood}"
-            except:
-                pass
+            summary = summary_stats(df_filtered)
+            stats_values[0] = summary.trending_feature.capitalize()
+            if summary.growth_pct is None:
+                stats_values[1] = "N/A (low data)"
+            elif np.isinf(summary.growth_pct):
+                stats_values[1] = "Inf"
+            else:
+                stats_values[1] = f"{summary.growth_pct:.1f}%"
+            stats_values[2] = "Major" if summary.major_share > 0.5 else "Minor"
+            stats_values[3] = f"{summary.avg_duration_min:.1f} min"
+            stats_values[4] = f"{summary.explicit_pct:.1f}%"
+            if summary.top_artist is not None:
+                stats_values[5] = summary.top_artist
+            stats_values[6] = KEY_MAP.get(summary.top_key, "N/A")
+            vibe_mood = "Happy" if summary.mean_valence > 0.5 else "Sad"
+            vibe_energy = "Energetic" if summary.mean_energy > 0.6 else "Mellow"
+            stats_values[7] = f"{vibe_energy} & {vibe_mood}"
         
         # 6. Render the 8-card grid
         cols_row1 = st.columns(4)
@@ -1972,12 +3668,7 @@ if music_data is not None:
             st.info("Please select at least one feature to display.")
             return
 
-        base = df_year_f[["year"] + selected].copy()
-        if normalize:
-            for c in selected:
-                rng = base[c].max() - base[c].min()
-                base[c] = 0 if rng == 0 else (base[c] - base[c].min()) / rng
-
+        d1 = d2 = None
         if compare:
             decades = sorted(df_filtered["decade"].unique().tolist())
             if len(decades) < 2:
@@ -1986,20 +3677,29 @@ if music_data is not None:
             d1 = st.selectbox("First decade", decades, index=max(0, len(decades)-2), key="evo_d1")
             d2 = st.selectbox("Second decade", decades, index=max(0, len(decades)-1), key="evo_d2")
 
-            summary = (df_filtered[df_filtered["decade"].isin([d1, d2])]
-                    .assign(group=lambda x: x["decade"].astype(str))
-                    .groupby(["group","year"], as_index=False)[selected].mean())
-            melted = summary.melt(id_vars=["group","year"], var_name="Feature", value_name="Value")
-            fig = px.line(melted, x="year", y="Value", color="Feature", line_dash="group",
-                        title="Evolution (comparison by decade)", template="plotly_dark")
-        else:
-            melted = base.melt(id_vars=["year"], var_name="Feature", value_name="Value")
-            fig = px.line(melted, x="year", y="Value", color="Feature",
-                        title="Evolution of Audio Features (1920-2020)", template="plotly_dark")
-            
-        if 'loudness' not in selected:
-            fig.update_layout(yaxis_tickformat=".0%")
+        def build_figure():
+            if compare:
+                summary = (df_filtered[df_filtered["decade"].isin([d1, d2])]
+                        .assign(group=lambda x: x["decade"].astype(str))
+                        .groupby(["group","year"], as_index=False)[selected].mean())
+                melted = summary.melt(id_vars=["group","year"], var_name="Feature", value_name="Value")
+                fig = px.line(melted, x="year", y="Value", color="Feature", line_dash="group",
+                            title="Evolution (comparison by decade)", template="plotly_dark")
+            else:
+                base = df_year_f[["year"] + selected].copy()
+                if normalize:
+                    for c in selected:
+                        rng = base[c].max() - base[c].min()
+                        base[c] = 0 if rng == 0 else (base[c] - base[c].min()) / rng
+                melted = base.melt(id_vars=["year"], var_name="Feature", value_name="Value")
+                fig = px.line(melted, x="year", y="Value", color="Feature",
+                            title="Evolution of Audio Features (1920-2020)", template="plotly_dark")
+                
+            if 'loudness' not in selected:
+                fig.update_layout(yaxis_tickformat=".0%")
+            return fig
 
+        fig = view_figure("evolution", (tuple(selected), normalize, compare, d1, d2), build_figure)
         st.plotly_chart(fig, use_container_width=True)
 
                 
@@ -2038,50 +3738,57 @@ if music_data is not None:
             st.warning("No data available for the selected filters.")
             return
             
-        df_sample = df_filtered.sample(min(5000, len(df_filtered)), random_state=42)
-        
-        if viz2_type == "Scatter with Trend":
-            fig_correlation = px.scatter(
-                df_sample, x=selected_feature, y='popularity',
-                title=f'Popularity vs {selected_feature.capitalize()}',
-                opacity=0.6, trendline='ols',
-                labels={selected_feature: f'{selected_feature.capitalize()} (0-1)', 'popularity': 'Popularity Score'}
-            )
-            if add_percentiles:
-                p25 = df_sample[selected_feature].quantile(0.25)
-                p75 = df_sample[selected_feature].quantile(0.75)
-                fig_correlation.add_vline(x=p25, line_dash="dash", line_color="red", opacity=0.5)
-                fig_correlation.add_vline(x=p75, line_dash="dash", line_color="green", opacity=0.5)
+        def build_figure():
+            if viz2_type == "Scatter with Trend":
+                # Every filtered track, rasterized, with the least-squares line over all of them
+                grid = raster_grid(df_filtered, selected_feature, 'popularity', RASTER_BINS)
+                fig_correlation = raster_figure(grid, f'Popularity vs {selected_feature.capitalize()}',
+                                                f'{selected_feature.capitalize()} (0-1)', 'Popularity Score')
+                if len(df_filtered) > 2:
+                    fit = popularity_trends(df_filtered, filters).take(CORRELATION_COLUMNS.index(selected_feature))
+                    xs = np.linspace(grid["x"][0], grid["x"][-1], 50)
+                    lower, upper = fit.band(xs)
+                    fig_correlation.add_scatter(x=np.concatenate([xs, xs[::-1]]), y=np.concatenate([upper, lower[::-1]]),
+                                                fill='toself', fillcolor='rgba(29, 185, 84, 0.25)', line=dict(width=0),
+                                                hoverinfo='skip', name=f'{TREND_CONFIDENCE:.0%} confidence')
+                    fig_correlation.add_scatter(x=xs, y=fit.predict(xs), mode='lines',
+                                                name=f'OLS trend (R² = {float(fit.r2):.3f})',
+                                                line=dict(color='#1DB954', width=3))
+                if add_percentiles:
+                    p25 = df_filtered[selected_feature].quantile(0.25)
+                    p75 = df_filtered[selected_feature].quantile(0.75)
+                    fig_correlation.add_vline(x=p25, line_dash="dash", line_color="red", opacity=0.5)
+                    fig_correlation.add_vline(x=p75, line_dash="dash", line_color="green", opacity=0.5)
                 
-        elif viz2_type == "Hexbin Density":
-            fig_correlation = px.density_heatmap(
-                df_sample, x=selected_feature, y='popularity',
-                title=f'Density: Popularity vs {selected_feature.capitalize()}',
-                labels={selected_feature: f'{selected_feature.capitalize()} (0-1)', 'popularity': 'Popularity Score'},
-                nbinsx=30, nbinsy=20
-            )
-        else:  # Box Plot by Bins
-            df_sample['feature_bin'] = pd.cut(df_sample[selected_feature], bins=5, 
-                                            labels=['Very Low', 'Low', 'Medium', 'High', 'Very High'])
-            fig_correlation = px.box(
-                df_sample, x='feature_bin', y='popularity',
-                title=f'Popularity Distribution by {selected_feature.capitalize()} Levels',
-                labels={'feature_bin': f'{selected_feature.capitalize()} Level', 'popularity': 'Popularity Score'}
-            )
+            elif viz2_type == "Hexbin Density":
+                # Exact 30x20 histogram of the whole selection, binned on the server
+                fig_correlation = raster_figure(
+                    raster_grid(df_filtered, selected_feature, 'popularity', (30, 20)),
+                    f'Density: Popularity vs {selected_feature.capitalize()}',
+                    f'{selected_feature.capitalize()} (0-1)', 'Popularity Score', log_density=False
+                )
+            else:  # Box Plot by Bins
+                fig_correlation = box_figure(
+                    distribution_stats(df_filtered, 'popularity', selected_feature, bin_labels=FEATURE_LEVELS),
+                    f'Popularity Distribution by {selected_feature.capitalize()} Levels',
+                    f'{selected_feature.capitalize()} Level', 'Popularity Score', colored=False
+                )
         
-        features_to_format_as_percent = [
-            'danceability', 'energy', 'valence', 'acousticness', 
-            'instrumentalness', 'speechiness'
-        ]
+            features_to_format_as_percent = [
+                'danceability', 'energy', 'valence', 'acousticness', 
+                'instrumentalness', 'speechiness'
+            ]
         
-        # Check if the feature we plotted on the x-axis should be a %
-        if selected_feature in features_to_format_as_percent:
-            if viz2_type != "Box Plot by Bins":
-                fig_correlation.update_layout(xaxis_tickformat=".0%")
-                
+            # Check if the feature we plotted on the x-axis should be a %
+            if selected_feature in features_to_format_as_percent:
+                if viz2_type != "Box Plot by Bins":
+                    fig_correlation.update_layout(xaxis_tickformat=".0%")
+            return fig_correlation
+
+        fig_correlation = view_figure("correlation", (selected_feature, viz2_type, add_percentiles), build_figure)
         st.plotly_chart(fig_correlation, use_container_width=True)
         
-        correlation = df_filtered[selected_feature].corr(df_filtered['popularity'])
+        correlation = feature_correlation_matrix(df_filtered, filters).loc[selected_feature, 'popularity']
         st.metric(f"Correlation Coefficient", f"{correlation:.3f}", 
                 delta=f"{'Positive' if correlation > 0 else 'Negative'} correlation")
         
@@ -2130,62 +3837,62 @@ if music_data is not None:
                 key="genre_viz_type"
             )
         
-        if genre_viz_type == "Box Plot":
-            # Get top 15 genres *from the filtered data*
-            top_genres_filtered = df_genre_agg.nlargest(15, 'popularity')
+        def build_figure():
+            if genre_viz_type == "Box Plot":
+                # Get top 15 genres *from the filtered data*
+                top_genres_filtered = df_genre_agg.nlargest(15, 'popularity')
             
-            fig_genre = px.box(
-                top_genres_filtered, # Use the filtered data
-                x='genres',
-                y=genre_feature,
-                color='genres',
-                title=f'{genre_feature.capitalize()} Distribution Across Top 15 Genres (Filtered)',
-                labels={'genres': 'Genre', genre_feature: f'{genre_feature.capitalize()}'}
-            )
-            fig_genre.update_layout(showlegend=False, xaxis_tickangle=-45)
+                fig_genre = box_figure(
+                    distribution_stats(top_genres_filtered, genre_feature, 'genres'),
+                    f'{genre_feature.capitalize()} Distribution Across Top 15 Genres (Filtered)',
+                    'Genre', genre_feature.capitalize()
+                )
+                fig_genre.update_layout(showlegend=False, xaxis_tickangle=-45)
             
-        else:  # Radar Chart
-            import plotly.graph_objects as go
+            else:  # Radar Chart
+                import plotly.graph_objects as go
             
-            # Get top 8 genres *from the filtered data*
-            top_8_genres_filtered = df_genre_agg.nlargest(8, 'popularity')
-            features_for_radar = ['energy', 'danceability', 'valence', 'acousticness', 'speechiness']
+                # Get top 8 genres *from the filtered data*
+                top_8_genres_filtered = df_genre_agg.nlargest(8, 'popularity')
+                features_for_radar = ['energy', 'danceability', 'valence', 'acousticness', 'speechiness']
             
-            fig_genre = go.Figure()
+                fig_genre = go.Figure()
             
-            for _, genre_row in top_8_genres_filtered.iterrows(): # Use the filtered data
-                values = [genre_row[feat] for feat in features_for_radar]
-                fig_genre.add_trace(go.Scatterpolar(
-                    r=values,
-                    theta=features_for_radar,
-                    fill='toself',
-                    name=genre_row['genres'][:20]
-                ))
+                for _, genre_row in top_8_genres_filtered.iterrows(): # Use the filtered data
+                    values = [genre_row[feat] for feat in features_for_radar]
+                    fig_genre.add_trace(go.Scatterpolar(
+                        r=values,
+                        theta=features_for_radar,
+                        fill='toself',
+                        name=genre_row['genres'][:20]
+                    ))
             
-            fig_genre.update_layout(
-                polar=dict(
-                    radialaxis=dict(
-                        visible=True,
-                        range=[0, 1]
-                    )),
-                showlegend=True,
-                title="Genre DNA: Audio Feature Signatures (Filtered)"
-            )
+                fig_genre.update_layout(
+                    polar=dict(
+                        radialaxis=dict(
+                            visible=True,
+                            range=[0, 1]
+                        )),
+                    showlegend=True,
+                    title="Genre DNA: Audio Feature Signatures (Filtered)"
+                )
         
-        features_to_format_as_percent = [
-            'danceability', 'energy', 'valence', 'acousticness', 
-            'instrumentalness', 'speechiness', 'liveness'
-        ]
+            features_to_format_as_percent = [
+                'danceability', 'energy', 'valence', 'acousticness', 
+                'instrumentalness', 'speechiness', 'liveness'
+            ]
         
-        if genre_viz_type == "Box Plot":
-            if genre_feature in features_to_format_as_percent:
-                fig_genre.update_layout(yaxis_tickformat=".0%")
-        else: # Radar Chart
-            # The features are hardcoded as features_for_radar, which are all 0-1
-            fig_genre.update_layout(
-                polar=dict(radialaxis=dict(visible=True, range=[0, 1], tickformat=".0%"))
-            )
-            
+            if genre_viz_type == "Box Plot":
+                if genre_feature in features_to_format_as_percent:
+                    fig_genre.update_layout(yaxis_tickformat=".0%")
+            else: # Radar Chart
+                # The features are hardcoded as features_for_radar, which are all 0-1
+                fig_genre.update_layout(
+                    polar=dict(radialaxis=dict(visible=True, range=[0, 1], tickformat=".0%"))
+                )
+            return fig_genre
+
+        fig_genre = view_figure("genre_dna", (genre_feature, genre_viz_type), build_figure)
         st.plotly_chart(fig_genre, use_container_width=True)
 
     # --------------------------------------------------------
@@ -2200,22 +3907,16 @@ if music_data is not None:
             st.warning("No data available for the selected filters.")
             return
 
-        # --- FIX: Create a local copy to avoid mutation errors ---
-        df_explicit = df_filtered.copy()
-        df_explicit['explicit_label'] = df_explicit['explicit'].map({0: 'Clean', 1: 'Explicit'})
+        df_explicit = explicit_frame(df_filtered)
         
         col_exp1, col_exp2 = st.columns(2)
         
         with col_exp1:
             # Popularity comparison
-            fig_explicit = px.violin(
-                df_explicit[df_explicit['popularity'] > 0], # Use local copy
-                x='explicit_label',
-                y='popularity',
-                color='explicit_label',
-                title='Popularity Distribution: Clean vs Explicit',
-                labels={'explicit_label': 'Content Type', 'popularity': 'Popularity Score'}
-            )
+            fig_explicit = view_figure("explicit_violin", (), lambda: violin_figure(
+                distribution_stats(df_explicit[df_explicit['popularity'] > 0], 'popularity', 'explicit_label', kde=True),
+                'Popularity Distribution: Clean vs Explicit', 'Content Type', 'Popularity Score'
+            ))
             st.plotly_chart(fig_explicit, use_container_width=True)
         
         with col_exp2:
@@ -2226,14 +3927,10 @@ if music_data is not None:
                 key="explicit_feature"
             )
             
-            fig_explicit_feat = px.box(
-                df_explicit, # Use local copy
-                x='explicit_label',
-                y=explicit_feature,
-                color='explicit_label',
-                title=f'{explicit_feature.capitalize()} by Content Type',
-                labels={'explicit_label': 'Content Type', explicit_feature: explicit_feature.capitalize()}
-            )
+            fig_explicit_feat = view_figure("explicit_box", (explicit_feature,), lambda: box_figure(
+                distribution_stats(df_explicit, explicit_feature, 'explicit_label'),
+                f'{explicit_feature.capitalize()} by Content Type', 'Content Type', explicit_feature.capitalize()
+            ))
 
             features_to_format_as_percent = [
                 'danceability', 'energy', 'valence', 'speechiness'
@@ -2261,9 +3958,6 @@ if music_data is not None:
             key="analysis_type_viz5"
         )
         
-        audio_features = ['danceability', 'energy', 'valence', 'acousticness', 
-                        'instrumentalness', 'liveness', 'loudness', 'speechiness', 'popularity']
-        
         # --- DEFINE YOUR FORMATTING LIST HERE ---
         features_to_format_as_percent = [
             'danceability', 'energy', 'valence', 'acousticness', 
@@ -2271,19 +3965,17 @@ if music_data is not None:
         ]
 
         if analysis_type == "Correlation Matrix":
-            correlation_matrix = df_filtered[audio_features].corr()
-            
-            fig_heatmap = px.imshow(
-                correlation_matrix,
+            fig_heatmap = view_figure("correlation_matrix", (), lambda: px.imshow(
+                feature_correlation_matrix(df_filtered, filters).loc[POPULARITY_FEATURES, POPULARITY_FEATURES],
                 title='Correlation Between Audio Features',
                 text_auto='.2f',
                 aspect='auto',
                 color_continuous_scale='RdBu_r'
-            )
+            ))
             st.plotly_chart(fig_heatmap, use_container_width=True)
             
         elif analysis_type == "Feature Pairs Analysis":
-            correlation_matrix = df_filtered[audio_features].corr()
+            correlation_matrix = feature_correlation_matrix(df_filtered, filters).loc[POPULARITY_FEATURES, POPULARITY_FEATURES]
             pop_corr = correlation_matrix['popularity'].drop('popularity').sort_values(ascending=False)
             
             col1, col2 = st.columns(2)
@@ -2305,21 +3997,12 @@ if music_data is not None:
                         st.write(f"• {feat}: {corr:.3f}")
                 
         else:  # Success Formula
-            df_success = df_filtered.copy()
-            
-            df_success['success_level'] = pd.cut(df_success['popularity'], 
-                                                bins=[0, 30, 60, 100],
-                                                labels=['Low', 'Medium', 'High'])
-            
-            # Slicing [:-1] to remove 'popularity'
-            success_formula = df_success.groupby('success_level', observed=True)[audio_features[:-1]].mean()
-            
-            fig_formula = px.bar(
-                success_formula.T,
+            fig_formula = view_figure("success_formula", (), lambda: px.bar(
+                success_formula(df_filtered).T,
                 title="The Success Formula: Average Features by Popularity Level",
                 labels={'index': 'Audio Feature', 'value': 'Average Value'},
                 barmode='group'
-            )
+            ))
             
             # --- THIS IS THE FIX ---
             # The y-axis shows the feature means, which are 0-1
@@ -2329,6 +4012,16 @@ if music_data is not None:
 
             st.plotly_chart(fig_formula, use_container_width=True)
 
+    def add_forecast_traces(fig, projection: pd.DataFrame, scale: float = 1.0, color: str = '255, 0, 0'):
+        """Draw one feature's forecast rows as a dashed line over its shaded prediction interval."""
+        years = projection['year'].to_numpy()
+        fig.add_scatter(x=np.concatenate([years, years[::-1]]),
+                        y=np.concatenate([projection['upper'], projection['lower'][::-1]]) * scale,
+                        fill='toself', fillcolor=f'rgba({color}, 0.15)', line=dict(width=0),
+                        hoverinfo='skip', name=f'{TREND_CONFIDENCE:.0%} prediction interval')
+        fig.add_scatter(x=years, y=projection['forecast'].to_numpy() * scale, mode='lines',
+                        name='Projection', line=dict(dash='dash', color=f'rgb({color})'))
+
     # --------------------------------------------------------
     # VIZ 6: TEMPORAL TRENDS (Corrected: No arguments, local copy)
     # --------------------------------------------------------
@@ -2339,6 +4032,7 @@ if music_data is not None:
         # --- FIX: Get data inside the function and make a local copy ---
         try:
             df_year_f = aggregate_by_year(df_filtered).copy()
+            forecast = feature_forecast(df_filtered)
         except Exception as e:
             st.error(f"Error during aggregation: {e}")
             return
@@ -2361,45 +4055,71 @@ if music_data is not None:
             # Add trend prediction toggle
             show_prediction = st.checkbox("Show trend projection", value=False, key="prediction_duration")
             
-            fig_duration = px.line(
+            fig_duration = view_figure("temporal_duration", (), lambda: px.line(
                 df_year_f[df_year_f["year"] >= 1960],
                 x="year", y="duration_min",
                 title="Song Duration: The Attention Span Crisis",
                 labels={"duration_min": "Duration (minutes)", "year": "Year"}
-            )
+            ))
             
             if show_prediction:
-                # Simple linear projection
-                try:
-                    from scipy import stats # Import is safe inside the try block
-                    
-                    # Use the already calculated df_year_f
-                    recent_years_agg = df_year_f[df_year_f['year'] >= 2000]
-                    
-                    # Check if we have valid data
-                    if len(recent_years_agg) > 1 and not recent_years_agg['duration_min'].isna().all():
-                        slope, intercept, _, _, _ = stats.linregress(recent_years_agg['year'], recent_years_agg['duration_min'])
-                        future_years = list(range(2020, 2031))
-                        future_duration = [slope * year + intercept for year in future_years]
-                        fig_duration.add_scatter(x=future_years, y=future_duration, mode='lines', 
-                                                name='Projection', line=dict(dash='dash', color='red'))
-                except ImportError:
-                    st.warning("Scipy module not found. Skipping trend projection.")
-                except Exception as e:
-                    st.warning(f"Could not calculate trend: {e}")
+                # Linear fit of the 2000+ yearly means projected over 2020-2030, with its prediction interval
+                recent_years_agg = df_year_f[df_year_f['year'] >= 2000].dropna(subset=['duration_min'])
+                if len(recent_years_agg) > 1:
+                    fit = linear_fit(recent_years_agg['year'], recent_years_agg['duration_min']).take(0)
+                    future_years = np.arange(2020, 2031)
+                    lower, upper = fit.band(future_years, prediction=True)
+                    add_forecast_traces(fig_duration, pd.DataFrame({
+                        'year': future_years, 'forecast': fit.predict(future_years), 'lower': lower, 'upper': upper,
+                    }))
             
             st.plotly_chart(fig_duration, use_container_width=True)
         
         with col_tempo2:
-            fig_tempo = px.line(
+            fig_tempo = view_figure("temporal_tempo", (), lambda: px.line(
                 df_year_f[df_year_f['year'] >= 1960],
                 x='year',
                 y='tempo',
                 title='Tempo Evolution: The BPM Arms Race',
                 labels={'tempo': 'Tempo (BPM)', 'year': 'Year'}
-            )
+            ))
             st.plotly_chart(fig_tempo, use_container_width=True)
 
+        st.markdown("### 🔮 Where Is Music Heading?")
+        if forecast.empty:
+            st.info(f"Projections need at least {2 * PIECEWISE_MIN_SEGMENT} years of data since {FORECAST_SINCE}.")
+            return
+
+        col_fc1, col_fc2 = st.columns(2)
+        with col_fc1:
+            forecast_model = FORECAST_MODELS[st.radio("Trend model:", list(FORECAST_MODELS),
+                                                      horizontal=True, key="forecast_model")]
+        with col_fc2:
+            forecast_feature = st.selectbox("Feature:", FORECAST_COLUMNS, key="forecast_feature")
+        projections = forecast[forecast['model'] == forecast_model]
+
+        def build_forecast_figure():
+            history = df_year_f[df_year_f['year'] >= 1960]
+            fig = px.line(history, x='year', y=forecast_feature,
+                          title=f'{forecast_feature.capitalize()}: {FORECAST_HORIZON}-Year Projection',
+                          labels={forecast_feature: forecast_feature.capitalize(), 'year': 'Year'})
+            add_forecast_traces(fig, projections[projections['feature'] == forecast_feature], color='29, 185, 84')
+            return fig
+
+        fig_forecast = view_figure("temporal_forecast", (forecast_model, forecast_feature), build_forecast_figure)
+        st.plotly_chart(fig_forecast, use_container_width=True)
+
+        # Every feature at the end of the horizon against its last observed yearly mean
+        last_observed = df_year_f.sort_values('year').iloc[-1]
+        outlook = projections[projections['year'] == projections['year'].max()].set_index('feature')
+        outlook = outlook.assign(last=last_observed[FORECAST_COLUMNS].astype(float))
+        outlook['change_%'] = (outlook['forecast'] - outlook['last']) / outlook['last'].abs() * 100
+        st.dataframe(outlook[['last', 'forecast', 'lower', 'upper', 'change_%']].rename(columns={
+            'last': f"{int(last_observed['year'])} (observed)",
+            'forecast': f"{int(outlook['year'].iloc[0])} (projected)",
+            'lower': f'Lower ({TREND_CONFIDENCE:.0%})', 'upper': f'Upper ({TREND_CONFIDENCE:.0%})',
+            'change_%': 'Change %'}).round(3), use_container_width=True)
+
     # --------------------------------------------------------
     # VIZ 7: ARTIST SUCCESS PATTERNS (Corrected: No arguments)
     # --------------------------------------------------------
@@ -2430,88 +4150,98 @@ if music_data is not None:
         top_artists_filtered = df_artist_f.nlargest(50, 'popularity')
         
         if artist_strategy == "Top 50 Artists Overview":
-            fig_artists = px.scatter(
-                top_artists_filtered, # Use filtered data
-                x='count',
-                y='popularity',
-                size='energy',
-                color='valence',
-                hover_data=['artist_clean'], # Use the clean artist name
-                title='Artist Strategy: Volume vs Quality (Filtered)',
-                labels={'count': 'Number of Tracks', 'popularity': 'Average Popularity', 'valence': 'Valence'}
-            )
-            
-            # Add quadrant lines based on filtered data
-            median_count = top_artists_filtered['count'].median()
-            median_pop = top_artists_filtered['popularity'].median()
-            fig_artists.add_hline(y=median_pop, line_dash="dash", line_color="gray", opacity=0.5)
-            fig_artists.add_vline(x=median_count, line_dash="dash", line_color="gray", opacity=0.5)
+            def build_figure():
+                fig_artists = px.scatter(
+                    top_artists_filtered, # Use filtered data
+                    x='count',
+                    y='popularity',
+                    size='energy',
+                    color='valence',
+                    hover_data=['artist_clean'], # Use the clean artist name
+                    title='Artist Strategy: Volume vs Quality (Filtered)',
+                    labels={'count': 'Number of Tracks', 'popularity': 'Average Popularity', 'valence': 'Valence'}
+                )
             
-            # Add quadrant labels
-            fig_artists.add_annotation(x=median_count*0.3, y=median_pop*1.2, text="Quality over Quantity", 
-                                    showarrow=False, font=dict(color="green"))
-            fig_artists.add_annotation(x=median_count*1.7, y=median_pop*1.2, text="Consistent Hitmakers", 
-                                    showarrow=False, font=dict(color="#89ccff"))
+                # Add quadrant lines based on filtered data
+                median_count = top_artists_filtered['count'].median()
+                median_pop = top_artists_filtered['popularity'].median()
+                fig_artists.add_hline(y=median_pop, line_dash="dash", line_color="gray", opacity=0.5)
+                fig_artists.add_vline(x=median_count, line_dash="dash", line_color="gray", opacity=0.5)
             
+                # Add quadrant labels
+                fig_artists.add_annotation(x=median_count*0.3, y=median_pop*1.2, text="Quality over Quantity", 
+                                        showarrow=False, font=dict(color="green"))
+                fig_artists.add_annotation(x=median_count*1.7, y=median_pop*1.2, text="Consistent Hitmakers", 
+                                        showarrow=False, font=dict(color="#89ccff"))
+                return fig_artists
+
+            fig_artists = view_figure("artists_overview", (), build_figure)
             st.plotly_chart(fig_artists, use_container_width=True)
 
         elif artist_strategy == "Consistency Analysis":
-            # Calculate coefficient of variation (std/mean) for each artist
-            artist_consistency = []
-            
-            # --- FIX: Loop over filtered artists and search in df_filtered ---
-            for artist_name in top_artists_filtered['artist_clean']:
-                # Search for this artist's songs *within the filtered tracklist*
-                # Note: str.contains is not perfect, but it's what your original code used.
-                artist_songs = df_filtered[df_filtered['artists'].str.contains(artist_name, na=False, case=True)]['popularity']
+            def build_figure():
+                # Calculate coefficient of variation (std/mean) for each artist
+                artist_consistency = []
+            
+                # --- FIX: Loop over filtered artists and search in df_filtered ---
+                for artist_name in top_artists_filtered['artist_clean']:
+                    # Search for this artist's songs *within the filtered tracklist*
+                    # Note: str.contains is not perfect, but it's what your original code used.
+                    artist_songs = df_filtered[df_filtered['artists'].str.contains(artist_name, na=False, case=True)]['popularity']
                 
-                if len(artist_songs) > 1:
-                    cv = artist_songs.std() / artist_songs.mean() if artist_songs.mean() > 0 else 0
-                    artist_consistency.append({'artist': artist_name[:20], 'consistency': 1 - cv, 
-                                            'avg_popularity': artist_songs.mean()})
+                    if len(artist_songs) > 1:
+                        cv = artist_songs.std() / artist_songs.mean() if artist_songs.mean() > 0 else 0
+                        artist_consistency.append({'artist': artist_name[:20], 'consistency': 1 - cv, 
+                                                'avg_popularity': artist_songs.mean()})
             
-            consistency_df = pd.DataFrame(artist_consistency)
+                consistency_df = pd.DataFrame(artist_consistency)
             
-            if consistency_df.empty:
+                if consistency_df.empty:
+                    fig_artists = go.Figure() # Create empty figure
+                    fig_artists.update_layout(title='Artist Consistency Score (No data to display)')
+                else:
+                    fig_artists = px.bar(
+                        consistency_df.sort_values('consistency', ascending=True),
+                        x='consistency',
+                        y='artist',
+                        orientation='h',
+                        color='avg_popularity',
+                        title='Artist Consistency Score (Higher = More Consistent)',
+                        labels={'consistency': 'Consistency Score', 'artist': 'Artist', 
+                                'avg_popularity': 'Avg Popularity'}
+                    )
+                return fig_artists
+
+            fig_artists = view_figure("artists_consistency", (), build_figure)
+            if not fig_artists.data:
                 st.info("Could not calculate artist consistency. (No artist matches with >1 song found in the filtered data).")
-                fig_artists = go.Figure() # Create empty figure
-                fig_artists.update_layout(title='Artist Consistency Score (No data to display)')
-            else:
-                fig_artists = px.bar(
-                    consistency_df.sort_values('consistency', ascending=True),
-                    x='consistency',
-                    y='artist',
-                    orientation='h',
-                    color='avg_popularity',
-                    title='Artist Consistency Score (Higher = More Consistent)',
-                    labels={'consistency': 'Consistency Score', 'artist': 'Artist', 
-                            'avg_popularity': 'Avg Popularity'}
-                )
-            
             st.plotly_chart(fig_artists, use_container_width=True)
                 
         else:  # Feature Signature
-            # --- FIX: Use the filtered top 5 artists ---
-            top_5_artists_filtered = top_artists_filtered.head(5)
-            features_for_signature = ['energy', 'danceability', 'valence', 'acousticness', 'speechiness']
-            
-            fig_artists = go.Figure()
-            
-            for _, artist_row in top_5_artists_filtered.iterrows(): # Use filtered data
-                values = [artist_row[feat] for feat in features_for_signature]
-                fig_artists.add_trace(go.Scatterpolar(
-                    r=values,
-                    theta=features_for_signature,
-                    fill='toself',
-                    name=artist_row['artist_clean'][:20] # Use clean name
-                ))
+            def build_figure():
+                # --- FIX: Use the filtered top 5 artists ---
+                top_5_artists_filtered = top_artists_filtered.head(5)
+                features_for_signature = ['energy', 'danceability', 'valence', 'acousticness', 'speechiness']
+            
+                fig_artists = go.Figure()
+            
+                for _, artist_row in top_5_artists_filtered.iterrows(): # Use filtered data
+                    values = [artist_row[feat] for feat in features_for_signature]
+                    fig_artists.add_trace(go.Scatterpolar(
+                        r=values,
+                        theta=features_for_signature,
+                        fill='toself',
+                        name=artist_row['artist_clean'][:20] # Use clean name
+                    ))
             
-            fig_artists.update_layout(
-                polar=dict(radialaxis=dict(visible=True, range=[0, 1], tickformat=".0%")),
-                showlegend=True,
-                title="Artist Sound Signatures: What Makes Them Unique"
-            )
+                fig_artists.update_layout(
+                    polar=dict(radialaxis=dict(visible=True, range=[0, 1], tickformat=".0%")),
+                    showlegend=True,
+                    title="Artist Sound Signatures: What Makes Them Unique"
+                )
+                return fig_artists
 
+            fig_artists = view_figure("artists_signature", (), build_figure)
             st.plotly_chart(fig_artists, use_container_width=True)
 
     # --------------------------------------------------------
@@ -2569,54 +4299,48 @@ if music_data is not None:
         )
         
         # Filter data
-        df_density = df_filtered[(df_filtered['decade'] >= decade_filter_8[0]) & 
-                                (df_filtered['decade'] <= decade_filter_8[1])]
+        df_density = tracks_in_decades(df_filtered, decade_filter_8)
         
         # Check if the *local* filter returned data
         if df_density.empty:
             st.warning("No data available for the selected *local decade filter*.")
             return
 
-        df_density_sample = df_density.sample(min(10000, len(df_density)), random_state=42)
-        
-        if viz_style == "Density Heatmap":
-            fig_density = px.density_heatmap(
-                df_density_sample,
-                x=feature_x,
-                y=feature_y,
-                title=f'Feature Sweet Spots: {feature_x.capitalize()} vs {feature_y.capitalize()}',
-                labels={feature_x: feature_x.capitalize(), feature_y: feature_y.capitalize()},
-                nbinsx=30,
-                nbinsy=30,
-                color_continuous_scale='Viridis'
-            )
+        def build_figure():
+            if viz_style == "Density Heatmap":
+                # Exact 30x30 histogram of every track in the decade range
+                fig_density = raster_figure(
+                    raster_grid(df_density, feature_x, feature_y, (30, 30)),
+                    f'Feature Sweet Spots: {feature_x.capitalize()} vs {feature_y.capitalize()}',
+                    feature_x.capitalize(), feature_y.capitalize(), log_density=False
+                )
             
-        elif viz_style == "Scatter with Size":
-            fig_density = px.scatter(
-                df_density_sample.sample(min(2000, len(df_density_sample))),
-                x=feature_x,
-                y=feature_y,
-                size='popularity',
-                color='decade',
-                title=f'Feature Combinations: Size = Popularity',
-                labels={feature_x: feature_x.capitalize(), feature_y: feature_y.capitalize()},
-                opacity=0.6
-            )
+            elif viz_style == "Scatter with Size":
+                # All tracks in the decade range, colored by the mean popularity of each cell
+                fig_density = raster_figure(
+                    raster_grid(df_density, feature_x, feature_y, RASTER_BINS, 'popularity'),
+                    'Feature Combinations: Color = Average Popularity',
+                    feature_x.capitalize(), feature_y.capitalize(), 'Avg Popularity'
+                )
             
-        else:  # Contour Plot
-            fig_density = px.density_contour(
-                df_density_sample,
-                x=feature_x,
-                y=feature_y,
-                title=f'Density Contours: {feature_x.capitalize()} vs {feature_y.capitalize()}',
-                labels={feature_x: feature_x.capitalize(), feature_y: feature_y.capitalize()}
-            )
-            fig_density.update_traces(contours_coloring="fill", contours_showlabels=True)
-        
-        x_format = ".0%" if feature_x in features_to_format_as_percent else ""
-        y_format = ".0%" if feature_y in features_to_format_as_percent else ""
-        fig_density.update_layout(xaxis_tickformat=x_format, yaxis_tickformat=y_format)
+            else:  # Contour Plot
+                # Contours drawn from the same server-side 30x30 histogram
+                grid = raster_grid(df_density, feature_x, feature_y, (30, 30))
+                fig_density = go.Figure(go.Contour(
+                    x=grid["x"], y=grid["y"], z=grid["count"],
+                    contours=dict(coloring="fill", showlabels=True), colorbar=dict(title="count")
+                ))
+                fig_density.update_layout(
+                    title=f'Density Contours: {feature_x.capitalize()} vs {feature_y.capitalize()} ({grid["n"]:,} tracks)',
+                    xaxis_title=feature_x.capitalize(), yaxis_title=feature_y.capitalize()
+                )
         
+            x_format = ".0%" if feature_x in features_to_format_as_percent else ""
+            y_format = ".0%" if feature_y in features_to_format_as_percent else ""
+            fig_density.update_layout(xaxis_tickformat=x_format, yaxis_tickformat=y_format)
+            return fig_density
+
+        fig_density = view_figure("explorer", (feature_x, feature_y, viz_style, tuple(decade_filter_8)), build_figure)
         st.plotly_chart(fig_density, use_container_width=True)
         
         # Show insights
@@ -2657,16 +4381,8 @@ if music_data is not None:
             st.warning("No data available for the selected filters.")
             return
 
-        # --- FIX: Create a local copy to avoid mutation errors ---
-        df_keys = df_filtered.copy()
-        
-        # Map keys to musical notation
-        key_mapping = {0: 'C', 1: 'C#', 2: 'D', 3: 'D#', 4: 'E', 5: 'F',
-                    6: 'F#', 7: 'G', 8: 'G#', 9: 'A', 10: 'A#', 11: 'B'}
-        
-        # Add new columns to the local copy
-        df_keys['key_name'] = df_keys['key'].map(key_mapping)
-        df_keys['mode_name'] = df_keys['mode'].map({0: 'Minor', 1: 'Major'})
+        # Counts and mean popularity per key/mode, already named
+        key_mode_stats = key_mode_summary(df_filtered)
         
         key_analysis = st.radio(
             "Analysis Type:",
@@ -2675,48 +4391,42 @@ if music_data is not None:
             key="key_analysis"
         )
         
-        if key_analysis == "Distribution":
-            # Count combinations using the local copy
-            key_mode_counts = df_keys.groupby(['key_name', 'mode_name']).size().reset_index(name='count')
-            
-            fig_keys = px.bar(
-                key_mode_counts,
-                x='key_name',
-                y='count',
-                color='mode_name',
-                title='Distribution of Musical Keys (Major vs Minor)',
-                labels={'key_name': 'Musical Key', 'count': 'Number of Songs', 'mode_name': 'Mode'},
-                category_orders={'key_name': ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']}
-            )
-            
-        elif key_analysis == "Popularity by Key":
-            # Average popularity by key using the local copy
-            key_popularity = df_keys.groupby(['key_name', 'mode_name'])['popularity'].mean().reset_index()
+        def build_figure():
+            if key_analysis == "Distribution":
+                fig_keys = px.bar(
+                    key_mode_stats,
+                    x='key_name',
+                    y='count',
+                    color='mode_name',
+                    title='Distribution of Musical Keys (Major vs Minor)',
+                    labels={'key_name': 'Musical Key', 'count': 'Number of Songs', 'mode_name': 'Mode'},
+                    category_orders={'key_name': ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']}
+                )
             
-            fig_keys = px.bar(
-                key_popularity,
-                x='key_name',
-                y='popularity',
-                color='mode_name',
-                title='Average Popularity by Musical Key',
-                labels={'key_name': 'Musical Key', 'popularity': 'Average Popularity', 'mode_name': 'Mode'},
-                category_orders={'key_name': ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']},
-                barmode='group'
-            )
+            elif key_analysis == "Popularity by Key":
+                fig_keys = px.bar(
+                    key_mode_stats,
+                    x='key_name',
+                    y='popularity',
+                    color='mode_name',
+                    title='Average Popularity by Musical Key',
+                    labels={'key_name': 'Musical Key', 'popularity': 'Average Popularity', 'mode_name': 'Mode'},
+                    category_orders={'key_name': ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']},
+                    barmode='group'
+                )
             
-        else:  # Emotional Impact
-            # Compare valence (happiness) using the local copy
-            fig_keys = px.box(
-                df_keys,
-                x='mode_name',
-                y='valence',
-                color='mode_name',
-                title='Emotional Impact: Valence in Major vs Minor Keys',
-                labels={'mode_name': 'Mode', 'valence': 'Valence (Happiness)'}
-            )
+            else:  # Emotional Impact
+                # Compare valence (happiness) between modes
+                df_keys = df_filtered[['valence']].assign(mode_name=df_filtered['mode'].map({0: 'Minor', 1: 'Major'}))
+                fig_keys = box_figure(
+                    distribution_stats(df_keys, 'valence', 'mode_name'),
+                    'Emotional Impact: Valence in Major vs Minor Keys', 'Mode', 'Valence (Happiness)'
+                )
 
-            fig_keys.update_layout(yaxis_tickformat=".0%")
-        
+                fig_keys.update_layout(yaxis_tickformat=".0%")
+            return fig_keys
+
+        fig_keys = view_figure("keys", (key_analysis,), build_figure)
         st.plotly_chart(fig_keys, use_container_width=True)
 
     # --------------------------------------------------------
@@ -2744,58 +4454,49 @@ if music_data is not None:
         with col_decade2:
             show_variance = st.checkbox("Show variance analysis", value=False, key="variance_decade")
         
-        # Filter for relevant decades (this .copy() is perfect)
-        df_decades = df_filtered['decade'].copy()
-        
-        # --- FIX: Add second check for locally filtered data ---
-        if df_decades.empty:
-            st.warning("No data available for decades in your current selection.")
-            return
-
-        if not show_variance:
-            fig_decade_box = px.box(
-                df_decades,
-                x='decade',
-                y=decade_feature,
-                color='decade',
-                title=f'{decade_feature.capitalize()} Evolution by Decade',
-                labels={'decade': 'Decade', decade_feature: f'{decade_feature.capitalize()}'}
-            )
-            fig_decade_box.update_layout(showlegend=False)
+        def build_figure():
+            if not show_variance:
+                fig_decade_box = box_figure(
+                    distribution_stats(df_filtered, decade_feature, 'decade'),
+                    f'{decade_feature.capitalize()} Evolution by Decade', 'Decade', decade_feature.capitalize()
+                )
+                fig_decade_box.update_layout(showlegend=False)
             
-        else:
-            # Calculate variance by decade
-            variance_by_decade = df_decades.groupby('decade')[decade_feature].agg(['mean', 'std']).reset_index()
+            else:
+                # Calculate variance by decade
+                variance_by_decade = decade_feature_stats(df_filtered)[decade_feature].reset_index()
             
-            # --- FIX: Prevent ZeroDivisionError ---
-            variance_by_decade['cv'] = variance_by_decade.apply(
-                lambda row: row['std'] / row['mean'] if row['mean'] != 0 else 0, axis=1
-            )
+                # --- FIX: Prevent ZeroDivisionError ---
+                variance_by_decade['cv'] = variance_by_decade.apply(
+                    lambda row: row['std'] / row['mean'] if row['mean'] != 0 else 0, axis=1
+                )
             
-            fig_decade_box = px.line(
-                variance_by_decade,
-                x='decade',
-                y='cv',
-                title=f'Musical Diversity: {decade_feature.capitalize()} Variance Over Time',
-                labels={'decade': 'Decade', 'cv': 'Coefficient of Variation'},
-                markers=True
-            )
-            fig_decade_box.add_hline(y=variance_by_decade['cv'].mean(), 
-                                line_dash="dash", line_color="red", opacity=0.5)
+                fig_decade_box = px.line(
+                    variance_by_decade,
+                    x='decade',
+                    y='cv',
+                    title=f'Musical Diversity: {decade_feature.capitalize()} Variance Over Time',
+                    labels={'decade': 'Decade', 'cv': 'Coefficient of Variation'},
+                    markers=True
+                )
+                fig_decade_box.add_hline(y=variance_by_decade['cv'].mean(), 
+                                    line_dash="dash", line_color="red", opacity=0.5)
         
-        # Define our percentage list
-        features_to_format_as_percent = [
-            'danceability', 'energy', 'valence', 'acousticness', 
-            'instrumentalness', 'speechiness', 'liveness'
-        ]
+            # Define our percentage list
+            features_to_format_as_percent = [
+                'danceability', 'energy', 'valence', 'acousticness', 
+                'instrumentalness', 'speechiness', 'liveness'
+            ]
         
-        if not show_variance and decade_feature in features_to_format_as_percent:
-            # Format the main box plot
-            fig_decade_box.update_layout(yaxis_tickformat=".0%")
-        elif show_variance:
-            # Format the variance line plot (CV is a ratio)
-            fig_decade_box.update_layout(yaxis_tickformat=".1%")
-            
+            if not show_variance and decade_feature in features_to_format_as_percent:
+                # Format the main box plot
+                fig_decade_box.update_layout(yaxis_tickformat=".0%")
+            elif show_variance:
+                # Format the variance line plot (CV is a ratio)
+                fig_decade_box.update_layout(yaxis_tickformat=".1%")
+            return fig_decade_box
+
+        fig_decade_box = view_figure("decades", (decade_feature, show_variance), build_figure)
         st.plotly_chart(fig_decade_box, use_container_width=True)
 
     # --------------------------------------------------------
@@ -2825,62 +4526,63 @@ if music_data is not None:
             key="genre_view"
         )
         
-        if genre_view == "Top Genres by Popularity":
-            # This was already correct, just uses our new variable
-            top_genres_pop = df_genres_f.nlargest(20, "popularity")[["genres","popularity"]]
+        def build_figure():
+            if genre_view == "Top Genres by Popularity":
+                # This was already correct, just uses our new variable
+                top_genres_pop = df_genres_f.nlargest(20, "popularity")[["genres","popularity"]]
             
-            fig_top_genres = px.bar(
-                top_genres_pop,
-                x='popularity',
-                y='genres',
-                orientation='h',
-                color='popularity',
-                color_continuous_scale='Viridis',
-                title='Genre Power Rankings: Commercial Appeal (Filtered)',
-                labels={'genres': 'Genre', 'popularity': 'Average Popularity'}
-            )
-            fig_top_genres.update_layout(height=600, yaxis={'categoryorder':'total ascending'})
+                fig_top_genres = px.bar(
+                    top_genres_pop,
+                    x='popularity',
+                    y='genres',
+                    orientation='h',
+                    color='popularity',
+                    color_continuous_scale='Viridis',
+                    title='Genre Power Rankings: Commercial Appeal (Filtered)',
+                    labels={'genres': 'Genre', 'popularity': 'Average Popularity'}
+                )
+                fig_top_genres.update_layout(height=600, yaxis={'categoryorder':'total ascending'})
             
-        elif genre_view == "Genre Market Share":
-            # --- FIX: Use the filtered gframe_filtered ---
-            genre_counts = gframe_filtered['genres'].value_counts().head(15)
+            elif genre_view == "Genre Market Share":
+                # --- FIX: Use the filtered gframe_filtered ---
+                genre_counts = gframe_filtered['genres'].value_counts().head(15)
             
-            fig_top_genres = px.pie(
-                values=genre_counts.values,
-                names=genre_counts.index,
-                title='Genre Market Share by Track Volume (Filtered)'
-            )
+                fig_top_genres = px.pie(
+                    values=genre_counts.values,
+                    names=genre_counts.index,
+                    title='Genre Market Share by Track Volume (Filtered)'
+                )
             
-        else:  # Genre Loyalty Index
-            genre_loyalty = []
+            else:  # Genre Loyalty Index
+                # Spread of the 15 most popular genres from one groupby over the filtered tracks
+                top_genres = df_genres_f.nlargest(15, 'popularity')['genres']
+                genre_spread = (gframe_filtered[gframe_filtered['genres'].isin(top_genres)]
+                                .groupby('genres')['popularity'].agg(avg_popularity='mean', spread='std', tracks='size'))
+                genre_spread = genre_spread[genre_spread['tracks'] > 10]
             
-            # --- FIX 1: Iterate over the filtered genre list ---
-            for genre in df_genres_f.nlargest(15, 'popularity')['genres']:
-                
-                # --- FIX 2: Search for songs in the filtered track list ---
-                genre_data = gframe_filtered[gframe_filtered['genres'] == genre]
-                
-                if len(genre_data) > 10:
-                    loyalty = 1 / (genre_data['popularity'].std() + 1)  # +1 to avoid division by zero
-                    genre_loyalty.append({'genre': genre[:20], 'loyalty_index': loyalty * 100,
-                                        'avg_popularity': genre_data['popularity'].mean()})
-            
-            if not genre_loyalty:
-                st.info("Not enough data to calculate genre loyalty for the current filter.")
-                fig_top_genres = go.Figure().update_layout(title='Genre Loyalty vs Popularity: Finding Your Niche')
-            else:
-                loyalty_df = pd.DataFrame(genre_loyalty).sort_values('loyalty_index', ascending=True)
+                if genre_spread.empty:
+                    fig_top_genres = go.Figure().update_layout(title='Genre Loyalty vs Popularity: Finding Your Niche')
+                else:
+                    loyalty_df = pd.DataFrame({
+                        'genre': genre_spread.index.str[:20],
+                        'loyalty_index': 100 / (genre_spread['spread'].to_numpy() + 1),  # +1 to avoid division by zero
+                        'avg_popularity': genre_spread['avg_popularity'].to_numpy(),
+                    }).sort_values('loyalty_index', ascending=True)
                 
-                fig_top_genres = px.scatter(
-                    loyalty_df,
-                    x='avg_popularity',
-                    y='loyalty_index',
-                    text='genre',
-                    title='Genre Loyalty vs Popularity: Finding Your Niche (Filtered)',
-                    labels={'loyalty_index': 'Loyalty Index', 'avg_popularity': 'Average Popularity'}
-                )
-                fig_top_genres.update_traces(textposition='top center')
-            
+                    fig_top_genres = px.scatter(
+                        loyalty_df,
+                        x='avg_popularity',
+                        y='loyalty_index',
+                        text='genre',
+                        title='Genre Loyalty vs Popularity: Finding Your Niche (Filtered)',
+                        labels={'loyalty_index': 'Loyalty Index', 'avg_popularity': 'Average Popularity'}
+                    )
+                    fig_top_genres.update_traces(textposition='top center')
+            return fig_top_genres
+
+        fig_top_genres = view_figure("genre_econ", (genre_view,), build_figure)
+        if not fig_top_genres.data:
+            st.info("Not enough data to calculate genre loyalty for the current filter.")
         st.plotly_chart(fig_top_genres, use_container_width=True)
 
     # --------------------------------------------------------
@@ -2895,14 +4597,7 @@ if music_data is not None:
             st.warning("No data available for the selected filters.")
             return
 
-        # --- This .copy() is perfect! ---
-        df_tempo = df_filtered.copy()
-        
-        # --- FIX: Use np.inf for the last bin to include all tempos ---
-        df_tempo['bpm_zone'] = pd.cut(df_tempo['tempo'], 
-                                    bins=[0, 80, 100, 120, 140, np.inf],
-                                    labels=['Slow (<80)', 'Moderate (80-100)', 
-                                            'Dance (100-120)', 'Fast (120-140)', 'Very Fast (>140)'])
+        tempo_zones = tempo_zone_summary(df_filtered)
         
         tempo_analysis = st.radio(
             "Analysis:",
@@ -2912,30 +4607,21 @@ if music_data is not None:
         )
         
         if tempo_analysis == "Density Map":
-            df_tempo_sample = df_tempo.sample(min(10000, len(df_tempo)))
-            
-            if df_tempo_sample.empty:
-                st.warning("No data to display for Density Map.")
-                return
-
-            fig_tempo_density = px.density_heatmap(
-                df_tempo_sample,
-                x='tempo',
-                y='popularity',
-                title='Tempo-Popularity Heat Map: Where Success Lives',
-                labels={'tempo': 'Tempo (BPM)', 'popularity': 'Popularity Score'},
-                nbinsx=40,
-                nbinsy=30
-            )
+            # Every filtered track binned on the server; only the 40x30 grid is sent
+            fig_tempo_density = view_figure("tempo", (tempo_analysis,), lambda: raster_figure(
+                raster_grid(df_filtered, 'tempo', 'popularity', (40, 30)),
+                'Tempo-Popularity Heat Map: Where Success Lives',
+                'Tempo (BPM)', 'Popularity Score'
+            ))
             
         elif tempo_analysis == "Success Zones":
-            bpm_success = df_tempo.groupby('bpm_zone', observed=True)['popularity'].agg(['mean', 'std', 'count']).reset_index()
+            bpm_success = tempo_zones['success']
             
             if bpm_success.empty:
                 st.warning("No data to display for Success Zones.")
                 return
 
-            fig_tempo_density = px.bar(
+            fig_tempo_density = view_figure("tempo", (tempo_analysis,), lambda: px.bar(
                 bpm_success,
                 x='bpm_zone',
                 y='mean',
@@ -2944,25 +4630,25 @@ if music_data is not None:
                 labels={'bpm_zone': 'BPM Zone', 'mean': 'Average Popularity'},
                 color='mean',
                 color_continuous_scale='RdYlGn'
-            )
+            ))
             
         else:  # Evolution
-            tempo_evolution = df_tempo.groupby(['decade', 'bpm_zone'], observed=True).size().reset_index(name='count')
+            tempo_evolution = tempo_zones['evolution']
             tempo_evolution = tempo_evolution[tempo_evolution['decade'] >= 1960]
             
             if tempo_evolution.empty:
                 st.warning("No data to display for Tempo Evolution.")
                 return
 
-            fig_tempo_density = px.bar(
+            fig_tempo_density = view_figure("tempo", (tempo_analysis,), lambda: px.bar(
                 tempo_evolution,
                 x='decade',
                 y='count',
                 color='bpm_zone',
                 title='Evolution of Tempo Preferences Over Decades',
-                labels={'decade': 'Decade', 'count': 'Number of Tracks'},
-                barnorm='percent'
-            )
+                labels={'decade': 'Decade', 'count': 'Number of Tracks'}
+            # px.bar has no barnorm argument; normalise the stacked bars on the layout instead
+            ).update_layout(barnorm='percent'))
         
         st.plotly_chart(fig_tempo_density, use_container_width=True)
 
@@ -2987,17 +4673,14 @@ if music_data is not None:
         
         if explicit_view == "Timeline":
             # This was already correct, as it uses df_filtered.
-            explicit_years = (df_filtered[df_filtered["year"] >= 1960]
-                            .groupby(["year","explicit"])
-                            .size().reset_index(name="count"))
+            explicit_years = explicit_by_year(df_filtered)
+            explicit_years = explicit_years[explicit_years["year"] >= 1960]
             
             if explicit_years.empty:
                 st.warning("No data for timeline view.")
                 return
-
-            explicit_years["explicit_label"] = explicit_years["explicit"].map({0:"Clean",1:"Explicit"})
             
-            fig_explicit_years = px.area(
+            fig_explicit_years = view_figure("explicit_time", (explicit_view,), lambda: px.area(
                 explicit_years,
                 x='year',
                 y='count',
@@ -3005,7 +4688,7 @@ if music_data is not None:
                 title='The Rise of Explicit Content (1960-2020)',
                 labels={'year': 'Year', 'count': 'Number of Tracks', 'explicit_label': 'Content Type'},
                 color_discrete_map={'Clean': '#2E7D32', 'Explicit': '#D32F2F'}
-            )
+            ))
             
         elif explicit_view == "By Genre":
             # --- FIX: Use helper functions to get filtered genre data ---
@@ -3029,7 +4712,8 @@ if music_data is not None:
                 genre_data = gframe_filtered[gframe_filtered['genres'] == genre]
                 if len(genre_data) > 0:
                     # Ensure 'explicit' column exists, default to 0 (Clean) if not
-                    explicit_pct = (genre_data.get('explicit', 0).sum() / len(genre_data)) * 100
+                    explicit_count = genre_data['explicit'].sum() if 'explicit' in genre_data else 0
+                    explicit_pct = (explicit_count / len(genre_data)) * 100
                     explicit_by_genre.append({'genre': genre[:20], 'explicit_percentage': explicit_pct})
             
             if not explicit_by_genre:
@@ -3038,7 +4722,7 @@ if music_data is not None:
             else:
                 explicit_genre_df = pd.DataFrame(explicit_by_genre).sort_values('explicit_percentage')
                 
-                fig_explicit_years = px.bar(
+                fig_explicit_years = view_figure("explicit_time", (explicit_view,), lambda: px.bar(
                     explicit_genre_df,
                     x='explicit_percentage',
                     y='genre',
@@ -3047,20 +4731,18 @@ if music_data is not None:
                     labels={'genre': 'Genre', 'explicit_percentage': 'Explicit Content (%)'},
                     color='explicit_percentage',
                     color_continuous_scale='Reds'
-                )
+                ))
             
         else:  # Commercial Impact
             # --- FIX: Use df_filtered, not df. Make a copy. ---
-            df_impact = df_filtered[df_filtered['year'] >= 1980].copy()
+            explicit_impact = explicit_by_year(df_filtered)
+            explicit_impact = explicit_impact[explicit_impact['year'] >= 1980]
             
-            if df_impact.empty:
+            if explicit_impact.empty:
                 st.warning("No data from 1980 onwards to calculate commercial impact.")
                 return
-
-            explicit_impact = df_impact.groupby(['year', 'explicit'])['popularity'].mean().reset_index()
-            explicit_impact['explicit_label'] = explicit_impact['explicit'].map({0: 'Clean', 1: 'Explicit'})
             
-            fig_explicit_years = px.line(
+            fig_explicit_years = view_figure("explicit_time", (explicit_view,), lambda: px.line(
                 explicit_impact,
                 x='year',
                 y='popularity',
@@ -3068,7 +4750,7 @@ if music_data is not None:
                 title='Commercial Performance: Clean vs Explicit Over Time (Filtered)',
                 labels={'year': 'Year', 'popularity': 'Average Popularity', 'explicit_label': 'Content Type'},
                 markers=True
-            )
+            ))
         
         st.plotly_chart(fig_explicit_years, use_container_width=True)
 
@@ -3105,45 +4787,43 @@ if music_data is not None:
                 st.warning("No popularity trend data for this filter.")
                 return
                 
-            fig_pop_trend = px.line(
-                popularity_trend,
-                x='year',
-                y='popularity',
-                title='The Streaming Effect: Popularity Trend (Filtered)',
-                labels={'year': 'Year', 'popularity': 'Average Popularity'},
-                markers=True
-            )
-            
-            # Add streaming era marker
-            fig_pop_trend.add_vline(x=2006, line_dash="dash", line_color="green", opacity=0.5)
-            fig_pop_trend.add_annotation(x=2006, y=popularity_trend['popularity'].max()*0.9, 
-                                        text="Spotify Launch", showarrow=True)
+            def build_figure():
+                fig_pop_trend = px.line(
+                    popularity_trend,
+                    x='year',
+                    y='popularity',
+                    title='The Streaming Effect: Popularity Trend (Filtered)',
+                    labels={'year': 'Year', 'popularity': 'Average Popularity'},
+                    markers=True
+                )
             
-            # Add trend line
-            fig_pop_trend.add_scatter(
-                x=popularity_trend['year'],
-                y=popularity_trend['popularity'].rolling(window=10, center=True).mean(),
-                mode='lines',
-                name='10-Year Moving Average',
-                line=dict(color='red', dash='dash')
-            )
+                # Add streaming era marker
+                fig_pop_trend.add_vline(x=2006, line_dash="dash", line_color="green", opacity=0.5)
+                fig_pop_trend.add_annotation(x=2006, y=popularity_trend['popularity'].max()*0.9, 
+                                            text="Spotify Launch", showarrow=True)
+            
+                # Add trend line
+                fig_pop_trend.add_scatter(
+                    x=popularity_trend['year'],
+                    y=popularity_trend['popularity'].rolling(window=10, center=True).mean(),
+                    mode='lines',
+                    name='10-Year Moving Average',
+                    line=dict(color='red', dash='dash')
+                )
+                return fig_pop_trend
+
+            fig_pop_trend = view_figure("pop_lifecycle", (popularity_view,), build_figure)
             
         elif popularity_view == "By Era":
             # --- FIX: Use df_filtered.copy() ---
-            df_eras = df_filtered.copy()
-            df_eras['era'] = pd.cut(df_eras['year'], 
-                                    bins=[0, 1960, 1980, 1990, 2000, 2010, 2025],
-                                    labels=['Pre-1960', '1960s-70s', '1980s', '1990s', '2000s', '2010s+'])
-            
-            # Use observed=True to ignore empty bins
-            era_popularity = df_eras.groupby('era', observed=True)['popularity'].agg(['mean', 'std']).reset_index()
+            popularity_by_era = era_popularity(df_filtered)
             
-            if era_popularity.empty:
+            if popularity_by_era.empty:
                 st.warning("Not enough data to group by era.")
                 return
 
-            fig_pop_trend = px.bar(
-                era_popularity,
+            fig_pop_trend = view_figure("pop_lifecycle", (popularity_view,), lambda: px.bar(
+                popularity_by_era,
                 x='era',
                 y='mean',
                 error_y='std',
@@ -3151,31 +4831,23 @@ if music_data is not None:
                 labels={'era': 'Era', 'mean': 'Average Popularity'},
                 color='mean',
                 color_continuous_scale='Blues'
-            )
+            ))
             
         else:  # Timeless Features
             # --- FIX: Use df_filtered, not df ---
-            timeless_threshold = df_filtered['popularity'].quantile(0.7)
-            df_timeless = df_filtered.copy()
-            df_timeless['is_timeless'] = df_timeless['popularity'] > timeless_threshold
-            
-            features_compare = ['energy', 'danceability', 'valence', 'acousticness']
-            
-            # Use observed=True to handle cases where one group might be empty
-            timeless_features = df_timeless.groupby('is_timeless', observed=True)[features_compare].mean().T
+            timeless_dna = timeless_features(df_filtered)
             
             # Check if both columns (True/False) exist
-            if True not in timeless_features.columns or False not in timeless_features.columns:
+            if True not in timeless_dna.columns or False not in timeless_dna.columns:
                 st.info("Not enough data to compare 'Timeless' vs 'Regular' songs with current filters.")
                 fig_pop_trend = go.Figure().update_layout(title='The DNA of Timeless Songs (Filtered)')
             else:
-                timeless_features.columns = ['Regular', 'Timeless']
-                fig_pop_trend = px.bar(
-                    timeless_features,
+                fig_pop_trend = view_figure("pop_lifecycle", (popularity_view,), lambda: px.bar(
+                    timeless_dna.set_axis(['Regular', 'Timeless'], axis=1),
                     title='The DNA of Timeless Songs (Filtered)',
                     labels={'index': 'Feature', 'value': 'Average Value'},
                     barmode='group'
-                )
+                ))
             
             fig_pop_trend.update_layout(yaxis_tickformat=".0%")
 
@@ -3226,38 +4898,24 @@ if music_data is not None:
                     key="top_n_timeline"
                 )
             
-            # --- This is all correct: uses df_filtered and .copy() ---
-            df_artist_time = df_filtered[df_filtered['year'] >= 1960].copy()
+            # Sparse (artist, year) cells rolled up to the chosen period
+            period_years = {"By Decade": 10, "By 5-Year Period": 5}.get(time_granularity, 1)
+            rolled = artist_year_store(df_filtered).rollup(period_years, since=1960)
             
-            if df_artist_time.empty:
+            if rolled.empty:
                 st.warning("No data from 1960 onwards for this analysis.")
                 return
-
-            # ... (rest of your "Top Artists Timeline" logic is perfect) ...
-            # Determine time column based on granularity
-            if time_granularity == "By Decade":
-                df_artist_time['time_period'] = df_artist_time['decade']
-                time_col = 'time_period'
-            elif time_granularity == "By 5-Year Period":
-                df_artist_time['time_period'] = (df_artist_time['year'] // 5) * 5
-                time_col = 'time_period'
-            else:  # By Year
-                time_col = 'year'
-                df_artist_time['time_period'] = df_artist_time['year']
-            
-            df_artist_time['artist_clean'] = df_artist_time['artists'].str.replace(r"[\[\]'\"]", "", regex=True)
-            df_artist_time['artist_clean'] = df_artist_time['artist_clean'].str.split(',').str[0].str.strip()
             
             if metric_choice == "Average Popularity":
-                artist_metrics = df_artist_time.groupby(['time_period', 'artist_clean'])['popularity'].mean().reset_index()
+                artist_metrics = rolled[['time_period', 'artist_clean']].assign(popularity=rolled['pop_sum'] / rolled['track_count'])
                 metric_col = 'popularity'
                 metric_label = 'Average Popularity'
             elif metric_choice == "Track Count":
-                artist_metrics = df_artist_time.groupby(['time_period', 'artist_clean']).size().reset_index(name='track_count')
+                artist_metrics = rolled[['time_period', 'artist_clean', 'track_count']]
                 metric_col = 'track_count'
                 metric_label = 'Number of Tracks'
             else:  # Maximum Popularity
-                artist_metrics = df_artist_time.groupby(['time_period', 'artist_clean'])['popularity'].max().reset_index()
+                artist_metrics = rolled[['time_period', 'artist_clean']].assign(popularity=rolled['pop_max'])
                 metric_col = 'popularity'
                 metric_label = 'Maximum Popularity'
             
@@ -3268,14 +4926,14 @@ if music_data is not None:
                 st.warning("No data found for the top artists in this time period.")
                 return
 
-            fig_artist_timeline = px.line(
+            fig_artist_timeline = view_figure("artist_timeline", (metric_choice, time_granularity, top_n_artists), lambda: px.line(
                 artist_metrics_filtered,
                 x='time_period', y=metric_col, color='artist_clean',
                 title=f'Top {top_n_artists} Artists: {metric_label} Over Time',
                 labels={'time_period': time_granularity.replace('By ', ''), 
                         metric_col: metric_label, 'artist_clean': 'Artist'},
                 markers=True, template='plotly_dark'
-            )
+            ))
             fig_artist_timeline.update_layout(
                 plot_bgcolor='#181818', paper_bgcolor='#181818', font_color='#B3B3B3',
                 hovermode='x unified',
@@ -3327,40 +4985,9 @@ if music_data is not None:
                 key="dominance_decade_range"
             )
             
-            df_dominance = df_filtered[(df_filtered['decade'] >= decade_selection[0]) & 
-                                    (df_filtered['decade'] <= decade_selection[1])].copy()
-            
-            if df_dominance.empty:
-                st.warning("No data available for the selected decade range.")
-                return
-
-            # ... (rest of your "Artist Dominance" logic is perfect) ...
-            df_dominance['artist_clean'] = df_dominance['artists'].str.replace(r"[\[\]'\"]", "", regex=True)
-            df_dominance['artist_clean'] = df_dominance['artist_clean'].str.split(',').str[0].str.strip()
-            
-            dominance_by_decade = []
-            for decade in range(decade_selection[0], decade_selection[1] + 10, 10):
-                decade_data = df_dominance[df_dominance['decade'] == decade]
-                if len(decade_data) > 0:
-                    artist_stats = decade_data.groupby('artist_clean').agg({
-                        'popularity': ['mean', 'max', 'count']
-                    }).round(2)
-                    artist_stats.columns = ['avg_popularity', 'max_popularity', 'track_count']
-                    artist_stats['dominance_score'] = (
-                        artist_stats['avg_popularity'] * 0.5 + 
-                        artist_stats['max_popularity'] * 0.3 + 
-                        artist_stats['track_count'] * 0.2
-                    )
-                    top_decade_artists = artist_stats.nlargest(10, 'dominance_score')
-                    for artist, row in top_decade_artists.iterrows():
-                        dominance_by_decade.append({
-                            'decade': decade, 'artist': artist[:30],
-                            'dominance_score': row['dominance_score'],
-                            'avg_popularity': row['avg_popularity'],
-                            'track_count': row['track_count']
-                        })
-            
-            dominance_df = pd.DataFrame(dominance_by_decade)
+            # Every decade's top 10 comes from one cached groupby and sort; the range only slices it
+            dominance_df = decade_dominance(df_filtered)
+            dominance_df = dominance_df[dominance_df['decade'].between(*decade_selection)]
             
             if not dominance_df.empty:
                 heatmap_data = dominance_df.pivot_table(
@@ -3369,28 +4996,27 @@ if music_data is not None:
                 heatmap_data['total'] = heatmap_data.sum(axis=1)
                 heatmap_data = heatmap_data.sort_values('total', ascending=False).drop('total', axis=1).head(20)
                 
-                fig_dominance = px.imshow(
+                fig_dominance = view_figure("artist_dominance", (tuple(decade_selection),), lambda: px.imshow(
                     heatmap_data,
                     title='Artist Dominance Heatmap by Decade',
                     labels=dict(x="Decade", y="Artist", color="Dominance Score"),
                     aspect="auto", color_continuous_scale="Viridis", template='plotly_dark'
-                )
+                ))
                 fig_dominance.update_layout(
                     plot_bgcolor='#181818', paper_bgcolor='#181818', font_color='#B3B3B3', height=700
                 )
                 st.plotly_chart(fig_dominance, use_container_width=True)
                 
                 st.markdown("### 👑 Decade Leaders")
-                decade_leaders = dominance_df.sort_values(['decade', 'dominance_score'], ascending=[True, False])
-                decade_leaders = decade_leaders.groupby('decade').first().reset_index()
+                decade_leaders = dominance_df[dominance_df['rank'] == 1]
                 
                 cols = st.columns(len(decade_leaders))
-                for idx, (_, leader) in enumerate(decade_leaders.iterrows()):
-                    with cols[idx]:
+                for col, leader in zip(cols, decade_leaders.itertuples()):
+                    with col:
                         st.metric(
-                            f"{int(leader['decade'])}s",
-                            leader['artist'][:20],
-                            f"Score: {leader['dominance_score']:.1f}"
+                            f"{int(leader.decade)}s",
+                            leader.artist[:20],
+                            f"Score: {leader.dominance_score:.1f}"
                         )
             else:
                 st.info("No data available for the selected decade range.")
@@ -3404,23 +5030,12 @@ if music_data is not None:
                 key="longevity_min_tracks"
             )
             
-            df_longevity = df_filtered.copy()
-            
-            if df_longevity.empty:
+            if df_filtered.empty:
                 st.warning("No data for longevity analysis.")
                 return
 
-            # ... (rest of your "Longevity Analysis" logic is perfect) ...
-            df_longevity['artist_clean'] = df_longevity['artists'].str.replace(r"[\[\]'\"]", "", regex=True)
-            df_longevity['artist_clean'] = df_longevity['artist_clean'].str.split(',').str[0].str.strip()
-            
-            longevity_stats = df_longevity.groupby('artist_clean').agg({
-                'year': ['min', 'max', 'nunique'],
-                'popularity': ['mean', 'std', 'max'],
-                'name': 'count'
-            }).round(2)
-            longevity_stats.columns = ['first_year', 'last_year', 'active_years', 
-                                    'avg_popularity', 'std_popularity', 'max_popularity', 'track_count']
+            # First/last/active years and popularity moments per artist, read off the sparse store
+            longevity_stats = artist_year_store(df_filtered).summary().round(2)
             longevity_stats = longevity_stats[longevity_stats['track_count'] >= min_tracks]
             
             if longevity_stats.empty:
@@ -3430,29 +5045,28 @@ if music_data is not None:
             longevity_stats['career_span'] = longevity_stats['last_year'] - longevity_stats['first_year']
             longevity_stats['consistency_score'] = (longevity_stats['avg_popularity'] / 
                                                 (longevity_stats['std_popularity'] + 1)) * (longevity_stats['active_years'] / longevity_stats['career_span'].clip(lower=1))
-            longevity_stats = longevity_stats.reset_index()
             
             col_long1, col_long2 = st.columns(2)
             with col_long1:
-                fig_career_span = px.scatter(
+                fig_career_span = view_figure("artist_career_span", (min_tracks,), lambda: px.scatter(
                     longevity_stats.nlargest(30, 'career_span'),
                     x='career_span', y='avg_popularity', size='track_count', color='consistency_score',
                     hover_data=['artist_clean', 'first_year', 'last_year'],
                     title='Longest Career Spans (Top 30)',
                     labels={'career_span': 'Career Span (Years)', 'avg_popularity': 'Average Popularity', 'consistency_score': 'Consistency'},
                     template='plotly_dark', color_continuous_scale='Viridis'
-                )
+                ))
                 fig_career_span.update_layout(plot_bgcolor='#181818', paper_bgcolor='#181818', font_color='#B3B3B3')
                 st.plotly_chart(fig_career_span, use_container_width=True)
             
             with col_long2:
-                fig_consistency = px.bar(
+                fig_consistency = view_figure("artist_consistency", (min_tracks,), lambda: px.bar(
                     longevity_stats.nlargest(15, 'consistency_score'),
                     x='consistency_score', y='artist_clean', orientation='h', color='avg_popularity',
                     title='Most Consistent Artists (Top 15)',
                     labels={'consistency_score': 'Consistency Score', 'artist_clean': 'Artist', 'avg_popularity': 'Avg Popularity'},
                     template='plotly_dark', color_continuous_scale='Viridis'
-                )
+                ))
                 fig_consistency.update_layout(plot_bgcolor='#181818', paper_bgcolor='#181818', font_color='#B3B3B3', yaxis={'categoryorder':'total ascending'})
                 st.plotly_chart(fig_consistency, use_container_width=True)
             
@@ -3481,23 +5095,21 @@ if music_data is not None:
             current_year = df_filtered['year'].max()
             cutoff_year = current_year - window_years
             
-            df_recent = df_filtered[df_filtered['year'] > cutoff_year].copy()
-            df_previous = df_filtered[(df_filtered['year'] <= cutoff_year) & 
-                                    (df_filtered['year'] > cutoff_year - window_years)].copy()
+            # Both windows are column slices of the sparse artist x year store
+            store = artist_year_store(df_filtered)
+            recent = store.window(cutoff_year + 1, current_year)
             
-            if df_recent.empty:
+            if recent.empty:
                 st.warning("No data found in the recent analysis window.")
                 return
 
-            # ... (rest of your "Rising Stars" logic is perfect) ...
-            for data in [df_recent, df_previous]:
-                data['artist_clean'] = data['artists'].str.replace(r"[\[\]'\"]", "", regex=True)
-                data['artist_clean'] = data['artist_clean'].str.split(',').str[0].str.strip()
-            
-            recent_stats = df_recent.groupby('artist_clean').agg({'popularity': 'mean', 'name': 'count'}).rename(columns={'popularity': 'recent_pop', 'name': 'recent_tracks'})
-            previous_stats = df_previous.groupby('artist_clean').agg({'popularity': 'mean', 'name': 'count'}).rename(columns={'popularity': 'previous_pop', 'name': 'previous_tracks'})
-            
-            growth_analysis = pd.merge(recent_stats, previous_stats, left_index=True, right_index=True, how='left').fillna(0)
+            previous = store.window(cutoff_year - window_years + 1, cutoff_year).reindex(recent.index)
+            growth_analysis = pd.DataFrame({
+                'recent_pop': recent['pop_sum'] / recent['track_count'],
+                'recent_tracks': recent['track_count'],
+                'previous_pop': previous['pop_sum'] / previous['track_count'],
+                'previous_tracks': previous['track_count'],
+            }).fillna(0)
             growth_analysis['pop_growth'] = ((growth_analysis['recent_pop'] - growth_analysis['previous_pop']) / (growth_analysis['previous_pop'] + 1)) * 100
             growth_analysis['track_growth'] = ((growth_analysis['recent_tracks'] - growth_analysis['previous_tracks']) / (growth_analysis['previous_tracks'] + 1)) * 100
             growth_analysis['momentum_score'] = (growth_analysis['pop_growth'] * 0.6 + growth_analysis['track_growth'] * 0.4)
@@ -3512,7 +5124,7 @@ if music_data is not None:
             with col_rise1:
                 rising_stars = growth_analysis.nlargest(15, 'momentum_score')
                 if not rising_stars.empty:
-                    fig_rising = px.scatter(
+                    fig_rising = view_figure("rising_stars", (window_years,), lambda: px.scatter(
                         rising_stars,
                         x='previous_pop', y='recent_pop', size='recent_tracks', color='momentum_score',
                         hover_data=['artist_clean'],
@@ -3521,7 +5133,7 @@ if music_data is not None:
                                 'recent_pop': f'Popularity ({cutoff_year}-{current_year})',
                                 'momentum_score': 'Momentum'},
                         template='plotly_dark', color_continuous_scale='RdYlGn'
-                    )
+                    ))
                     max_val = max(rising_stars['previous_pop'].max(), rising_stars['recent_pop'].max())
                     fig_rising.add_shape(type='line', x0=0, y0=0, x1=max_val, y1=max_val, line=dict(color='gray', dash='dash', width=1))
                     fig_rising.update_layout(plot_bgcolor='#181818', paper_bgcolor='#181818', font_color='#B3B3B3')
@@ -3532,12 +5144,12 @@ if music_data is not None:
             with col_rise2:
                 new_artists = growth_analysis[growth_analysis['previous_tracks'] == 0].nlargest(10, 'recent_pop')
                 if not new_artists.empty:
-                    fig_new = px.bar(
+                    fig_new = view_figure("breakthrough_artists", (window_years,), lambda: px.bar(
                         new_artists, x='recent_pop', y='artist_clean', orientation='h', color='recent_tracks',
                         title='Breakthrough Artists (New Entrants)',
                         labels={'recent_pop': 'Current Popularity', 'artist_clean': 'Artist', 'recent_tracks': 'Track Count'},
                         template='plotly_dark', color_continuous_scale='Viridis'
-                    )
+                    ))
                     fig_new.update_layout(plot_bgcolor='#181818', paper_bgcolor='#181818', font_color='#B3B3B3', yaxis={'categoryorder':'total ascending'})
                     st.plotly_chart(fig_new, use_container_width=True)
                 else:
@@ -3573,20 +5185,8 @@ if music_data is not None:
             st.warning("No data available for the selected filters.")
             return
 
-        df_titles = df_filtered.copy()
-        if df_titles['name'].isna().any():
-            df_titles = df_titles.dropna(subset=['name'])
-
-        # Prepare data (word count, length, uniqueness)
-        def calculate_uniqueness_score(name):
-            if not name or pd.isna(name): return 0.0
-            words = str(name).lower().split()
-            if not words: return 0.0
-            return len(set(words)) / len(words)
-            
-        df_titles['title_length'] = df_titles['name'].str.len()
-        df_titles['title_word_count'] = df_titles['name'].str.split().str.len()
-        df_titles['uniqueness_score'] = df_titles['name'].apply(calculate_uniqueness_score)
+        # Word count, length and uniqueness per title (shared, read-only)
+        df_titles = title_features(df_filtered)
 
         title_analysis_type = st.radio(
             "Analysis Type:",
@@ -3605,12 +5205,13 @@ if music_data is not None:
             
             with col_title1:
                 # 1. Character Length Analysis
-                fig_title_len = px.scatter(
-                    df_titles.sample(min(5000, len(df_titles))),
-                    x='title_length', y='popularity', trendline='lowess',
+                fig_title_len = view_figure("title_length", (), lambda: px.scatter(
+                    sample_tracks(df_titles, 5000),
+                    x='title_length', y='popularity',
+                    trendline='lowess',
                     title='Title Length (Characters) vs Popularity',
                     template='plotly_dark'
-                )
+                ))
                 st.plotly_chart(fig_title_len, use_container_width=True, key="plot_title_len")
                 
             with col_title2:
@@ -3619,11 +5220,11 @@ if music_data is not None:
                                 labels=['1 word', '2 words', '3 words', '4 words', '5+ words'])
                 word_popularity = df_titles.groupby(word_bins, observed=True)['popularity'].mean().reset_index()
                 
-                fig_word_count = px.bar(
+                fig_word_count = view_figure("title_word_count", (), lambda: px.bar(
                     word_popularity, x='title_word_count', y='popularity',
                     title='Average Popularity by Title Word Count',
                     template='plotly_dark'
-                )
+                ))
                 st.plotly_chart(fig_word_count, use_container_width=True, key="plot_word_count")
                 
             # The chart rendering is done inside the columns, so we set final_chart to None
@@ -3638,43 +5239,27 @@ if music_data is not None:
                 st.warning("No songs with >50 popularity in this filter to analyze common words.")
                 return
 
-            all_words = ' '.join(df_popular_titles['name'].str.lower()).split()
-            stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'was', 'are', 'been'}
-            filtered_words = [re.sub(r'\W+', '', word) for word in all_words if word not in stop_words and len(word) > 2]
-            
-            word_freq = Counter(filtered_words)
-            top_words = pd.DataFrame(word_freq.most_common(20), columns=['word', 'count'])
+            top_words = top_title_words(df_popular_titles, 20, "common_words")
             
             if top_words.empty:
                 st.info("No common words found.")
                 return
 
-            final_chart = px.bar( 
+            final_chart = view_figure("title_words", (), lambda: px.bar(
                 top_words, x='count', y='word', orientation='h',
                 title='Most Common Words in Popular Songs (>50 popularity)',
+                hover_data={'avg_popularity': ':.1f'},
                 template='plotly_dark'
-            )
+            ))
             final_chart.update_layout(height=600, yaxis={'categoryorder':'total ascending'})
 
         elif title_analysis_type == "Title Patterns":
             st.markdown("### Title Patterns: Impact vs Adoption")
             
             # Chart 4: Title Patterns Impact
-            df_titles['has_feat'] = df_titles['name'].str.contains('feat\.|ft\.|featuring', case=False, na=False)
-            df_titles['has_parentheses'] = df_titles['name'].str.contains('\(|\)', na=False)
-            df_titles['has_numbers'] = df_titles['name'].str.contains('\d', na=False)
-            df_titles['is_uppercase'] = df_titles['name'].str.isupper()
-            
-            features_to_group = {
-                'Features (ft.)': df_titles['has_feat'],
-                'Parentheses ( )': df_titles['has_parentheses'],
-                'Numbers (e.g., 2020)': df_titles['has_numbers'],
-                'ALL CAPS': df_titles['is_uppercase']
-            }
-            
             pattern_results = []
-            for pattern_name, series in features_to_group.items():
-                pop_by_pattern = df_titles.groupby(series)['popularity'].agg(['mean', 'count'])
+            for column, pattern_name in TITLE_PATTERN_LABELS.items():
+                pop_by_pattern = df_titles.groupby(column)['popularity'].agg(['mean', 'count'])
                 
                 if True in pop_by_pattern.index and False in pop_by_pattern.index:
                     pop_with = pop_by_pattern.loc[True, 'mean']
@@ -3696,21 +5281,35 @@ if music_data is not None:
             pattern_df = pd.DataFrame(pattern_results)
             
             # --- FIX 2: Assign the figure to final_chart here ---
-            final_chart = px.bar(
+            final_chart = view_figure("title_patterns", (), lambda: px.bar(
                 pattern_df.sort_values('Impact', ascending=False),
                 x='Impact',
                 y='Pattern',
                 orientation='h',
                 title='Impact of Title Patterns on Popularity (Difference)',
                 template='plotly_dark'
-            )
+            ))
             final_chart.update_layout(height=400, yaxis={'categoryorder':'total ascending'})        
         
         else:
+            st.markdown("### ☁️ Word Cloud: Top Keywords in Popular Titles")
+            col_wc1, col_wc2 = st.columns(2)
+            with col_wc1:
+                cloud_quantile = st.slider("Popularity percentile:", min_value=0.50, max_value=0.95, value=0.70,
+                                           step=0.05, key="word_cloud_quantile")
+            with col_wc2:
+                cloud_style = st.selectbox("Style:", list(WORD_CLOUD_STYLES), key="word_cloud_style")
+
+            cloud_png = word_cloud_png(df_titles, cloud_quantile, cloud_style)
+            if cloud_png:
+                st.image(cloud_png, use_container_width=True)
+            else:
+                st.info("No relevant words found after filtering.")
+
             st.markdown("### 🏆 Uniqueness Score: How Original is Your Title?")
         
             # 1. Calculate overall correlation
-            correlation = df_titles['uniqueness_score'].corr(df_titles['popularity'])
+            correlation = df_titles['uniqueness_score'].corr(df_titles['popularity'])  # Titled tracks only
 
             col_uni1, col_uni2 = st.columns(2)
             
@@ -3732,12 +5331,12 @@ if music_data is not None:
             # 2. Plot Uniqueness vs. Popularity across Decades
             decadal_uniqueness = df_titles.groupby('decade')['uniqueness_score'].mean().reset_index()
         
-            final_chart = px.line( # Assign to final_chart
+            final_chart = view_figure("title_uniqueness", (), lambda: px.line(
                 decadal_uniqueness,
                 x='decade', y='uniqueness_score',
                 title='Title Uniqueness Evolution by Decade',
                 template='plotly_dark'
-            )
+            ))
             final_chart.update_layout(yaxis_range=[0.5, 1.0])
 
 
@@ -3794,25 +5393,17 @@ if music_data is not None:
             st.warning("No data available for the selected filters.")
             return
 
-        # --- This .copy() is perfect! ---
-        df_collab = df_filtered.copy()
-        
-        # Check for NaNs in 'artists' column
-        if df_collab['artists'].isna().any():
-            df_collab = df_collab.dropna(subset=['artists'])
-            
-        df_collab['artist_count'] = df_collab['artists'].str.count(',') + 1
+        # Artist count and solo/collab flag per track (shared, read-only)
+        df_collab = collab_frame(df_filtered)
 
         collab_view = st.radio(
             "View:",
-            ["Collaboration Impact", "Artist Networks", "Optimal Team Size"],
+            ["Collaboration Impact", "Artist Networks", "Influence & Communities", "Optimal Team Size"],
             horizontal=True,
             key="collab_view"
         )
 
         if collab_view == "Collaboration Impact":
-            df_collab['is_collab'] = df_collab['artist_count'] > 1
-            
             col_collab1, col_collab2 = st.columns(2)
             
             with col_collab1:
@@ -3822,14 +5413,14 @@ if music_data is not None:
                 if collab_stats.empty:
                     st.warning("No data for Solo vs. Collab comparison.")
                 else:
-                    fig_collab_impact = px.bar(
+                    fig_collab_impact = view_figure("collab_impact", (), lambda: px.bar(
                         collab_stats,
                         x='is_collab', y='mean', error_y='std',
                         title='Solo vs Collaboration Performance',
                         labels={'is_collab': 'Type', 'mean': 'Average Popularity'},
                         color='mean', color_continuous_scale='Viridis',
                         template='plotly_dark'
-                    )
+                    ))
                     fig_collab_impact.update_layout(plot_bgcolor='#181818', paper_bgcolor='#181818', font_color='#B3B3B3')
                     st.plotly_chart(fig_collab_impact, use_container_width=True)
             
@@ -3839,50 +5430,115 @@ if music_data is not None:
                 if collab_trend.empty:
                     st.warning("No data for Collaboration Trend timeline.")
                 else:
-                    fig_collab_trend = px.line(
+                    fig_collab_trend = view_figure("collab_trend", (), lambda: px.line(
                         x=collab_trend.index, y=collab_trend.values,
                         title='Collaboration Trend Over Time',
                         labels={'x': 'Year', 'y': 'Collaboration %'},
                         markers=True, template='plotly_dark'
-                    )
+                    ))
                     fig_collab_trend.update_layout(plot_bgcolor='#181818', paper_bgcolor='#181818', font_color='#B3B3B3')
                     st.plotly_chart(fig_collab_trend, use_container_width=True)
 
         elif collab_view == "Artist Networks":
-            collab_only = df_collab[df_collab['artist_count'] > 1].copy()
-            
-            if len(collab_only) > 0:
-                artist_collabs = []
-                # Sample for performance
-                for artists_str in collab_only['artists'].head(1000): 
-                    artists_list = [a.strip() for a in artists_str.replace('[','').replace(']','').replace("'",'').split(',')]
-                    for artist in artists_list:
-                        artist_collabs.append(artist)
+            graph = collab_graph(df_filtered)
+            
+            if graph["tracks"] > 0:
+                # Exact over every collaboration track in the selection
+                appearances = graph["appearances"]
+                partners = np.diff(graph["cooccurrence"].indptr)
+                top = np.argsort(-appearances, kind='stable')[:15]
+                top = top[appearances[top] > 0]
+                top_collabs = pd.DataFrame({'artist': credited_artists[top], 'collaborations': appearances[top],
+                                            'partners': partners[top], 'artist_id': top})
                 
-                if not artist_collabs:
-                    st.info("No collaboration artists found in the sample.")
-                    return
-
-                collab_counts = Counter(artist_collabs)
-                top_collabs = pd.DataFrame(collab_counts.most_common(15), columns=['artist', 'collaborations'])
-                
-                fig_network = px.bar(
+                fig_network = view_figure("collab_network", (), lambda: px.bar(
                     top_collabs,
                     x='collaborations', y='artist', orientation='h',
-                    title='Most Collaborative Artists',
-                    labels={'collaborations': 'Number of Collaborations', 'artist': 'Artist'},
+                    title=f'Most Collaborative Artists ({graph["tracks"]:,} collaboration tracks)',
+                    labels={'collaborations': 'Number of Collaborations', 'artist': 'Artist',
+                            'partners': 'Distinct Collaborators'},
+                    hover_data=['partners'],
                     color='collaborations', color_continuous_scale='Viridis',
                     template='plotly_dark'
-                )
+                ))
                 fig_network.update_layout(
                     plot_bgcolor='#181818', paper_bgcolor='#181818',
                     font_color='#B3B3B3', height=500,
                     yaxis={'categoryorder':'total ascending'}
                 )
                 st.plotly_chart(fig_network, use_container_width=True)
+
+                focus = st.selectbox("Top collaborators of:", top_collabs['artist'].tolist(), key="collab_focus")
+                focus_id = int(top_collabs.loc[top_collabs['artist'] == focus, 'artist_id'].iloc[0])
+                row = graph["cooccurrence"].getrow(focus_id)
+                order = np.argsort(-row.data, kind='stable')[:10]
+                top_partners = pd.DataFrame({'artist': credited_artists[row.indices[order]], 'shared_tracks': row.data[order]})
+
+                fig_partners = view_figure("collab_partners", (focus,), lambda: px.bar(
+                    top_partners,
+                    x='shared_tracks', y='artist', orientation='h',
+                    title=f'Top Collaborators of {focus}',
+                    labels={'shared_tracks': 'Shared Tracks', 'artist': 'Artist'},
+                    template='plotly_dark'
+                ))
+                fig_partners.update_layout(
+                    plot_bgcolor='#181818', paper_bgcolor='#181818',
+                    font_color='#B3B3B3', yaxis={'categoryorder': 'total ascending'}
+                )
+                st.plotly_chart(fig_partners, use_container_width=True)
             else:
                 st.info("No collaboration tracks found in the current filter.")
 
+        elif collab_view == "Influence & Communities":
+            st.session_state.setdefault('opened_subviews', set()).add("🤝 Collaboration Patterns / Influence & Communities")
+            with st.spinner("Ranking collaborators..."):
+                centrality = collab_centrality(df_filtered)
+
+            if centrality.empty:
+                st.info("No collaboration tracks found in the current filter.")
+                return
+
+            col_inf1, col_inf2 = st.columns(2)
+            with col_inf1:
+                fig_influence = view_figure("collab_influence", (), lambda: px.bar(
+                    centrality.nlargest(15, 'pagerank'),
+                    x='pagerank', y='artist', orientation='h',
+                    title='Most Influential Collaborators (PageRank)',
+                    labels={'pagerank': 'PageRank', 'artist': 'Artist', 'degree': 'Distinct Collaborators'},
+                    hover_data=['degree', 'collab_tracks'],
+                    color='degree', color_continuous_scale='Viridis',
+                    template='plotly_dark'
+                ))
+                fig_influence.update_layout(plot_bgcolor='#181818', paper_bgcolor='#181818', font_color='#B3B3B3',
+                                            height=500, yaxis={'categoryorder': 'total ascending'})
+                st.plotly_chart(fig_influence, use_container_width=True)
+
+            with col_inf2:
+                fig_connectors = view_figure("collab_connectors", (), lambda: px.bar(
+                    centrality.nlargest(15, 'betweenness'),
+                    x='betweenness', y='artist', orientation='h',
+                    title='Connector Artists (Approx. Betweenness)',
+                    labels={'betweenness': 'Shortest Paths Through Artist', 'artist': 'Artist',
+                            'degree': 'Distinct Collaborators'},
+                    hover_data=['degree', 'community'],
+                    color='degree', color_continuous_scale='Viridis',
+                    template='plotly_dark'
+                ))
+                fig_connectors.update_layout(plot_bgcolor='#181818', paper_bgcolor='#181818', font_color='#B3B3B3',
+                                             height=500, yaxis={'categoryorder': 'total ascending'})
+                st.plotly_chart(fig_connectors, use_container_width=True)
+
+            # Communities: size, internal activity and their most influential members
+            ranked = centrality.sort_values('pagerank', ascending=False)
+            communities = (ranked.groupby('community', sort=False)
+                           .agg(artists=('artist', 'size'), collab_tracks=('collab_tracks', 'sum'),
+                                leading_artists=('artist', lambda names: ', '.join(names.iloc[:3])))
+                           .sort_values('artists', ascending=False).head(10).reset_index(drop=True))
+            st.markdown(f"**🧩 Largest Collaboration Communities** ({centrality['community'].nunique():,} found by label propagation)")
+            st.dataframe(communities, use_container_width=True, hide_index=True)
+            st.caption(f"{len(centrality):,} collaborating artists. Betweenness is estimated from "
+                       f"{min(BETWEENNESS_PIVOTS, len(centrality))} random source artists.")
+
         else:  # Optimal Team Size
             team_size = df_collab.groupby('artist_count')['popularity'].agg(['mean', 'count']).reset_index()
             team_size = team_size[team_size['artist_count'] <= 5]  # Focus on reasonable team sizes
@@ -3891,14 +5547,14 @@ if music_data is not None:
                 st.warning("No data available for team size analysis.")
                 return
 
-            fig_team = px.scatter(
+            fig_team = view_figure("collab_team", (), lambda: px.scatter(
                 team_size,
                 x='artist_count', y='mean', size='count',
                 title='Optimal Team Size for Hit Songs',
                 labels={'artist_count': 'Number of Artists', 'mean': 'Average Popularity', 'count': 'Sample Size'},
                 template='plotly_dark', color='mean',
                 color_continuous_scale='RdYlGn'
-            )
+            ))
             fig_team.update_layout(plot_bgcolor='#181818', paper_bgcolor='#181818', font_color='#B3B3B3')
             st.plotly_chart(fig_team, use_container_width=True)
             
@@ -3913,11 +5569,13 @@ if music_data is not None:
     st.sidebar.markdown("---")
     
     df_to_show = df_filtered if 'df_filtered' in locals() else None
+    filters_to_show = filters if 'filters' in locals() else None
     
     # Pass the *whole* music_data dict
     display_sidebar_stats(
         music_data=music_data,
-        df_filtered=df_to_show
+        df_filtered=df_to_show,
+        filters=filters_to_show
     )
     
     st.sidebar.markdown("---")
@@ -3956,6 +5614,110 @@ if music_data is not None:
             "🤝 Collaboration Patterns": lambda: render_collab(df_filtered),
         }
 
+        # --- Background prep: warm every view's filter-dependent data ---
+        # Widget values are read here, on the script thread; workers never touch session_state
+        correlation_feature = st.session_state.get('feature_selector', 'energy')
+        explicit_feature = st.session_state.get('explicit_feature', 'energy')
+        decade_feature = st.session_state.get('decade_feature_selector', 'energy')
+        word_cloud_quantile = st.session_state.get('word_cloud_quantile', 0.70)
+        word_cloud_style = st.session_state.get('word_cloud_style', "Summer")
+        explorer_decades = st.session_state.get('decade_filter_8', (1990, 2020))
+        explorer_x = st.session_state.get('density_x_feature', 'danceability')
+        explorer_y = st.session_state.get('density_y_feature', 'energy')
+
+        def _genre_prep():
+            aggregate_by_genre(align_genre_frame(music_data["with_genres"], filters))
+
+        def _explicit_prep():
+            df_explicit = explicit_frame(df_filtered)
+            distribution_stats(df_explicit[df_explicit['popularity'] > 0], 'popularity', 'explicit_label', kde=True)
+            distribution_stats(df_explicit, explicit_feature, 'explicit_label')
+
+        VIEW_PREP = {
+            "📈 Evolution of Features": lambda: aggregate_by_year(df_filtered),
+            "📊 Popularity vs Features": lambda: (
+                raster_grid(df_filtered, correlation_feature, 'popularity', RASTER_BINS),
+                distribution_stats(df_filtered, 'popularity', correlation_feature, bin_labels=FEATURE_LEVELS),
+                feature_correlation_matrix(df_filtered, filters), popularity_trends(df_filtered, filters)),
+            "🎸 Genre DNA": _genre_prep,
+            "🔞 Explicit Strategy": _explicit_prep,
+            "📈 Explicit Over Time": lambda: (explicit_by_year(df_filtered), _genre_prep()),
+            "🔗 Feature Relationships": lambda: (feature_correlation_matrix(df_filtered, filters), success_formula(df_filtered)),
+            "🕓 Temporal Trends": lambda: (aggregate_by_year(df_filtered), feature_forecast(df_filtered)),
+            "👤 Artist Success Patterns": lambda: aggregate_by_artist(df_filtered),
+            "🔍 Feature Explorer": lambda: raster_grid(
+                tracks_in_decades(df_filtered, explorer_decades), explorer_x, explorer_y, (30, 30)),
+            "🎵 Key & Mode": lambda: key_mode_summary(df_filtered),
+            "📅 Decade Evolution": lambda: (decade_feature_stats(df_filtered),
+                                           distribution_stats(df_filtered, decade_feature, 'decade')),
+            "💰 Genre Economics": _genre_prep,
+            "⏱️ Tempo Zones": lambda: (tempo_zone_summary(df_filtered), raster_grid(df_filtered, 'tempo', 'popularity', (40, 30))),
+            "🌟 Popularity Lifecycle": lambda: (aggregate_by_year(df_filtered), era_popularity(df_filtered), timeless_features(df_filtered)),
+            "🚀 Artist Evolution": lambda: (artist_year_store(df_filtered), decade_dominance(df_filtered)),
+            "💬 Title Analytics": lambda: (
+                title_word_frequencies(title_features(df_filtered).query('popularity > 50')),
+                word_cloud_png(title_features(df_filtered), word_cloud_quantile, word_cloud_style),
+                sample_tracks(title_features(df_filtered), 5000)),
+            "🤝 Collaboration Patterns": lambda: collab_frame(df_filtered),
+        }
+        # Sub-view preps: awaited only by the sub-view that needs them, and warmed in the
+        # background only for sessions that have opened that sub-view (see opened_subviews)
+        SUBVIEW_PREP = {
+            "🤝 Collaboration Patterns / Influence & Communities": lambda: collab_centrality(df_filtered),
+        }
+
+        # --- Partial reruns: a view's own widgets re-execute only that view ---
+        # Slow views: (estimate, latency budget in ms) for the progressive first phase
+        PROGRESSIVE_VIEWS = {
+            "🚀 Artist Evolution": (estimate_artist_evo, PROGRESSIVE_BUDGET_MS),
+            "💬 Title Analytics": (estimate_titles, PROGRESSIVE_BUDGET_MS),
+            "🤝 Collaboration Patterns": (estimate_collab, PROGRESSIVE_BUDGET_MS),
+        }
+
+        def await_exact_prep(viz_name: str):
+            """
+            Run the view's exact prep on a foreground worker. If it beats the view's budget nothing
+            else happens; otherwise a sampled estimate with confidence bands is shown until it lands
+            (or until PROGRESSIVE_TIMEOUT_S, after which the view computes what it still needs inline).
+            """
+            estimate, budget_ms = PROGRESSIVE_VIEWS[viz_name]
+            future = get_foreground_pool().submit(VIEW_PREP[viz_name])
+            try:
+                future.result(timeout=budget_ms / 1000)
+                return
+            except FuturesTimeout:
+                pass
+            except Exception:
+                return  # The view recomputes inline and reports the error itself
+
+            placeholder = st.empty()
+            with placeholder.container():
+                fig, n_sample = estimate(df_filtered)
+                st.plotly_chart(fig, use_container_width=True)
+                st.caption(f"⏳ Estimated from a stratified sample of {n_sample:,} of {len(df_filtered):,} tracks "
+                           "(shaded: 95% confidence). The exact view replaces it when ready.")
+            try:
+                future.result(timeout=PROGRESSIVE_TIMEOUT_S)
+            except Exception:
+                pass
+            placeholder.empty()
+
+        def render_view(viz_name: str):
+            CHART_PAYLOADS.clear()
+            if viz_name in PROGRESSIVE_VIEWS and st.session_state.get('progressive_views', True) and not df_filtered.empty:
+                await_exact_prep(viz_name)
+            viz_map[viz_name]()
+            if st.session_state.get('measure_render') and CHART_PAYLOADS:
+                render_browser_timing(CHART_PAYLOADS)
+
+        @st.fragment
+        def render_view_fragment(viz_name: str):
+            started = time.perf_counter()
+            render_view(viz_name)
+            if not FULL_RUN_ACTIVE:
+                # Only a fragment-only rerun is timed here; full runs are timed at the end of the script
+                record_rerun_latency('fragment_rerun', time.perf_counter() - started)
+
         # Define the first analytical option as the default fallback
         first_analytical_viz = list(viz_map.keys())[0] # "📈 Evolution of Features"
 
@@ -3991,9 +5753,42 @@ if music_data is not None:
                 key="perf_mode", 
                 help="Load all visualizations at once in tabs. May be slow."
             )
+            isolate_views = st.checkbox(
+                "🧩 Isolated View Reruns",
+                value=st.session_state.get('view_fragments', True),
+                key="view_fragments",
+                help="Changing a chart's own controls reruns only that chart. Sidebar filters still refresh everything."
+            )
+            st.checkbox(
+                "🚀 WebGL Charts",
+                value=st.session_state.get('webgl_charts', True),
+                key="webgl_charts",
+                help="Draw large scatter traces with WebGL and send compact float32 arrays."
+            )
+            st.checkbox(
+                "📏 Measure Render Time",
+                value=st.session_state.get('measure_render', False),
+                key="measure_render",
+                help="Replay each chart in your browser and report how long it took to draw."
+            )
+            st.checkbox(
+                "⏳ Progressive Views",
+                value=st.session_state.get('progressive_views', True),
+                key="progressive_views",
+                help="Slow views show a quick sampled estimate with confidence bands, then the exact result."
+            )
 
         st.divider()
 
+        # The selected view is computed in the foreground; workers take all the others,
+        # plus the sub-views this session has opened
+        opened_subviews = st.session_state.get('opened_subviews', set())
+        schedule_view_precompute(
+            cache_key_part(filters),
+            {**{name: prep for name, prep in VIEW_PREP.items() if name != selected_viz_name},
+             **{name: prep for name, prep in SUBVIEW_PREP.items() if name in opened_subviews}}
+        )
+
         # --- 4. CONDITIONAL RENDERING ---
         
         # ... (The rest of your logic for conditional rendering runs here) ...
@@ -4009,7 +5804,10 @@ if music_data is not None:
             
             if render_function:
                 # The lambda calls the function with df_filtered
-                render_function() 
+                if isolate_views:
+                    render_view_fragment(selected_viz_name)
+                else:
+                    render_view(selected_viz_name)
             else:
                 # This should now only happen if the map is misdefined
                 st.error(f"Internal Error: Could not find function for '{selected_viz_name}'.")
@@ -4152,16 +5950,13 @@ if music_data is not None:
         st.divider()
         st.markdown("#### Top Commercial Hits & Artists")
 
-        decade_df = df[df['decade'] == selected_decade].copy()
-        
         col_tracks, col_artists = st.columns(2)
         
         with col_tracks:
             st.markdown("**Top 20 Tracks by Popularity**")
             
-            top_tracks = decade_df.sort_values('popularity', ascending=False)\
-                                    .drop_duplicates(subset=['name', 'artists'])\
-                                    .head(20)
+            top_tracks = df.iloc[top_track_rows(music_data['popularity_order'], df['track_key'].to_numpy(), 20,
+                                                (df['decade'] == selected_decade).to_numpy())].copy()
             
             top_tracks['Artists'] = top_tracks['artists'].str.replace(r"[\[\]\'\"]", "", regex=True)
             
@@ -4174,7 +5969,8 @@ if music_data is not None:
         with col_artists:
             st.markdown("**Top 20 Artists by Average Popularity**")
             
-            artist_pop = decade_df.groupby('artists')['popularity'].mean().sort_values(ascending=False).head(20).reset_index()
+            artist_pop = decade_lineup_leaders(df)
+            artist_pop = artist_pop[artist_pop['decade'] == selected_decade]
             
             artist_pop['Artists'] = artist_pop['artists'].str.replace(r"[\[\]\'\"]", "", regex=True)
             
@@ -4447,6 +6243,9 @@ if music_data is not None:
     elif st.session_state.current_tab == "Data Explorer":
         st.header("📁 Data Explorer")
         st.info("Showing the raw, filtered data. Use the sidebar filters to explore.")
+
+        with st.expander("⚙️ Performance Diagnostics", expanded=False):
+            render_performance_diagnostics()
         
         # Define the features we want to format
         features_to_format = [
@@ -4458,7 +6257,7 @@ if music_data is not None:
         formatter = {feat: "{:.1%}" for feat in features_to_format}
 
         # Apply the formatting to the dataframe's style
-        st.dataframe(df_filtered.style.format(formatter))
+        st.dataframe(df_filtered.drop(columns=CATALOG_INTERNAL_COLUMNS).style.format(formatter))
 
         # Select dataset to view
         dataset_choice = st.selectbox(
@@ -4470,26 +6269,27 @@ if music_data is not None:
         col1, col2, col3 = st.columns(3)
         
         if dataset_choice == "Main Data":
+            catalog = music_data['main'].drop(columns=['decade'] + CATALOG_INTERNAL_COLUMNS)
             with col1:
-                st.metric("Total Rows", f"{len(music_data['main']):,}")
+                st.metric("Total Rows", f"{len(catalog):,}")
             with col2:
-                st.metric("Total Columns", f"{len(music_data['main'].columns)}")
+                st.metric("Total Columns", f"{len(catalog.columns)}")
             with col3:
-                st.metric("Memory Usage", f"{music_data['main'].memory_usage(deep=True).sum() / 1024**2:.2f} MB")
+                st.metric("Memory Usage", f"{catalog.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
             
             st.subheader("📊 Dataset Preview")
             st.dataframe(
-                music_data['main'].head(100),
+                catalog.head(100),
                 use_container_width=True,
                 height=400
             )
             
             st.subheader("📋 Column Information")
             col_info = pd.DataFrame({
-                'Column': music_data['main'].columns,
-                'Type': music_data['main'].dtypes,
-                'Non-Null Count': music_data['main'].count(),
-                'Null %': (music_data['main'].isnull().sum() / len(music_data['main']) * 100).round(2)
+                'Column': catalog.columns,
+                'Type': catalog.dtypes,
+                'Non-Null Count': catalog.count(),
+                'Null %': (catalog.isnull().sum() / len(catalog) * 100).round(2)
             })
             st.dataframe(col_info, use_container_width=True)
             
@@ -4499,3 +6299,6 @@ if music_data is not None:
         st.info("Waiting for music data files to start the application.")
 
 
+# --- Rerun latency bookkeeping (full script runs) ---
+record_rerun_latency('full_run', time.perf_counter() - RUN_STARTED)
+FULL_RUN_ACTIVE = False
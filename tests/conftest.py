@@ -0,0 +1,9 @@
+import os
+import sys
+from pathlib import Path
+
+# app.py is a Streamlit script: importing it runs the page in bare mode, and it reads
+# prompts/ relative to the working directory
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+
+
+def tracks(popularity, label):
+    return pd.DataFrame({"popularity": popularity, "explicit_label": label})
+
+
+@pytest.mark.parametrize("kde", [False, True])
+def test_empty_selection_has_no_groups(kde):
+    df = tracks([0, 0, 0], ["Clean", "Explicit", "Clean"])
+    stats = app.distribution_stats.__wrapped__(df[df["popularity"] > 0], "popularity", "explicit_label", kde=kde)
+
+    assert stats["labels"] == []
+    for key in ("n", "q1", "median", "q3", "lowerfence", "upperfence", "outlier_group", "outlier_value"):
+        assert len(stats[key]) == 0
+    if kde:
+        assert stats["kde"].shape == stats["kde_x"].shape == (0, app.KDE_POINTS)
+
+
+def test_empty_selection_with_bins():
+    df = pd.DataFrame({"popularity": [], "energy": []}, dtype=float)
+    stats = app.distribution_stats.__wrapped__(df, "popularity", "energy", bin_labels=("Low", "High"))
+    assert stats["labels"] == []
+
+
+def test_empty_selection_draws_empty_figures():
+    stats = app.empty_distribution_stats(kde=True)
+    box = app.box_figure(stats, "Box", "Group", "Value")
+    violin = app.violin_figure(stats, "Violin", "Group", "Value")
+    assert len(box.data) == 0 and box.layout.title.text == "Box"
+    assert len(violin.data) == 0 and violin.layout.title.text == "Violin"
+
+
+def test_single_value_group():
+    df = tracks([40, 40, 40, 10, 90], ["Explicit", "Explicit", "Explicit", "Clean", "Clean"])
+    stats = app.distribution_stats.__wrapped__(df, "popularity", "explicit_label", kde=True)
+
+    explicit = stats["labels"].index("Explicit")
+    assert stats["n"][explicit] == 3
+    for key in ("q1", "median", "q3", "lowerfence", "upperfence"):
+        assert stats[key][explicit] == 40
+    assert np.all(np.isfinite(stats["kde"][explicit])) and stats["kde"][explicit].max() > 0
+    assert len(app.violin_figure(stats, "Violin", "Label", "Popularity").data) == 4